@@ -0,0 +1,183 @@
+"""
+Deferred, batched Prefect artifact publishing
+Drop-in replacements for prefect.artifacts.create_table/markdown/link_artifact
+
+Creating an artifact only records it in memory, tagged with the current task and flow run ids.
+When a task finishes (publish_artifacts is registered as its on_completion/on_failure hook),
+its artifacts are handed to one background publisher thread, which sends them to the Prefect
+API over a single client. Data work never waits on the API. If the API fails or is slower
+than ARTIFACT_TIMEOUT, the artifacts are written to logs/artifacts/<flow run>/ as JSON instead.
+flush_artifacts() at the end of the flow publishes flow-level artifacts and waits for the queue.
+Every artifact handed to the publisher stays tracked until it is sent or written to disk, so a
+flush that times out also writes the batch being sent at that moment (an artifact whose API
+call was already under way may then end up both published and on disk, never in neither).
+"""
+
+import os
+import re
+import json
+import queue
+import contextvars
+import threading
+from datetime import datetime
+
+from prefect.artifacts import TableArtifact, MarkdownArtifact, LinkArtifact
+from prefect.client.orchestration import get_client
+from prefect.client.schemas.actions import ArtifactCreate
+from prefect.utilities.context import get_task_and_flow_run_ids
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+ARTIFACT_TIMEOUT = 5.0
+FALLBACK_DIR = os.path.join(project_root, "logs", "artifacts")
+
+_buffers = {}
+_buffers_lock = threading.Lock()
+_queue = queue.Queue()
+_publisher = None
+# Artifacts handed to the publisher and neither sent nor written to disk yet (queued or in flight)
+_unsent = {}
+_unsent_lock = threading.Lock()
+_stats = {"buffered": 0, "published": 0, "written_to_disk": 0}
+
+
+def _buffer(artifact):
+    """Record an artifact under its task run (or the flow run for flow-level artifacts)"""
+    task_run_id, flow_run_id = get_task_and_flow_run_ids()
+    artifact.task_run_id, artifact.flow_run_id = task_run_id, flow_run_id
+    owner = task_run_id or flow_run_id
+    with _buffers_lock:
+        entries = _buffers.setdefault(owner, {})
+        # A retried task re-creates its keyed artifacts; keep only the last one per key
+        entries[artifact.key or f"unkeyed-{len(entries)}"] = artifact
+        _stats["buffered"] += 1
+
+
+def create_table_artifact(table, key=None, description=None):
+    _buffer(TableArtifact(table=table, key=key, description=description))
+
+
+def create_markdown_artifact(markdown, key=None, description=None):
+    _buffer(MarkdownArtifact(markdown=markdown, key=key, description=description))
+
+
+def create_link_artifact(link, link_text=None, key=None, description=None):
+    _buffer(LinkArtifact(link=link, link_text=link_text, key=key, description=description))
+
+
+def _take(owner):
+    with _buffers_lock:
+        return list(_buffers.pop(owner, {}).values())
+
+
+def _write_to_disk(artifacts, reason):
+    """Local fallback: one JSON file per artifact under logs/artifacts/<flow run id>/"""
+    for artifact in artifacts:
+        out_dir = os.path.join(FALLBACK_DIR, str(artifact.flow_run_id or "no-flow-run"))
+        os.makedirs(out_dir, exist_ok=True)
+        name = re.sub(r"[^a-z0-9-]", "-", (artifact.key or "artifact").lower())
+        path = os.path.join(out_dir, f"{datetime.now().strftime('%H%M%S%f')}-{name}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "key": artifact.key,
+                "type": artifact.type,
+                "description": artifact.description,
+                "task_run_id": str(artifact.task_run_id) if artifact.task_run_id else None,
+                "flow_run_id": str(artifact.flow_run_id) if artifact.flow_run_id else None,
+                "data": artifact.format(_sync=True),
+                "reason": reason
+            }, f, indent=2)
+    _stats["written_to_disk"] += len(artifacts)
+
+
+def _claim(artifacts):
+    """Take artifacts out of the unsent set; returns those nobody else has sent or written yet"""
+    with _unsent_lock:
+        return [artifact for artifact in artifacts if _unsent.pop(id(artifact), None) is not None]
+
+
+def _publish_batch(artifacts):
+    """Send one task's artifacts over a single API client; unsent ones fall back to disk"""
+    sent = 0
+    try:
+        with get_client(sync_client=True, httpx_settings={"timeout": ARTIFACT_TIMEOUT}) as client:
+            for artifact in artifacts:
+                with _unsent_lock:
+                    if id(artifact) not in _unsent:
+                        continue  # Written to disk by a flush that timed out
+                client.create_artifact(artifact=ArtifactCreate(
+                    type=artifact.type,
+                    key=artifact.key,
+                    description=artifact.description,
+                    task_run_id=artifact.task_run_id,
+                    flow_run_id=artifact.flow_run_id,
+                    data=artifact.format(_sync=True)
+                ))
+                _claim([artifact])
+                sent += 1
+    except Exception as e:
+        _write_to_disk(_claim(artifacts), f"API unavailable: {type(e).__name__}: {e}")
+    _stats["published"] += sent
+
+
+def _run_publisher():
+    while True:
+        context, artifacts = _queue.get()
+        try:
+            # Publish under the settings (API URL, profile) of the run that created them
+            context.run(_publish_batch, artifacts)
+        finally:
+            _queue.task_done()
+
+
+def _enqueue(artifacts):
+    global _publisher
+    if not artifacts:
+        return
+    if _publisher is None or not _publisher.is_alive():
+        _publisher = threading.Thread(target=_run_publisher, name="artifact-publisher", daemon=True)
+        _publisher.start()
+    with _unsent_lock:
+        _unsent.update((id(artifact), artifact) for artifact in artifacts)
+    _queue.put((contextvars.copy_context(), artifacts))
+
+
+def publish_artifacts(task=None, task_run=None, state=None):
+    """
+    Task state hook: queue the finished task run's artifacts for background publishing
+
+    Usage:
+        @task(on_completion=[publish_artifacts], on_failure=[publish_artifacts])
+    """
+    owner = task_run.id if task_run is not None else get_task_and_flow_run_ids()[0]
+    _enqueue(_take(owner))
+
+
+def flush_artifacts(timeout=ARTIFACT_TIMEOUT * 2):
+    """
+    Publish everything still buffered (flow-level artifacts included) and wait for the
+    publisher; whatever is still unpublished after timeout seconds (queued or in flight)
+    is written to disk
+
+    Returns:
+        Counters of buffered, published and disk-written artifacts
+    """
+    with _buffers_lock:
+        owners = list(_buffers)
+    for owner in owners:
+        _enqueue(_take(owner))
+
+    done = threading.Event()
+    threading.Thread(target=lambda: (_queue.join(), done.set()), daemon=True).start()
+    if not done.wait(timeout):
+        while True:
+            try:
+                _queue.get_nowait()
+                _queue.task_done()
+            except queue.Empty:
+                break
+        with _unsent_lock:
+            pending = list(_unsent.values())
+            _unsent.clear()
+        _write_to_disk(pending, f"API slower than {timeout}s")
+    return dict(_stats)
@@ -0,0 +1,291 @@
+"""
+Backfill Orchestration using Prefect
+Re-runs storage -> validation -> preparation for a range of dt= partitions
+DMML Assignment 01 - Task 10
+"""
+
+import os
+import sys
+import json
+from datetime import datetime, date, timedelta
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from prefect import flow, task, get_run_logger
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+
+from utils.logger import get_logger, is_async_logging_enabled, get_worker_log_queue, configure_worker_logging
+from utils.metrics import track_stage
+from utils.profiling import profile_stage, set_profiled_stages
+from artifact_buffer import create_table_artifact, publish_artifacts, flush_artifacts
+from Task2_DataIngestion.ingestion import ingest_all_data
+from Task3_RawDataStorage.data_storage import store_multiple_tables
+from Task4_DataValidation.data_validation import validate_all_data
+from Task5_DataPreparation.data_preparation import prepare_clean_dataset
+
+logger = get_logger("backfill", log_file=os.path.join(project_root, "logs", "backfill.log"))
+
+raw_root = os.path.join(project_root, "data", "raw")
+progress_file = os.path.join(project_root, "data", "backfill", "progress.json")
+
+
+def get_partition_dates(start_date, end_date):
+    """Return every dt= partition date (ISO strings) between start_date and end_date inclusive"""
+    start = date.fromisoformat(str(start_date))
+    end = date.fromisoformat(str(end_date))
+    if end < start:
+        raise ValueError(f"Backfill end date {end} is before start date {start}")
+    return [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+
+
+def load_backfill_progress():
+    """Load per-partition backfill progress recorded by previous runs"""
+    if not os.path.exists(progress_file):
+        return {}
+    with open(progress_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_backfill_progress(progress):
+    """Persist backfill progress atomically so an interrupted run never leaves a partial file"""
+    os.makedirs(os.path.dirname(progress_file), exist_ok=True)
+    tmp_file = progress_file + ".tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(progress, f, indent=2, sort_keys=True)
+    os.replace(tmp_file, progress_file)
+
+
+def run_partition_backfill(partition_date, ingested_data=None):
+    """
+    Run storage -> validation -> preparation for a single dt= partition
+
+    Args:
+        partition_date: ISO date of the partition to rebuild
+        ingested_data: Optional ingestion snapshot used to fill tables missing from the raw partition
+
+    Returns:
+        Dictionary with partition status and per-stage timings (never raises, so one
+        bad partition does not abort the rest of the backfill)
+    """
+    result = {
+        "partition_date": partition_date,
+        "status": "running",
+        "stage_seconds": {},
+        "started_at": datetime.now().isoformat()
+    }
+    stage = "storage"
+
+    try:
+        with track_stage("backfill.partition", partition_date=partition_date) as partition_metrics:
+            # Stage 1: Storage - only tables missing from this partition are written
+            with track_stage("backfill.storage", partition_date=partition_date) as m:
+                missing_sources = [
+                    source for source in (ingested_data or [])
+                    if not os.path.isdir(os.path.join(raw_root, source['table'], f"dt={partition_date}"))
+                ]
+                if missing_sources:
+                    with profile_stage("storage"):
+                        store_multiple_tables(missing_sources, partition_date=partition_date)
+            result["tables_stored"] = [source['table'] for source in missing_sources]
+            result["stage_seconds"]["storage"] = m.wall_seconds
+
+            # Stage 2: Validation
+            stage = "validation"
+            with track_stage("backfill.validation", partition_date=partition_date) as m, profile_stage("validation"):
+                validation_results = validate_all_data(partition_date)
+            result["quality_score"] = validation_results['quality_score']
+            result["stage_seconds"]["validation"] = m.wall_seconds
+
+            # Stage 3: Preparation
+            stage = "preparation"
+            with track_stage("backfill.preparation", partition_date=partition_date) as m, profile_stage("preparation"):
+                preparation_results = prepare_clean_dataset(partition_date=partition_date)
+                m.rows_out = preparation_results['master_dataset_shape'][0]
+            result["records"] = m.rows_out
+            result["stage_seconds"]["preparation"] = m.wall_seconds
+
+        result["status"] = "completed"
+
+    except Exception as e:
+        result["status"] = "failed"
+        result["failed_stage"] = stage
+        result["error"] = str(e)
+        logger.error(f"Backfill of dt={partition_date} failed during {stage}: {e}")
+
+    result["total_seconds"] = partition_metrics.wall_seconds
+    result["finished_at"] = datetime.now().isoformat()
+    return result
+
+
+def backfill_partitions(start_date, end_date, max_workers=4, force=False, reingest=False):
+    """
+    Rebuild every dt= partition in a date range concurrently
+
+    Args:
+        start_date: First partition date (inclusive)
+        end_date: Last partition date (inclusive)
+        max_workers: Size of the process pool running partitions in parallel
+        force: Re-run partitions that already completed in a previous backfill
+        reingest: Ingest the sources once and store them into partitions missing raw data
+
+    Returns:
+        Dictionary with backfill summary and per-partition results
+    """
+    partition_dates = get_partition_dates(start_date, end_date)
+    progress = load_backfill_progress()
+
+    pending = [
+        partition_date for partition_date in partition_dates
+        if force or progress.get(partition_date, {}).get("status") != "completed"
+    ]
+    skipped = [partition_date for partition_date in partition_dates if partition_date not in pending]
+
+    logger.info(f"Backfill {start_date} to {end_date}: {len(pending)} partitions to run, {len(skipped)} already completed")
+
+    ingested_data = ingest_all_data()['data'] if reingest and pending else None
+
+    # With async logging, workers hand their records to this process's log listener
+    pool_options = {}
+    if is_async_logging_enabled():
+        pool_options = {"initializer": configure_worker_logging, "initargs": (get_worker_log_queue(),)}
+
+    results = {}
+    if pending:
+        with ProcessPoolExecutor(max_workers=max(1, min(max_workers, len(pending))), **pool_options) as executor:
+            futures = {
+                executor.submit(run_partition_backfill, partition_date, ingested_data): partition_date
+                for partition_date in pending
+            }
+            for future in as_completed(futures):
+                partition_date = futures[future]
+                try:
+                    partition_result = future.result()
+                except Exception as e:
+                    # A worker that dies (crash, out of memory) breaks the pool: BrokenProcessPool is
+                    # raised for its partition and every one still pending, which are marked failed
+                    partition_result = {
+                        "partition_date": partition_date,
+                        "status": "failed",
+                        "failed_stage": "worker",
+                        "error": f"{type(e).__name__}: {e}",
+                        "stage_seconds": {},
+                        "total_seconds": None,
+                        "finished_at": datetime.now().isoformat()
+                    }
+                    logger.error(f"Backfill of dt={partition_date} failed: worker process error {partition_result['error']}")
+                results[partition_date] = partition_result
+
+                # Record progress as each partition finishes so reruns can resume
+                progress[partition_date] = partition_result
+                save_backfill_progress(progress)
+                seconds = partition_result['total_seconds']
+                logger.info(f"Partition dt={partition_date} {partition_result['status']}"
+                            + (f" in {seconds}s" if seconds is not None else ""))
+
+    completed = [d for d, r in results.items() if r["status"] == "completed"]
+    failed = [d for d, r in results.items() if r["status"] == "failed"]
+
+    logger.info(f"Backfill finished: {len(completed)} completed, {len(failed)} failed, {len(skipped)} skipped")
+
+    return {
+        "status": "success" if not failed else "partial",
+        "partitions_requested": len(partition_dates),
+        "completed": sorted(completed),
+        "failed": sorted(failed),
+        "skipped": skipped,
+        "partition_results": {d: results[d] for d in sorted(results)}
+    }
+
+
+@task(name="Backfill Partitions", retries=0, on_completion=[publish_artifacts], on_failure=[publish_artifacts])
+def task_backfill_partitions(start_date, end_date, max_workers=4, force=False, reingest=False):
+    """
+    Run the partition backfill and publish per-partition timings
+    """
+    prefect_logger = get_run_logger()
+    try:
+        prefect_logger.info(f"Starting backfill from {start_date} to {end_date} with {max_workers} workers...")
+        logger.info(f"Starting backfill from {start_date} to {end_date}")
+
+        summary = backfill_partitions(start_date, end_date, max_workers=max_workers, force=force, reingest=reingest)
+
+        prefect_logger.info(
+            f"Backfill finished: {len(summary['completed'])} completed, "
+            f"{len(summary['failed'])} failed, {len(summary['skipped'])} skipped"
+        )
+
+        partition_table = []
+        for partition_date, result in summary['partition_results'].items():
+            partition_table.append({
+                "Partition": partition_date,
+                "Status": result['status'],
+                "Storage (s)": result['stage_seconds'].get('storage', "-"),
+                "Validation (s)": result['stage_seconds'].get('validation', "-"),
+                "Preparation (s)": result['stage_seconds'].get('preparation', "-"),
+                "Total (s)": result['total_seconds'] if result['total_seconds'] is not None else "-",
+                "Error": result.get('error', "")
+            })
+
+        if partition_table:
+            create_table_artifact(
+                key="backfill-partition-timings",
+                table=partition_table,
+                description=f"Backfill {start_date} to {end_date} - per-partition timings"
+            )
+
+        for partition_date in summary['failed']:
+            prefect_logger.warning(f"Partition dt={partition_date} failed: {summary['partition_results'][partition_date]['error']}")
+
+        return summary
+
+    except Exception as e:
+        prefect_logger.error(f"Backfill error: {str(e)}")
+        logger.error(f"Backfill error: {str(e)}")
+        raise
+
+
+def generate_backfill_run_name():
+    """Generate a custom backfill run name with timestamp"""
+    return f"DMML-Backfill-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+
+
+@flow(name="Backfill Pipeline",
+      description="Rebuild raw, validated and clean partitions for a date range",
+      flow_run_name=generate_backfill_run_name)
+def backfill_pipeline(start_date: str, end_date: str, max_workers: int = 4, force: bool = False, reingest: bool = False,
+                      profile_stages: list[str] | None = None):
+    """
+    Backfill flow: storage -> validation -> preparation for every dt= partition in range
+    """
+    prefect_logger = get_run_logger()
+    if profile_stages:
+        # Inherited by the worker processes, which write their profiles to logs/profiles/
+        set_profiled_stages(profile_stages)
+    prefect_logger.info(f"Starting Backfill Pipeline for {start_date} to {end_date}...")
+    logger.info(f"Starting Backfill Pipeline for {start_date} to {end_date}")
+
+    try:
+        summary = task_backfill_partitions(start_date, end_date, max_workers=max_workers, force=force, reingest=reingest)
+    finally:
+        # Wait for the background publisher (artifacts it cannot publish are written to logs/artifacts)
+        flush_artifacts()
+
+    prefect_logger.info("Backfill Pipeline completed!")
+    logger.info("Backfill Pipeline completed")
+    return summary
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Backfill dt= partitions for a date range")
+    parser.add_argument("start_date", help="First partition date (YYYY-MM-DD)")
+    parser.add_argument("end_date", help="Last partition date (YYYY-MM-DD)")
+    parser.add_argument("--workers", type=int, default=4, help="Number of partitions processed in parallel")
+    parser.add_argument("--force", action="store_true", help="Re-run partitions that already completed")
+    parser.add_argument("--reingest", action="store_true", help="Fill partitions missing raw data from a fresh ingestion")
+    args = parser.parse_args()
+
+    result = backfill_pipeline(args.start_date, args.end_date, max_workers=args.workers, force=args.force, reingest=args.reingest)
+    print(f"Backfill Result: completed={result['completed']} failed={result['failed']} skipped={result['skipped']}")
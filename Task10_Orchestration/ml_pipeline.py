@@ -11,9 +11,10 @@ DMML Assignment 01 - Task 10
 
 import os
 import sys
+import json
+import time
 from datetime import datetime, timedelta
 from prefect import flow, task, get_run_logger
-from prefect.artifacts import create_table_artifact, create_markdown_artifact, create_link_artifact
 import pandas as pd
 from sqlalchemy import table
 
@@ -25,16 +26,83 @@ sys.path.append(project_root)
 
 # Import functions (after adding project root to path)
 from utils.logger import get_logger
+from utils.metrics import track_stage, set_run_id, get_collected_metrics, format_metrics_table
+from utils.profiling import profile_stage, set_profiled_stages
 from template_utils import *
+from artifact_buffer import create_table_artifact, create_markdown_artifact, create_link_artifact, publish_artifacts, flush_artifacts
 from Task2_DataIngestion.ingestion import ingest_all_data
 from Task3_RawDataStorage.data_storage import store_multiple_tables
 from Task4_DataValidation.data_validation import validate_all_data
+from Task4_DataValidation.schema_registry import check_sources
 from Task5_DataPreparation.data_preparation import prepare_clean_dataset
+from Task6_DataTransformation.feature_engineering import build_features
+from Task7_FeatureStore.feature_store import FeatureStore, materialize_features
+from Task8_DataVersioning.versioning import version_partition
+from Task9_ModelBuilding.training_set import build_training_set
+from Task9_ModelBuilding.model_training import train_churn_model
+from Task9_ModelBuilding.batch_scoring import score_partition
 
 logger = get_logger("pipeline", log_file=os.path.join(project_root, "logs", "pipeline.log"))
 
+# Artifacts are buffered during a task and published off the critical path when it ends
+ARTIFACT_HOOKS = {"on_completion": [publish_artifacts], "on_failure": [publish_artifacts]}
 
-@task(name="Data Ingestion", retries=2, retry_delay_seconds=30)
+# Online lookup latency is measured on a fixed random sample of customers, so the
+# timing stays comparable between runs and does not grow with the customer base
+LOOKUP_SAMPLE_SIZE = 1000
+LOOKUP_SAMPLE_SEED = 42
+
+
+@task(name="Schema Check", **ARTIFACT_HOOKS)
+def task_schema_check(partition_date=None):
+    """
+    Task 4 (gate): check source schemas on their first rows before anything is ingested
+    Fails the run when a source no longer matches its contract.
+    """
+    prefect_logger = get_run_logger()
+    try:
+        partition_date = partition_date or datetime.today().date().isoformat()
+        prefect_logger.info("Checking source schemas...")
+        logger.info("Starting source schema check")
+
+        with track_stage("pipeline.schema_check"):
+            result = check_sources(partition_date, fail_fast=False)
+
+        create_table_artifact(
+            key="schema-check",
+            table=[
+                {
+                    "Table": table["table"].title(),
+                    "Status": table["status"],
+                    "Columns": table["columns"],
+                    "Changed": "yes" if table["changed"] else "no",
+                    "Compared With": table["compared_with"] or "-",
+                    "Check (ms)": round(table["seconds"] * 1000, 1),
+                    "Issues": "; ".join(table["errors"] + table["warnings"]) or "-"
+                }
+                for table in result["tables"]
+            ],
+            description=f"Source Schema Check - {result['status']}"
+        )
+
+        for table in result["tables"]:
+            for message in table["warnings"]:
+                prefect_logger.warning(f"Schema: {message}")
+        if result["status"] == "failed":
+            errors = [message for table in result["tables"] for message in table["errors"]]
+            raise ValueError("Source schema check failed: " + "; ".join(errors))
+
+        prefect_logger.info(f"Source schema check {result['status']}")
+        logger.info(f"Source schema check {result['status']}")
+        return result
+
+    except Exception as e:
+        prefect_logger.error(f"Schema check error: {str(e)}")
+        logger.error(f"Schema check error: {str(e)}")
+        raise
+
+
+@task(name="Data Ingestion", retries=2, retry_delay_seconds=30, **ARTIFACT_HOOKS)
 def task_data_ingestion():
     """
     Task 2: Ingest data from multiple sources
@@ -49,7 +117,9 @@ def task_data_ingestion():
         logger.info("Starting data ingestion from database sources")
         
         # Call the ingestion function directly
-        result = ingest_all_data()
+        with track_stage("pipeline.ingestion") as stage_metrics, profile_stage("ingestion") as profile:
+            result = ingest_all_data()
+        publish_profile(profile)
         status = result.pop('status')  # Remove status for downstream tasks
         total_records = result.pop('total_records', 0)
         data = result.pop('data', [])
@@ -72,7 +142,7 @@ def task_data_ingestion():
                 tables_count=len(data),
                 ingestion_date=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
                 table_details=format_table_details(data),
-                execution_time="< 1 second",  # You can calculate actual time if needed
+                execution_time=f"{stage_metrics.wall_seconds:.2f} seconds (CPU {stage_metrics.cpu_seconds:.2f}s)",
                 avg_records_per_table=total_records // len(data) if len(data) > 0 else 0
             ),
             description="Comprehensive Data Ingestion Report"
@@ -88,7 +158,7 @@ def task_data_ingestion():
         logger.error(f"Data ingestion error: {str(e)}")
         raise
 
-@task(name="Raw Data Storage", retries=1)
+@task(name="Raw Data Storage", retries=1, **ARTIFACT_HOOKS)
 def task_raw_data_storage(data):
     """
     Task 3: Organize and store raw data in data lake structure
@@ -103,7 +173,9 @@ def task_raw_data_storage(data):
         prefect_logger.info(f"Processing {len(data)} data sources")
         logger.info(f"Starting raw data storage for {len(data)} data sources")
         
-        status = store_multiple_tables(data)
+        with track_stage("pipeline.storage"), profile_stage("storage") as profile:
+            status = store_multiple_tables(data)
+        publish_profile(profile)
         
         # Log success to both systems
         prefect_logger.info("Raw data storage completed successfully!")
@@ -139,8 +211,8 @@ def task_raw_data_storage(data):
         logger.error(f"Raw data storage error: {str(e)}")
         raise
 
-@task(name="Data Validation", retries=1)
-def task_data_validation():
+@task(name="Data Validation", retries=1, **ARTIFACT_HOOKS)
+def task_data_validation(validation_date=None):
     """
     Task 4: Validate data quality and generate comprehensive reports
     """
@@ -148,9 +220,11 @@ def task_data_validation():
     try:
         prefect_logger.info("🔍 Starting comprehensive data validation...")
         logger.info("Starting data validation")
-        validation_date = datetime.today().date().isoformat()
+        validation_date = validation_date or datetime.today().date().isoformat()
         # Run data validation
-        validation_results = validate_all_data(validation_date)
+        with track_stage("pipeline.validation"), profile_stage("validation") as profile:
+            validation_results = validate_all_data(validation_date)
+        publish_profile(profile)
         
         # Log results to both systems
         quality_score = validation_results['quality_score']
@@ -195,6 +269,12 @@ def task_data_validation():
                 business_rules_summary=format_business_rules_summary(
                     validation_results['validation_report']['validation_results'].get('business_rules', {})
                 ),
+                referential_integrity_summary=format_referential_integrity_summary(
+                    validation_results['validation_report']['validation_results'].get('referential_integrity', {})
+                ),
+                drift_summary=format_drift_summary(
+                    validation_results['validation_report']['validation_results'].get('drift', {})
+                ),
                 completeness_overview=format_completeness_overview(
                     validation_results['validation_report']['validation_results']
                 ),
@@ -230,8 +310,8 @@ def task_data_validation():
         logger.error(f"Data validation error: {str(e)}")
         raise
 
-@task(name="Data Preparation", retries=1)
-def task_data_preparation():
+@task(name="Data Preparation", retries=1, **ARTIFACT_HOOKS)
+def task_data_preparation(partition_date=None):
     """
     Task 5: Clean, merge and prepare data for churn prediction
     Creates the master churn dataset from billing, subscriptions, and CRM data
@@ -242,7 +322,9 @@ def task_data_preparation():
         logger.info("Starting data preparation for churn prediction")
         
         # Run data preparation
-        preparation_results = prepare_clean_dataset()
+        with track_stage("pipeline.preparation"), profile_stage("preparation") as profile:
+            preparation_results = prepare_clean_dataset(partition_date=partition_date)
+        publish_profile(profile)
         
         # Extract key metrics
         dataset_shape = preparation_results['master_dataset_shape']
@@ -340,8 +422,8 @@ def task_data_preparation():
         logger.error(f"Data preparation error: {str(e)}")
         raise
 
-@task(name="Data Transformation", retries=1)
-def task_data_transformation():
+@task(name="Data Transformation", retries=1, **ARTIFACT_HOOKS)
+def task_data_transformation(partition_date=None):
     """
     Task 6: Feature engineering and transformation
     """
@@ -350,18 +432,51 @@ def task_data_transformation():
         prefect_logger.info("Starting data transformation...")
         logger.info("Starting data transformation...")
         
-        # This will run your transformation scripts
+        with track_stage("pipeline.transformation"), profile_stage("transformation") as profile:
+            transformation_results = build_features(partition_date=partition_date)
+        publish_profile(profile)
+        
+        customers = transformation_results['customers']
+        feature_count = transformation_results['feature_count']
+        prefect_logger.info(f"🧮 Features computed: {customers:,} customers × {feature_count} features")
+        logger.info(f"Data transformation completed. {customers} customers x {feature_count} features")
+        
+        # Feature catalogue with summary statistics
+        summary = transformation_results['feature_summary'].set_index('feature')
+        feature_table = []
+        for definition in transformation_results['feature_definitions']:
+            stats = summary.loc[definition['name']] if definition['name'] in summary.index else None
+            feature_table.append({
+                "Feature": definition['name'],
+                "Aggregation": definition['aggregation'],
+                "Description": definition['description'],
+                "Mean": round(float(stats['mean']), 3) if stats is not None and pd.notna(stats['mean']) else "-",
+                "Non-null": int(stats['count']) if stats is not None else 0
+            })
+        
+        create_table_artifact(
+            key="transformation-feature-catalogue",
+            table=feature_table,
+            description=f"Churn features for partition {transformation_results['partition_date']}"
+        )
+        
         prefect_logger.info("Data transformation completed successfully!")
-        logger.info("Data transformation completed successfully!")
-        return {"status": "success", "message": "Feature engineering completed"}
+        return {
+            "status": "success",
+            "message": "Feature engineering completed",
+            "partition_date": transformation_results['partition_date'],
+            "output_file": transformation_results['output_file'],
+            "customers": customers,
+            "feature_count": feature_count
+        }
         
     except Exception as e:
         prefect_logger.error(f"Data transformation error: {str(e)}")
         logger.error(f"Data transformation error: {str(e)}")
         raise
 
-@task(name="Feature Store Update", retries=1)
-def task_feature_store():
+@task(name="Feature Store Update", retries=1, **ARTIFACT_HOOKS)
+def task_feature_store(partition_date=None):
     """
     Task 7: Update feature store with new features
     """
@@ -370,18 +485,63 @@ def task_feature_store():
         prefect_logger.info("Starting feature store update...")
         logger.info("Starting feature store update...")
         
-        # This will update your feature store
+        store = FeatureStore()
+        try:
+            with track_stage("pipeline.feature_store"), profile_stage("feature_store") as profile:
+                materialization = materialize_features(partition_date=partition_date, store=store)
+            publish_profile(profile)
+            
+            # Sample online lookup: a fixed random sample of the materialized customers (only the key column is read)
+            customers = store.read_partition(materialization['partition_date'], columns=[])['customer_id']
+            sample = customers.sample(min(LOOKUP_SAMPLE_SIZE, len(customers)), random_state=LOOKUP_SAMPLE_SEED).tolist()
+            lookup_start = time.perf_counter()
+            store.get_features(sample)
+            lookup_ms = (time.perf_counter() - lookup_start) * 1000
+        finally:
+            store.close()
+        
+        prefect_logger.info(
+            f"🗄️ Materialized {materialization['entities']:,} customers × {materialization['features']} features "
+            f"for dt={materialization['partition_date']}; online lookup of {len(sample):,} sampled customers took {lookup_ms:.1f} ms"
+        )
+        logger.info(f"Feature store updated for dt={materialization['partition_date']} "
+                    f"(online lookup of {len(sample)} sampled customers {lookup_ms:.1f} ms)")
+        
+        create_table_artifact(
+            key="feature-store-materialization",
+            table=[{
+                "Feature View": materialization['feature_view'],
+                "Partition": materialization['partition_date'],
+                "Customers": materialization['entities'],
+                "Features": materialization['features'],
+                "Offline File": materialization['offline_file'],
+                "Offline Size (KB)": round(materialization['offline_bytes'] / 1024, 1),
+                "Online Rows Written": materialization['online_rows_written'],
+                "Incremental": materialization['incremental'],
+                f"Online Lookup of {len(sample):,} Sampled Customers (ms)": round(lookup_ms, 2)
+            }],
+            description="Feature store batch materialization (offline Parquet + online SQLite)"
+        )
+        
         prefect_logger.info("Feature store update completed successfully!")
         logger.info("Feature store update completed successfully!")
-        return {"status": "success", "message": "Feature store updated"}
+        return {
+            "status": "success",
+            "message": "Feature store updated",
+            "partition_date": materialization['partition_date'],
+            "feature_view": materialization['feature_view'],
+            "customers": materialization['entities'],
+            "online_lookup_ms": round(lookup_ms, 2),
+            "online_lookup_sample": len(sample)
+        }
         
     except Exception as e:
         prefect_logger.error(f"Feature store error: {str(e)}")
         logger.error(f"Feature store error: {str(e)}")
         raise
 
-@task(name="Data Versioning", retries=1)
-def task_data_versioning():
+@task(name="Data Versioning", retries=1, **ARTIFACT_HOOKS)
+def task_data_versioning(partition_date=None):
     """
     Task 8: Version control datasets
     """
@@ -390,18 +550,52 @@ def task_data_versioning():
         prefect_logger.info("Starting data versioning...")
         logger.info("Starting data versioning...")
         
-        # This will handle data versioning
+        with track_stage("pipeline.versioning"), profile_stage("versioning") as profile:
+            versioning_results = version_partition(partition_date)
+        publish_profile(profile)
+        
+        version_table = []
+        for dataset, manifest in versioning_results['versions'].items():
+            prefect_logger.info(
+                f"🏷️ {dataset} {manifest['tag']} -> version {manifest['version_id']} "
+                f"({manifest['new_bytes_stored']:,} new bytes stored{', unchanged' if manifest['unchanged'] else ''})"
+            )
+            version_table.append({
+                "Dataset": dataset,
+                "Tag": manifest['tag'],
+                "Version": manifest['version_id'],
+                "Files": len(manifest['files']),
+                "Blocks": manifest['block_count'],
+                "Size (KB)": round(manifest['total_bytes'] / 1024, 1),
+                "New Storage (KB)": round(manifest['new_bytes_stored'] / 1024, 1),
+                "Unchanged": manifest['unchanged']
+            })
+        
+        storage = versioning_results['storage']
+        create_table_artifact(
+            key="data-versions",
+            table=version_table,
+            description=(
+                f"Dataset versions for dt={partition_date} - block store holds "
+                f"{storage['stored_bytes'] / 1024:.1f} KB for {storage['logical_bytes'] / 1024:.1f} KB of versioned data"
+            )
+        )
+        
         prefect_logger.info("Data versioning completed successfully!")
         logger.info("Data versioning completed successfully!")
-        return {"status": "success", "message": "Data versions updated"}
+        return {
+            "status": "success",
+            "message": "Data versions updated",
+            "versions": {dataset: manifest['version_id'] for dataset, manifest in versioning_results['versions'].items()}
+        }
         
     except Exception as e:
         prefect_logger.error(f"Data versioning error: {str(e)}")
         logger.error(f"Data versioning error: {str(e)}")
         raise
 
-@task(name="Model Building", retries=1)
-def task_model_building():
+@task(name="Model Building", retries=1, **ARTIFACT_HOOKS)
+def task_model_building(partition_date=None, data_versions=None):
     """
     Task 9: Train and evaluate ML models
     """
@@ -410,16 +604,157 @@ def task_model_building():
         prefect_logger.info("Starting model building...")
         logger.info("Starting model building...")
         
-        # This will run your model training scripts
+        # Point-in-time training set: label events joined to the features available at label time
+        with track_stage("pipeline.model_building"), profile_stage("model_building") as profile:
+            training_set = build_training_set(partition_date)
+        publish_profile(profile)
+        
+        prefect_logger.info(
+            f"🎯 Training set: {training_set['rows']:,} labels ({training_set['positives']:,} churned) × "
+            f"{len(training_set['feature_columns'])} features; "
+            f"{training_set['labels_without_features']:,} labels had no earlier feature snapshot"
+        )
+        logger.info(f"Training set built: {training_set['output_dir']} ({training_set['rows']} rows)")
+        
+        create_table_artifact(
+            key="model-training-set",
+            table=[{
+                "Partition": training_set['partition_date'],
+                "Labels": training_set['rows'],
+                "Churned": training_set['positives'],
+                "Without Features": training_set['labels_without_features'],
+                "Features": len(training_set['feature_columns']),
+                "Snapshots Used": ", ".join(training_set['snapshot_partitions']) or "-",
+                "Customer Partitions": training_set['customer_partitions']
+            }],
+            description="Point-in-time training set (as-of join of churn labels to feature snapshots)"
+        )
+        
+        # Parallel hyperparameter search with successive halving
+        with track_stage("pipeline.model_training"), profile_stage("model_training") as profile:
+            training = train_churn_model(training_set['output_dir'], data_versions=data_versions)
+        publish_profile(profile)
+        
+        if training['status'] == "skipped":
+            prefect_logger.warning(f"Model training skipped: {training['reason']}")
+            logger.warning(f"Model training skipped: {training['reason']}")
+        else:
+            metrics = training['test_metrics']
+            prefect_logger.info(
+                f"🤖 Best model: CV ROC-AUC {training['cv_roc_auc']}, test ROC-AUC {metrics['roc_auc']} "
+                f"({training['evaluations']} evaluations, {len(training['halving_rounds'])} halving rounds, "
+                f"{training['search_seconds']}s on {training['n_jobs']} workers)"
+            )
+            create_table_artifact(
+                key="model-training-metrics",
+                table=[{"Metric": name, "Value": value} for name, value in metrics.items()] + [
+                    {"Metric": "cv_roc_auc", "Value": training['cv_roc_auc']},
+                    {"Metric": "search_seconds", "Value": training['search_seconds']},
+                    {"Metric": "best_params", "Value": json.dumps(training['best_params'])}
+                ],
+                description=f"Churn model holdout metrics - {training['model_version']} "
+                            f"(data versions: {', '.join(f'{k}={v}' for k, v in training['data_versions'].items()) or '-'})"
+            )
+            create_table_artifact(
+                key="model-halving-rounds",
+                table=[
+                    {"Round": r['iteration'], "Candidates": r['candidates'], "Samples per Candidate": r['samples']}
+                    for r in training['halving_rounds']
+                ],
+                description="Successive halving: configurations kept and training rows per round"
+            )
+        
         prefect_logger.info("Model building completed successfully!")
         logger.info("Model building completed successfully!")
-        return {"status": "success", "message": "Model trained and saved"}
+        return {
+            "status": "success",
+            "message": "Model trained and saved" if training['status'] == "success" else "Training set built, model training skipped",
+            "training_set": training_set['output_dir'],
+            "rows": training_set['rows'],
+            "model_version": training.get('model_version'),
+            "test_metrics": training.get('test_metrics')
+        }
         
     except Exception as e:
         prefect_logger.error(f"Model building error: {str(e)}")
         logger.error(f"Model building error: {str(e)}")
         raise
 
+@task(name="Batch Scoring", retries=1, **ARTIFACT_HOOKS)
+def task_batch_scoring(partition_date=None):
+    """
+    Task 9: Score every customer of the partition with the latest churn model
+    """
+    prefect_logger = get_run_logger()
+    try:
+        prefect_logger.info("Starting batch scoring...")
+        logger.info("Starting batch scoring...")
+        
+        with track_stage("pipeline.batch_scoring"), profile_stage("batch_scoring") as profile:
+            scoring = score_partition(partition_date)
+        publish_profile(profile)
+        
+        if scoring['status'] == "skipped":
+            prefect_logger.warning(f"Batch scoring skipped: {scoring['reason']}")
+            logger.warning(f"Batch scoring skipped: {scoring['reason']}")
+            return {"status": "skipped", "message": scoring['reason'], "partition_date": partition_date}
+        
+        prefect_logger.info(
+            f"📈 Scored {scoring['rows']:,} customers in {scoring['seconds']}s "
+            f"({scoring['rows_per_second']:,} rows/s on {scoring['workers']} workers)"
+        )
+        create_table_artifact(
+            key="batch-scoring",
+            table=[{
+                "Partition": scoring['partition_date'],
+                "Model Version": scoring['model_version'],
+                "Customers Scored": scoring['rows'],
+                "Parts": len(scoring['parts']),
+                "Seconds": scoring['seconds'],
+                "Rows/s": scoring['rows_per_second'],
+                "Workers": scoring['workers'],
+                "Output": scoring['output_dir']
+            }],
+            description="Daily churn scores (data/scores/dt=...)"
+        )
+        
+        prefect_logger.info("Batch scoring completed successfully!")
+        logger.info("Batch scoring completed successfully!")
+        return {
+            "status": "success",
+            "message": f"Scored {scoring['rows']} customers",
+            "partition_date": partition_date,
+            "output_dir": scoring['output_dir'],
+            "rows": scoring['rows']
+        }
+        
+    except Exception as e:
+        prefect_logger.error(f"Batch scoring error: {str(e)}")
+        logger.error(f"Batch scoring error: {str(e)}")
+        raise
+
+def publish_profile(profile):
+    """Attach the hot functions of a profiled stage as a Prefect table artifact"""
+    if profile is None:
+        return
+    create_table_artifact(
+        key=f"{profile.stage}-profile",
+        table=profile.to_table(),
+        description=f"Top functions in {profile.stage} (pstats: {profile.pstats_file}, collapsed stacks: {profile.collapsed_file})"
+    )
+    logger.info(f"Profile for {profile.stage} written to {profile.pstats_file} ({profile.samples} stack samples)")
+
+def publish_stage_metrics(run_id):
+    """Publish the stage metrics recorded during this run as a Prefect table artifact"""
+    records = get_collected_metrics(run_id)
+    if records:
+        create_table_artifact(
+            key="pipeline-stage-metrics",
+            table=format_metrics_table(records),
+            description=f"Stage timing and memory metrics for run {run_id}"
+        )
+    return records
+
 def generate_flow_run_name():
     """Generate a custom flow run name with timestamp"""
     return f"DMML-Assignment01-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
@@ -427,9 +762,13 @@ def generate_flow_run_name():
 @flow(name="ML Data Pipeline", 
       description="End-to-End ML Data Management Pipeline",
       flow_run_name=generate_flow_run_name)
-def ml_data_pipeline():
+def ml_data_pipeline(profile_stages: list[str] | None = None):
     """
     Main ML pipeline flow that orchestrates all tasks in sequence
+
+    Args:
+        profile_stages: Optional stages to profile (e.g. ["validation", "preparation"] or ["all"]);
+            also configurable with the DMML_PROFILE environment variable
     """
     # Dual logging for the main flow
     # prefect_logger = get_run_logger()
@@ -437,6 +776,9 @@ def ml_data_pipeline():
     prefect_logger = get_run_logger()
     prefect_logger.info("Starting ML Data Pipeline...")
     logger.info("Starting ML Data Pipeline")
+    run_id = set_run_id()
+    if profile_stages:
+        set_profiled_stages(profile_stages)
     
     # Change working directory to project root to ensure correct paths
     original_cwd = os.getcwd()
@@ -445,8 +787,11 @@ def ml_data_pipeline():
     
     try:
         # Task dependencies - each task depends on the previous one
+        # Schema gate: nothing is ingested from sources that no longer match their contract
+        schema_result = task_schema_check()
+
         # Ingestion Task
-        ingestion_result, ingested_records, ingested_data = task_data_ingestion()
+        ingestion_result, ingested_records, ingested_data = task_data_ingestion(wait_for=[schema_result])
 
         # Storage Task  
         storage_result = task_raw_data_storage(data=ingested_data, wait_for=[ingested_data])
@@ -455,27 +800,56 @@ def ml_data_pipeline():
         
         preparation_result = task_data_preparation(wait_for=[validation_result])
         
-        transformation_result = task_data_transformation(wait_for=[preparation_result])
+        transformation_result = task_data_transformation(
+            partition_date=preparation_result['preparation_results']['save_results']['partition_date'],
+            wait_for=[preparation_result]
+        )
         
-        feature_store_result = task_feature_store(wait_for=[transformation_result])
+        feature_store_result = task_feature_store(
+            partition_date=transformation_result['partition_date'],
+            wait_for=[transformation_result]
+        )
         
-        versioning_result = task_data_versioning(wait_for=[feature_store_result])
+        versioning_result = task_data_versioning(
+            partition_date=feature_store_result['partition_date'],
+            wait_for=[feature_store_result]
+        )
         
-        model_result = task_model_building(wait_for=[versioning_result])
+        model_result = task_model_building(
+            partition_date=feature_store_result['partition_date'],
+            data_versions=versioning_result['versions'],
+            wait_for=[versioning_result]
+        )
+        
+        scoring_result = task_batch_scoring(
+            partition_date=feature_store_result['partition_date'],
+            wait_for=[model_result]
+        )
+
+        stage_metrics = publish_stage_metrics(run_id)
+        prefect_logger.info(f"Recorded {len(stage_metrics)} stage metrics for run {run_id} (logs/metrics.jsonl)")
 
         prefect_logger.info("ML Data Pipeline completed successfully!")
         logger.info("ML Data Pipeline completed successfully!")
         
         return {
             "pipeline_status": "completed",
+            "run_id": run_id,
             "completion_time": datetime.now().isoformat(),
             "tasks_completed": [
-                "ingestion", "storage", "validation", "preparation", 
-                "transformation", "feature_store", "versioning", "model_building"
+                "schema_check", "ingestion", "storage", "validation", "preparation", 
+                "transformation", "feature_store", "versioning", "model_building", "batch_scoring"
             ]
         }
         
     finally:
+        # Publish flow-level artifacts and wait for the background publisher
+        artifact_stats = flush_artifacts()
+        prefect_logger.info(
+            f"Artifacts: {artifact_stats['published']} published, "
+            f"{artifact_stats['written_to_disk']} written to logs/artifacts"
+        )
+        
         # Restore original working directory
         os.chdir(original_cwd)
         prefect_logger.info(f"Restored working directory to: {original_cwd}")
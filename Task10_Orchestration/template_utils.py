@@ -1,12 +1,115 @@
 """
 Template utilities for Prefect artifacts
 Handles markdown template loading and variable substitution
+
+Templates in templates/ are compiled once into literal fragments and placeholder slots and
+cached; a template is only re-read when its file's mtime changes. Substituted sections are
+capped (MAX_SECTION_LINES / MAX_SECTION_CHARS) so report size stays bounded when tables get
+wide or validation produces many results.
 """
 
 import os
-from string import Template
+import threading
+from string import Formatter
 from datetime import datetime
 
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "templates")
+MAX_SECTION_LINES = 60
+MAX_SECTION_CHARS = 6000
+
+
+def truncate_section(text, max_lines=MAX_SECTION_LINES, max_chars=MAX_SECTION_CHARS):
+    """Cut a rendered section to max_lines / max_chars, noting how much was left out"""
+    text = str(text)
+    if len(text) <= max_chars and text.count("\n") < max_lines:
+        return text
+    # Walk line ends only up to the cut; the remainder is counted, never split
+    cut = 0
+    for _ in range(max_lines):
+        end = text.find("\n", cut)
+        if end == -1 or end > max_chars:
+            break
+        cut = end + 1
+    if cut == 0:
+        return text[:max_chars] + f"\n\n_... {len(text) - max_chars} more characters truncated_"
+    omitted = text.count("\n", cut) + 1
+    return text[:cut].rstrip("\n") + f"\n\n_... {omitted} more lines truncated_"
+
+
+class CompiledTemplate:
+    """A template split once into (literal, field name, format spec, conversion) fragments"""
+
+    def __init__(self, source):
+        self.fragments = list(Formatter().parse(source))
+        self.fields = {name for _, name, _, _ in self.fragments if name}
+
+    def render(self, values, max_lines=MAX_SECTION_LINES, max_chars=MAX_SECTION_CHARS):
+        formatter = Formatter()
+        parts = []
+        for literal, name, spec, conversion in self.fragments:
+            parts.append(literal)
+            if name is None:
+                continue
+            value = formatter.get_field(name, (), values)[0]
+            if conversion:
+                value = formatter.convert_field(value, conversion)
+            value = format(value, spec) if spec else str(value)
+            parts.append(truncate_section(value, max_lines, max_chars))
+        return "".join(parts)
+
+
+class TemplateEngine:
+    """
+    Compiled, mtime-checked cache of the markdown templates in a directory
+
+    Usage:
+        engine = TemplateEngine()
+        markdown = engine.render("validation_report_template", quality_score=95, ...)
+    """
+
+    def __init__(self, template_dir=TEMPLATE_DIR, max_section_lines=MAX_SECTION_LINES, max_section_chars=MAX_SECTION_CHARS):
+        self.template_dir = template_dir
+        self.max_section_lines = max_section_lines
+        self.max_section_chars = max_section_chars
+        self._cache = {}
+        self._lock = threading.Lock()
+        self.preload()
+
+    def preload(self):
+        """Compile every template of the directory up front"""
+        if os.path.isdir(self.template_dir):
+            for file_name in sorted(os.listdir(self.template_dir)):
+                if file_name.endswith(".md"):
+                    self.get(file_name[:-3])
+
+    def get(self, template_name):
+        """Compiled template, recompiled only when the file changed since it was cached"""
+        path = os.path.join(self.template_dir, f"{template_name}.md")
+        mtime = os.stat(path).st_mtime_ns
+        cached = self._cache.get(template_name)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        with open(path, 'r', encoding='utf-8') as f:
+            compiled = CompiledTemplate(f.read())
+        with self._lock:
+            self._cache[template_name] = (mtime, compiled)
+        return compiled
+
+    def render(self, template_name, **kwargs):
+        return self.get(template_name).render(kwargs, self.max_section_lines, self.max_section_chars)
+
+
+_engine = None
+
+
+def get_template_engine():
+    """Process-wide engine, created (and all templates compiled) on first use"""
+    global _engine
+    if _engine is None:
+        _engine = TemplateEngine()
+    return _engine
+
+
 def load_markdown_template(template_name, **kwargs):
     """
     Load a markdown template and substitute variables
@@ -18,18 +121,8 @@ def load_markdown_template(template_name, **kwargs):
     Returns:
         Formatted markdown string
     """
-    template_path = os.path.join(
-        os.path.dirname(__file__), 
-        "templates", 
-        f"{template_name}.md"
-    )
-    
     try:
-        with open(template_path, 'r', encoding='utf-8') as f:
-            template_content = f.read()
-        
-        # Use Python's string formatting for variable substitution
-        return template_content.format(**kwargs)
+        return get_template_engine().render(template_name, **kwargs)
         
     except FileNotFoundError:
         return f"Template not found: {template_name}.md"
@@ -163,7 +256,7 @@ def format_completeness_overview(validation_results):
     
     return "\n".join(overview)
 
-def format_business_rules_summary(business_rules):
+def format_business_rules_summary(business_rules, max_violations=10):
     """Format business rules validation summary"""
     if not business_rules:
         return "No business rules validation performed"
@@ -174,8 +267,69 @@ def format_business_rules_summary(business_rules):
     
     if business_rules.get('violations'):
         summary.append("\n**Violations Details:**")
-        for violation in business_rules['violations']:
+        for violation in business_rules['violations'][:max_violations]:
             summary.append(f"- {violation['rule']}: {violation['violations']} violations in {violation['table']}")
+        if len(business_rules['violations']) > max_violations:
+            summary.append(f"- ... and {len(business_rules['violations']) - max_violations} more rules with violations")
+    
+    return "\n".join(summary)
+
+def format_referential_integrity_summary(integrity, max_relations=10):
+    """Format referential integrity results (orphaned foreign keys per relation)"""
+    if not integrity:
+        return "No referential integrity validation performed"
+    
+    summary = []
+    summary.append(f"- **Relations Checked**: {integrity['relations_checked']}")
+    summary.append(f"- **Orphaned Rows**: {integrity['total_orphan_rows']:,}")
+    
+    relations = [relation for relation in integrity['relations'] if relation['orphan_rows']]
+    if relations:
+        summary.append("\n**Orphaned Keys:**")
+        for relation in relations[:max_relations]:
+            summary.append(
+                f"- {relation['relation']}: {relation['orphan_rows']:,} rows, {relation['orphan_keys']:,} keys "
+                f"({relation['orphan_pct']}%) e.g. {', '.join(relation['orphan_sample'][:5])}"
+            )
+        if len(relations) > max_relations:
+            summary.append(f"- ... and {len(relations) - max_relations} more relations with orphans")
+    if integrity.get('skipped'):
+        summary.append(f"- **Skipped** (table or column missing): {', '.join(integrity['skipped'])}")
+    
+    return "\n".join(summary)
+
+def format_drift_summary(drift, max_columns=10):
+    """Format drift monitoring results (columns whose distribution moved against earlier partitions)"""
+    if not drift or not drift.get('tables'):
+        return "No drift monitoring performed"
+    
+    incomplete = {table: result for table, result in drift['tables'].items() if not result.get('complete', True)}
+    compared = {table: result for table, result in drift['tables'].items()
+                if result['baseline_partitions'] and table not in incomplete}
+    if not compared and not incomplete:
+        return "No earlier partitions to compare with yet (sketches recorded for this partition)"
+    
+    summary = []
+    for table, result in compared.items():
+        summary.append(f"- **{table}**: compared with {len(result['baseline_partitions'])} earlier partitions")
+    for table, result in incomplete.items():
+        summary.append(f"- ⏳ **{table}**: incomplete, earlier partitions not validated yet "
+                       f"({', '.join(result['missing_partitions'])})")
+    
+    drifted = [
+        (table, column) for table, result in compared.items()
+        for column in result['columns'] if column['severity'] != 'stable'
+    ]
+    if drifted:
+        summary.append("\n**Drifted Columns:**")
+        icons = {"significant": "🔴", "moderate": "🟡"}
+        for table, column in drifted[:max_columns]:
+            ks = f", KS {column['ks']:.2f}" if column['ks'] is not None else ""
+            summary.append(f"- {icons[column['severity']]} {table}.{column['column']}: PSI {column['psi']:.2f}{ks}")
+        if len(drifted) > max_columns:
+            summary.append(f"- ... and {len(drifted) - max_columns} more drifted columns")
+    elif compared:
+        summary.append("- ✅ No column drifted")
     
     return "\n".join(summary)
 
@@ -263,15 +417,18 @@ def format_eda_insights(eda_insights):
     
     return "\n".join(insights)
 
-def format_quality_issues(quality_issues):
+def format_quality_issues(quality_issues, max_issues=20):
     """Format data quality issues"""
     if not quality_issues:
         return "✅ No data quality issues identified during preparation"
     
     formatted_issues = []
-    for i, issue in enumerate(quality_issues, 1):
+    for i, issue in enumerate(quality_issues[:max_issues], 1):
         formatted_issues.append(f"{i}. {issue}")
     
+    if len(quality_issues) > max_issues:
+        formatted_issues.append(f"\n... and {len(quality_issues) - max_issues} more issues")
+    
     return "\n".join(formatted_issues)
 
 # Example usage:
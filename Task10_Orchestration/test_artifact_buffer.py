@@ -0,0 +1,60 @@
+"""
+Test deferred artifact publishing: creating artifacts never calls the API, and artifacts
+fall back to JSON files when the API is unreachable or too slow
+"""
+
+import sys
+import os
+import json
+import glob
+import time
+import tempfile
+from prefect.settings import PREFECT_API_URL, temporary_settings
+
+# Add Task10 directory to path (artifact_buffer is imported as a top-level module)
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import artifact_buffer
+from artifact_buffer import create_table_artifact, create_markdown_artifact, flush_artifacts
+
+def test_artifact_fallback():
+    with tempfile.TemporaryDirectory() as tmp:
+        artifact_buffer.FALLBACK_DIR = tmp
+
+        # Unreachable API: buffering is instant, publishing falls back to disk
+        with temporary_settings({PREFECT_API_URL: "http://127.0.0.1:9/api"}):
+            started = time.perf_counter()
+            create_table_artifact(table=[{"rows": 1}], key="unit-table", description="table")
+            create_markdown_artifact(markdown="# Report", key="unit-report")
+            create_table_artifact(table=[{"rows": 2}], key="unit-table", description="table, retried")
+            assert time.perf_counter() - started < 0.5
+            stats = flush_artifacts(timeout=30)
+
+        files = glob.glob(os.path.join(tmp, "*", "*.json"))
+        assert len(files) == 2
+        written = {json.load(open(f, encoding="utf-8"))["key"]: json.load(open(f, encoding="utf-8")) for f in files}
+        assert json.loads(written["unit-table"]["data"]) == [{"rows": 2}]
+        assert written["unit-report"]["data"] == "# Report"
+        assert "API unavailable" in written["unit-report"]["reason"]
+        assert stats["written_to_disk"] >= 2
+
+        # Slow API: whatever is not published within the flush timeout goes to disk
+        original = artifact_buffer._publish_batch
+        artifact_buffer._publish_batch = lambda artifacts: time.sleep(1.0)
+        try:
+            create_markdown_artifact(markdown="first", key="slow-first")
+            flush_artifacts(timeout=0.1)
+            create_markdown_artifact(markdown="second", key="slow-second")
+            flush_artifacts(timeout=0.1)
+        finally:
+            time.sleep(1.5)
+            artifact_buffer._publish_batch = original
+        # The batch in flight when the first flush timed out is on disk too, and only once
+        assert len(glob.glob(os.path.join(tmp, "*", "*-slow-first.json"))) == 1
+        assert len(glob.glob(os.path.join(tmp, "*", "*-slow-second.json"))) == 1
+        assert not artifact_buffer._unsent
+
+    print("✅ Artifact buffer test passed")
+
+if __name__ == "__main__":
+    test_artifact_fallback()
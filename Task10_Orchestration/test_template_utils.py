@@ -0,0 +1,48 @@
+"""
+Test the compiled template cache: rendering matches str.format, edited templates are
+picked up by mtime, and oversized sections are truncated
+"""
+
+import sys
+import os
+import time
+import tempfile
+
+# Add Task10 directory to path (template_utils is imported as a top-level module)
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from template_utils import TemplateEngine, load_markdown_template, truncate_section
+
+def test_template_engine():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "report.md")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("# {title}\n\nScore: {score:.1f} {{literal}}\n\n{details}\n")
+        engine = TemplateEngine(template_dir=tmp, max_section_lines=5)
+        assert "report" in engine._cache
+
+        rendered = engine.render("report", title="Daily", score=91.234, details="- a\n- b")
+        assert rendered == "# Daily\n\nScore: 91.2 {literal}\n\n- a\n- b\n"
+
+        # A wide section is cut to max_section_lines
+        wide = "\n".join(f"- col_{i}" for i in range(1000))
+        rendered = engine.render("report", title="Wide", score=1, details=wide)
+        assert "- col_4\n" in rendered and "- col_5\n" not in rendered
+        assert "995 more lines truncated" in rendered
+
+        # Editing the file is picked up through its mtime
+        compiled = engine.get("report")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("{title} v2")
+        os.utime(path, ns=(time.time_ns(), time.time_ns() + 1_000_000))
+        assert engine.get("report") is not compiled
+        assert engine.render("report", title="Daily") == "Daily v2"
+
+    assert truncate_section("x" * 50, max_chars=10).startswith("x" * 10 + "\n\n_... 40 more characters")
+    assert load_markdown_template("no_such_template") == "Template not found: no_such_template.md"
+    assert load_markdown_template("validation_report_template").startswith("Missing template variable")
+
+    print("✅ Template engine test passed")
+
+if __name__ == "__main__":
+    test_template_engine()
@@ -0,0 +1,297 @@
+"""
+Task 2: Data Ingestion - Source Connectors
+Registry of source types behind one batch-iterator interface, so a new source is a
+configuration entry instead of another hand-written ingest_* function
+
+- "sqlite_table": one table of a SQLite database (pooled read-only connections)
+- "csv_glob": every CSV file matching a glob pattern (e.g. daily/hourly CRM drops)
+- "jsonl_glob": every JSON-lines file matching a glob pattern
+
+Glob connectors read their files on a thread pool (Arrow parsing releases the GIL) and,
+when a key is configured, deduplicate rows across files: the newest file (by sorted path,
+i.e. by drop timestamp in the file name) wins. Keys already seen are kept as a sorted array of
+64-bit hashes (8 bytes per key, searched per file without a Python-level loop).
+
+Usage:
+    connector = create_connector({"type": "csv_glob", "table": "crm",
+                                  "path": "sources/crm/*.csv", "key": "ticket_id"})
+    for batch in connector.iter_batches(columns=["ticket_id", "status"]):
+        ...
+"""
+
+import os
+import sys
+import glob
+import numpy as np
+import pandas as pd
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+
+from utils.csv_reader import read_csv, read_csv_head, iter_csv, DATE_FORMATS
+from Task2_DataIngestion.sqlite_source import get_source
+from Task2_DataIngestion.predicates import apply_filters, filter_columns, to_sql, quote_identifier
+
+try:
+    import pyarrow.json as pa_json
+except ImportError:  # pyarrow is optional; JSON lines are then read with pandas
+    pa_json = None
+
+BATCH_ROWS = 100_000
+DEFAULT_MAX_WORKERS = 4
+# Rows per CSV chunk when row filters are applied while reading a file
+CSV_CHUNK_ROWS = 100_000
+
+CONNECTOR_TYPES = {}
+
+
+def register_connector(kind):
+    """Class decorator adding a connector type to the registry under kind"""
+    def decorator(cls):
+        cls.kind = kind
+        CONNECTOR_TYPES[kind] = cls
+        return cls
+    return decorator
+
+
+def create_connector(spec):
+    """
+    Build a connector from a configuration dictionary
+
+    Args:
+        spec: {"type": <registered kind>, "table": ..., <connector arguments>}
+    """
+    spec = dict(spec)
+    kind = spec.pop("type")
+    if kind not in CONNECTOR_TYPES:
+        raise ValueError(f"Unknown connector type '{kind}' (available: {', '.join(CONNECTOR_TYPES)})")
+    return CONNECTOR_TYPES[kind](**spec)
+
+
+class Connector:
+    """
+    Base class of all connectors
+
+    Subclasses implement iter_batches; read() concatenates the batches.
+    columns and filters follow predicates.py and are pushed as far down as the source allows.
+    """
+
+    kind = None
+    # Shown in ingestion logs, e.g. "Billing data loaded from DB"
+    label = "source"
+
+    def __init__(self, table):
+        self.table = table
+
+    def iter_batches(self, columns=None, filters=None, batch_rows=BATCH_ROWS):
+        raise NotImplementedError
+
+    def read(self, columns=None, filters=None):
+        frames = list(self.iter_batches(columns, filters))
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(frames, ignore_index=True)
+
+    def sample(self, rows=1000):
+        """First rows of the source, cheap enough to run before every ingestion (schema checks)"""
+        batch = next(iter(self.iter_batches(batch_rows=rows)), None)
+        return batch.head(rows) if batch is not None else pd.DataFrame()
+
+    def source_files(self):
+        """Files the connector reads from"""
+        return []
+
+    def describe(self):
+        return {"type": self.kind, "table": self.table}
+
+
+@register_connector("sqlite_table")
+class SQLiteTableConnector(Connector):
+    """One table of a SQLite database"""
+
+    label = "DB"
+
+    def __init__(self, table, path, source_table=None):
+        super().__init__(table)
+        self.path = path
+        self.source_table = source_table or table
+
+    def iter_batches(self, columns=None, filters=None, batch_rows=BATCH_ROWS):
+        select = ", ".join(quote_identifier(column) for column in columns) if columns else "*"
+        where, params = to_sql(filters)
+        sql = f"SELECT {select} FROM {quote_identifier(self.source_table)}" + (f" WHERE {where}" if where else "")
+        yield from get_source(self.path).iter_query(sql, params, batch_rows)
+
+    def read(self, columns=None, filters=None):
+        # Whole tables use the parallel rowid-range reader
+        return get_source(self.path).read_table(self.source_table, columns=columns, filters=filters)
+
+    def sample(self, rows=1000):
+        return get_source(self.path).query(f"SELECT * FROM {quote_identifier(self.source_table)} LIMIT ?", (rows,))
+
+    def source_files(self):
+        return [self.path]
+
+    def describe(self):
+        return dict(super().describe(), path=self.path, source_table=self.source_table)
+
+
+class GlobConnector(Connector):
+    """
+    Files matching a glob pattern, read in parallel, one batch per file
+
+    Args:
+        table: Table name the rows are ingested as
+        path: File or glob pattern (relative patterns are resolved against the project root)
+        key: Column identifying a row; duplicates across files keep the newest file's row
+        max_workers: Files read concurrently
+    """
+
+    def __init__(self, table, path, key=None, max_workers=DEFAULT_MAX_WORKERS):
+        super().__init__(table)
+        self.path = path if os.path.isabs(path) else os.path.join(project_root, path)
+        self.key = key
+        self.max_workers = max_workers
+
+    def files(self):
+        files = sorted(glob.glob(self.path))
+        if not files:
+            raise FileNotFoundError(f"No {self.table} files match {self.path}")
+        return files
+
+    def _read_file(self, path, usecols, filters):
+        """Rows of one file matching filters (runs on the worker threads)"""
+        raise NotImplementedError
+
+    def _read_head(self, path, rows):
+        raise NotImplementedError
+
+    def sample(self, rows=1000):
+        # The newest drop is the one most likely to carry a changed schema
+        return self._read_head(self.files()[-1], rows)
+
+    def iter_batches(self, columns=None, filters=None, batch_rows=BATCH_ROWS):
+        """
+        Batches of matching rows; with a key, newest file first and every key only once.
+        Without a key, filters are applied while each file is read; with a key they are
+        applied after deduplication, so they see only the newest version of a row.
+        (batch_rows is not used: every file is one batch.)
+        """
+        usecols = None
+        if columns:
+            usecols = list(dict.fromkeys(list(columns) + filter_columns(filters) + ([self.key] if self.key else [])))
+        files = self.files()[::-1] if self.key else self.files()
+        # Sorted 64-bit hashes of the keys of newer files: a vectorized binary search per file
+        seen = np.empty(0, dtype=np.uint64)
+
+        def finish(frame):
+            nonlocal seen
+            if self.key:
+                frame = frame.drop_duplicates(self.key, keep="last")
+                hashes = pd.util.hash_pandas_object(frame[self.key], index=False, categorize=False).to_numpy()
+                # Query in sorted order: the binary searches then walk seen sequentially
+                order = np.argsort(hashes)
+                wanted = hashes[order]
+                positions = np.searchsorted(seen, wanted)
+                new = np.ones(len(hashes), dtype=bool)
+                if len(seen):
+                    new[order] = seen[np.minimum(positions, len(seen) - 1)] != wanted
+                frame = frame[new]
+                # Merge the new hashes in at their search positions: one copy of seen per file
+                # instead of sorting it again
+                fresh = new[order]
+                seen = np.insert(seen, positions[fresh], wanted[fresh])
+                frame = apply_filters(frame, filters)
+            return frame[list(columns)] if columns else frame
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            in_flight = deque()
+            for path in files:
+                in_flight.append(pool.submit(self._read_file, path, usecols, None if self.key else filters))
+                # Bound the files held in memory to two per worker
+                if len(in_flight) >= 2 * self.max_workers:
+                    yield finish(in_flight.popleft().result())
+            while in_flight:
+                yield finish(in_flight.popleft().result())
+
+    def read(self, columns=None, filters=None):
+        frames = list(self.iter_batches(columns, filters))
+        # Batches come newest file first when deduplicating; return rows in file order
+        return pd.concat(frames[::-1] if self.key else frames, ignore_index=True)
+
+    def source_files(self):
+        return self.files()
+
+    def describe(self):
+        return dict(super().describe(), path=self.path, key=self.key)
+
+
+@register_connector("csv_glob")
+class CSVGlobConnector(GlobConnector):
+    """CSV files matching a glob pattern (dates parsed during the read, see utils/csv_reader.py)"""
+
+    label = "CSV"
+
+    def _read_file(self, path, usecols, filters):
+        if not filters:
+            return read_csv(path, usecols=usecols)
+        # Keep only matching rows of each chunk so a large file is never held in memory whole
+        chunks = [apply_filters(chunk, filters) for chunk in iter_csv(path, CSV_CHUNK_ROWS, usecols=usecols)]
+        return pd.concat(chunks, ignore_index=True) if chunks else read_csv(path, usecols=usecols).iloc[:0]
+
+    def _read_head(self, path, rows):
+        return read_csv_head(path, rows)
+
+
+@register_connector("jsonl_glob")
+class JSONLinesConnector(GlobConnector):
+    """JSON-lines files matching a glob pattern"""
+
+    label = "JSON lines"
+
+    def _read_file(self, path, usecols, filters):
+        if pa_json is not None:
+            frame = pa_json.read_json(path).to_pandas()
+        else:
+            frame = pd.read_json(path, lines=True, dtype=False, convert_dates=False)
+        if usecols is not None:
+            frame = frame[[column for column in frame.columns if column in set(usecols)]]
+        return apply_filters(self._parse_dates(frame), filters)
+
+    def _read_head(self, path, rows):
+        return self._parse_dates(pd.read_json(path, lines=True, nrows=rows, dtype=False, convert_dates=False))
+
+    @staticmethod
+    def _parse_dates(frame):
+        # Same date handling as the CSV reader: explicit formats, text left as is if it does not parse
+        for column, date_format in DATE_FORMATS.items():
+            if column not in frame.columns:
+                continue
+            if pd.api.types.is_datetime64_any_dtype(frame[column]):
+                frame[column] = frame[column].astype("datetime64[us]")
+            else:
+                try:
+                    frame[column] = pd.to_datetime(frame[column], format=date_format)
+                except (ValueError, TypeError):
+                    pass
+        return frame
+
+
+def default_sources(db_file=None, crm_file=None):
+    """
+    Connectors of the pipeline's sources
+
+    Args:
+        db_file: SQLite database of billing/subscriptions (defaults to sources/telecom.db)
+        crm_file: CRM CSV file or glob of CRM drops (defaults to sources/crm*.csv)
+    """
+    sources_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sources")
+    db_file = db_file or os.path.join(sources_dir, "telecom.db")
+    return [
+        SQLiteTableConnector("billing", db_file),
+        SQLiteTableConnector("subscriptions", db_file),
+        CSVGlobConnector("crm", crm_file or os.path.join(sources_dir, "crm*.csv"), key="ticket_id")
+    ]
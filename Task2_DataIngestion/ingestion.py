@@ -1,108 +1,96 @@
 import os
-import sqlite3
-import pandas as pd
 from datetime import date
+from concurrent.futures import ThreadPoolExecutor
 import sys
-import os
 
 # Add project root to path
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.append(project_root)
 print(sys.path)
 from utils.logger import get_logger
+from utils.metrics import track_stage, file_size, current_stage
+from Task2_DataIngestion.connectors import SQLiteTableConnector, CSVGlobConnector, default_sources, create_connector
 db_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "sources", "telecom.db"))
+# CRM exports arrive as one or more CSV drops (crm.csv, crm_2024-08-16.csv, ...)
+crm_path = os.path.join(os.path.dirname(__file__), "sources", "crm*.csv")
 log_file_path = os.path.join(project_root, "logs","ingestion.log")
 
-def ingest_billing_data():
-    """Read billing data from DB and return DataFrame for pipeline use"""
-    
-    logger = get_logger("billing", log_file=log_file_path)
+def ingest_source(connector, columns=None, filters=None, parent_stage=None):
+    """
+    Read one source through its connector and return DataFrame for pipeline use
 
-    try:
-        conn = sqlite3.connect(db_path)
-        df = pd.read_sql_query("SELECT * FROM billing", conn)
-        conn.close()
-        
-        logger.info(f"Billing data loaded from DB: {len(df)} records")
-        return {
-            "data": df,
-            "table": "billing",
-            "records": len(df),
-            "ingestion_date": date.today().isoformat()
-        }
-    except Exception as e:
-        logger.error(f"Failed to ingest billing data: {e}")
-        raise
+    Args:
+        connector: Connector instance or connector spec (see connectors.py)
+        columns: Columns to read (default: all)
+        filters: Row predicates pushed into the source read, e.g. {"customer_id": ("CUST100", "CUST200")}
+        parent_stage: Metrics stage this read belongs to when it runs on a worker thread
+    """
+    if isinstance(connector, dict):
+        connector = create_connector(connector)
+    logger = get_logger(connector.table, log_file=log_file_path)
 
-def ingest_subscriptions_data():
-    """Read subscriptions data from DB and return DataFrame for pipeline use"""
-    logger = get_logger("subscriptions", log_file=log_file_path)
     try:
-        conn = sqlite3.connect(db_path)
-        df = pd.read_sql_query("SELECT * FROM subscriptions", conn)
-        conn.close()
-        
-        logger.info(f"Subscriptions data loaded from DB: {len(df)} records")
-        return {
-            "data": df,
-            "table": "subscriptions",
-            "records": len(df),
-            "ingestion_date": date.today().isoformat()
-        }
-    except Exception as e:
-        logger.error(f"Failed to ingest subscriptions data: {e}")
-        raise
+        with track_stage(f"ingestion.{connector.table}", parent=parent_stage) as m:
+            df = connector.read(columns=columns, filters=filters)
+            m.bytes_read = sum(file_size(path) for path in connector.source_files())
+            m.rows_out = len(df)
 
-def ingest_crm_data():
-    """Read CRM data from CSV and return DataFrame for pipeline use"""
-    logger = get_logger("crm", log_file=log_file_path)
-    try:
-        # Path to CRM CSV file
-        crm_path = os.path.join(os.path.dirname(__file__), "sources", "crm.csv")
-        
-        if not os.path.exists(crm_path):
-            raise FileNotFoundError(f"CRM data file not found: {crm_path}")
-        
-        # Read CRM data from CSV
-        df = pd.read_csv(crm_path)
-        
-        # Convert datetime column
-        df['created_at'] = pd.to_datetime(df['created_at'])
-        
-        logger.info(f"CRM data loaded from CSV: {len(df)} records")
+        logger.info(f"{connector.table} data loaded from {connector.label}: {len(df)} records")
         return {
             "data": df,
-            "table": "crm",
+            "table": connector.table,
             "records": len(df),
             "ingestion_date": date.today().isoformat()
         }
     except Exception as e:
-        logger.error(f"Failed to ingest CRM data: {e}")
+        logger.error(f"Failed to ingest {connector.table} data: {e}")
         raise
 
-def ingest_all_data():
+def ingest_billing_data(source_path=None, columns=None, filters=None):
+    """Read billing data from DB (defaults to sources/telecom.db) and return DataFrame for pipeline use"""
+    return ingest_source(SQLiteTableConnector("billing", source_path or db_path), columns, filters)
+
+def ingest_subscriptions_data(source_path=None, columns=None, filters=None):
+    """Read subscriptions data from DB (defaults to sources/telecom.db) and return DataFrame for pipeline use"""
+    return ingest_source(SQLiteTableConnector("subscriptions", source_path or db_path), columns, filters)
+
+def ingest_crm_data(source_path=None, columns=None, filters=None):
+    """Read CRM data from a CSV file or glob of CSV drops (deduplicated by ticket_id) and return DataFrame for pipeline use"""
+    return ingest_source(CSVGlobConnector("crm", source_path or crm_path, key="ticket_id"), columns, filters)
+
+def ingest_all_data(db_file=None, crm_file=None, columns=None, filters=None, sources=None):
     """
     Ingest all data sources and return combined results for pipeline use
+    Sources are read concurrently, so adding one does not add its read time to the total.
+    
+    Args:
+        db_file: Optional SQLite database to read billing/subscriptions from (defaults to sources/telecom.db)
+        crm_file: Optional CRM CSV file or glob of CSV drops (defaults to sources/crm*.csv)
+        columns: Optional columns to read per table, e.g. {"billing": ["customer_id", "amount_due"]}
+        filters: Optional row predicates per table, e.g. {"billing": {"invoice_date": ("2024-08-01", None)}}
+        sources: Optional connectors or connector specs replacing the default sources
     """
+    columns = columns or {}
+    filters = filters or {}
+    connectors = [create_connector(source) if isinstance(source, dict) else source
+                  for source in (sources or default_sources(db_file, crm_file))]
 
     logger = get_logger("ingestion", log_file=log_file_path)
 
     try:
         logger.info("Starting data ingestion for all data sources...")
 
-        
-        # Ingest billing data (from SQLite DB)
-        billing_data = ingest_billing_data()
-        
-        # Ingest subscriptions data (from SQLite DB)
-        subscriptions_data = ingest_subscriptions_data()
-        
-        # Ingest CRM data (from CSV)
-        crm_data = ingest_crm_data()
-        
-        # Combine results
-        all_data = [billing_data, subscriptions_data, crm_data]
-        total_records = sum(data['records'] for data in all_data)
+        with track_stage("ingestion") as m:
+            with ThreadPoolExecutor(max_workers=len(connectors)) as pool:
+                futures = [
+                    pool.submit(ingest_source, connector, columns.get(connector.table), filters.get(connector.table), current_stage())
+                    for connector in connectors
+                ]
+                all_data = [future.result() for future in futures]
+
+            total_records = sum(data['records'] for data in all_data)
+            m.rows_out = total_records
+            m.bytes_read = sum(file_size(path) for path in {path for connector in connectors for path in connector.source_files()})
         
         result = {
             'data': all_data,
@@ -111,7 +99,7 @@ def ingest_all_data():
         }
         
         logger.info(f"All data ingested successfully. Sources: {len(all_data)}, Total records: {total_records}")
-        logger.info(f"Data sources: billing ({billing_data['records']}), subscriptions ({subscriptions_data['records']}), crm ({crm_data['records']})")
+        logger.info("Data sources: " + ", ".join(f"{data['table']} ({data['records']})" for data in all_data))
         
         return result
         
@@ -121,4 +109,3 @@ def ingest_all_data():
 
 if __name__ == "__main__":
     ingest_all_data()
-    
\ No newline at end of file
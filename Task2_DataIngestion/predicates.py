@@ -0,0 +1,112 @@
+"""
+Task 2: Data Ingestion - Row Predicates
+One filter specification pushed down to every source type: rendered as a SQL WHERE clause
+for SQLite tables and applied chunk by chunk while reading CSV files
+
+Filters are a dictionary of column -> condition:
+    {"customer_id": "CUST001"}                          equality
+    {"status": ["active", "suspended"]}                 membership
+    {"invoice_date": ("2024-08-01", "2024-09-01")}      half-open range low <= value < high
+    {"customer_id": ("CUST100", None)}                  open-ended range (None = unbounded)
+Dates and datetimes are compared as ISO text, which is how the sources store them; on
+DataFrame columns already parsed as datetimes the values are compared as timestamps.
+Rows where a filtered column is NULL never match.
+"""
+
+from datetime import date, datetime
+
+import pandas as pd
+
+
+def quote_identifier(identifier):
+    return '"' + str(identifier).replace('"', '""') + '"'
+
+
+def _value(value):
+    """Sources hold dates as ISO strings, so compare against the same representation"""
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def _condition(condition):
+    """Normalize a condition into ("eq" | "in" | "range", values)"""
+    if isinstance(condition, tuple):
+        if len(condition) != 2:
+            raise ValueError(f"Range filters take (low, high), got {condition!r}")
+        return "range", tuple(_value(bound) for bound in condition)
+    if isinstance(condition, (list, set, frozenset)):
+        return "in", [_value(value) for value in condition]
+    return "eq", _value(condition)
+
+
+def filter_columns(filters):
+    """Columns a filter specification reads"""
+    return list(filters or {})
+
+
+def to_sql(filters):
+    """
+    Render filters as a parameterized WHERE clause
+
+    Returns:
+        (clause without the WHERE keyword, or None when there are no filters, parameters)
+    """
+    clauses, params = [], []
+    for column, condition in (filters or {}).items():
+        kind, values = _condition(condition)
+        name = quote_identifier(column)
+        if kind == "eq":
+            clauses.append(f"{name} = ?")
+            params.append(values)
+        elif kind == "in":
+            if not values:
+                clauses.append("0")
+                continue
+            clauses.append(f"{name} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+        else:
+            low, high = values
+            if low is not None:
+                clauses.append(f"{name} >= ?")
+                params.append(low)
+            if high is not None:
+                clauses.append(f"{name} < ?")
+                params.append(high)
+    return (" AND ".join(clauses) if clauses else None), params
+
+
+def _timestamps(kind, values):
+    """Filter values as timestamps, for columns parsed as dates while reading (see utils/csv_reader.py)"""
+    if kind == "in":
+        return list(pd.to_datetime(values))
+    if kind == "range":
+        return tuple(None if bound is None else pd.Timestamp(bound) for bound in values)
+    return pd.Timestamp(values)
+
+
+def apply_filters(df, filters):
+    """Rows of a DataFrame (chunk) matching the filters, with the same semantics as to_sql"""
+    if not filters or df.empty:
+        return df
+    mask = None
+    for column, condition in filters.items():
+        kind, values = _condition(condition)
+        series = df[column]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            values = _timestamps(kind, values)
+        if kind == "eq":
+            matches = series == values
+        elif kind == "in":
+            matches = series.isin(values)
+        else:
+            low, high = values
+            matches = series.notna()
+            if low is not None:
+                matches &= series >= low
+            if high is not None:
+                matches &= series < high
+        mask = matches if mask is None else mask & matches
+    return df[mask.fillna(False).astype(bool)]
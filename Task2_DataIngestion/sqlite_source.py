@@ -0,0 +1,200 @@
+"""
+Task 2: Data Ingestion - SQLite Source Connections
+Pooled, read-only, tuned connections to SQLite source databases (sources/telecom.db)
+
+- Connections are opened in read-only URI mode (file:...?mode=ro) with query_only set,
+  so ingestion can never modify a source
+- mmap_size / cache_size pragmas let SQLite read pages through the OS page cache instead of
+  copying them through its own buffers
+- One pool per database file is shared by every table ingested from it
+- Column lists and row filters are pushed into the SELECT, so only the needed data is read
+- Large tables are split into rowid ranges that are read concurrently on separate connections
+  (SQLite releases the GIL while stepping through pages)
+"""
+
+import os
+import sys
+import queue
+import sqlite3
+import threading
+import pandas as pd
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+
+from Task2_DataIngestion.predicates import to_sql, quote_identifier
+
+DEFAULT_PRAGMAS = {
+    "query_only": 1,
+    "mmap_size": 268435456,      # 256 MB memory-mapped reads
+    "cache_size": -65536,        # 64 MB page cache per connection
+    "temp_store": "MEMORY"
+}
+DEFAULT_POOL_SIZE = 4
+# Longest wait (seconds) for a connection while all pool_size connections are borrowed
+DEFAULT_BORROW_TIMEOUT = 300
+# Tables with fewer rows are read with a single query
+PARTITION_MIN_ROWS = 500_000
+
+
+class SQLiteSource:
+    """
+    Pool of read-only connections to one SQLite database
+
+    Args:
+        db_path: Database file
+        pool_size: Most connections held open (and most concurrent range reads)
+        pragmas: PRAGMA overrides applied to every connection (merged into DEFAULT_PRAGMAS)
+        timeout: Seconds to wait for a connection when all of them are borrowed
+
+    Usage:
+        source = get_source("sources/telecom.db")
+        billing = source.read_table("billing")
+    """
+
+    def __init__(self, db_path, pool_size=DEFAULT_POOL_SIZE, pragmas=None, timeout=DEFAULT_BORROW_TIMEOUT):
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(f"SQLite source not found: {db_path}")
+        self.db_path = os.path.abspath(db_path)
+        self.pool_size = pool_size
+        self.pragmas = dict(DEFAULT_PRAGMAS, **(pragmas or {}))
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        uri = "file:" + self.db_path.replace("?", "%3f").replace("#", "%23") + "?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Borrow a pooled connection (opened lazily, at most pool_size at a time)"""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._opened < self.pool_size
+                if can_open:
+                    self._opened += 1
+            if can_open:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    # The slot was never filled: give it back so later borrows can open one
+                    with self._lock:
+                        self._opened -= 1
+                    raise
+            else:
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise TimeoutError(
+                        f"No connection to {self.db_path} was returned within {self.timeout}s "
+                        f"(all {self.pool_size} are borrowed)"
+                    ) from None
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        """Close the idle connections; borrowed ones return to the pool and stay counted"""
+        closed = 0
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+            closed += 1
+        with self._lock:
+            self._opened -= closed
+
+    def query(self, sql, params=()):
+        """Run one query on a pooled connection into a DataFrame"""
+        with self.connection() as conn:
+            cursor = conn.execute(sql, params)
+            columns = [description[0] for description in cursor.description]
+            return pd.DataFrame.from_records(cursor.fetchall(), columns=columns)
+
+    def iter_query(self, sql, params=(), batch_rows=100_000):
+        """Run one query and yield its result as DataFrames of at most batch_rows rows"""
+        with self.connection() as conn:
+            cursor = conn.execute(sql, params)
+            columns = [description[0] for description in cursor.description]
+            while True:
+                rows = cursor.fetchmany(batch_rows)
+                if not rows:
+                    break
+                yield pd.DataFrame.from_records(rows, columns=columns)
+
+    def _rowid_bounds(self, table):
+        """(min rowid, max rowid), or None for WITHOUT ROWID tables and views"""
+        try:
+            with self.connection() as conn:
+                return conn.execute(f"SELECT min(rowid), max(rowid) FROM {quote_identifier(table)}").fetchone()
+        except sqlite3.OperationalError:
+            return None
+
+    def read_table(self, table, columns=None, filters=None, partitions=None):
+        """
+        Read a table, selecting only the requested columns and rows
+
+        Args:
+            table: Table name
+            columns: Columns to select (default: all)
+            filters: Row predicates pushed into the WHERE clause (see predicates.py)
+            partitions: Concurrent rowid-range reads (default: 1 below PARTITION_MIN_ROWS rows,
+                else pool_size)
+
+        Returns:
+            DataFrame in rowid order
+        """
+        select = ", ".join(quote_identifier(col) for col in columns) if columns else "*"
+        sql = f"SELECT {select} FROM {quote_identifier(table)}"
+        where, params = to_sql(filters)
+
+        bounds = self._rowid_bounds(table) if partitions != 1 else None
+        if not bounds or bounds[0] is None:
+            return self.query(f"{sql} WHERE {where}" if where else sql, params)
+
+        low, high = bounds
+        if partitions is None:
+            partitions = self.pool_size if high - low + 1 >= PARTITION_MIN_ROWS else 1
+        if partitions <= 1:
+            return self.query(f"{sql} WHERE {where}" if where else sql, params)
+
+        # Equal rowid ranges; each is a primary-key range scan on its own connection
+        step = -(-(high - low + 1) // partitions)
+        ranges = [(start, min(start + step - 1, high)) for start in range(low, high + 1, step)]
+        range_sql = f"{sql} WHERE rowid BETWEEN ? AND ?" + (f" AND ({where})" if where else "") + " ORDER BY rowid"
+        with ThreadPoolExecutor(max_workers=min(partitions, self.pool_size)) as pool:
+            parts = list(pool.map(lambda bounds: self.query(range_sql, (*bounds, *params)), ranges))
+        return pd.concat(parts, ignore_index=True)
+
+
+_sources = {}
+_sources_lock = threading.Lock()
+
+
+def get_source(db_path, **kwargs):
+    """Shared SQLiteSource per database file, so every table read from it reuses one pool"""
+    key = os.path.abspath(db_path)
+    with _sources_lock:
+        if key not in _sources:
+            _sources[key] = SQLiteSource(key, **kwargs)
+        return _sources[key]
+
+
+def close_sources():
+    """Close every pooled source connection"""
+    with _sources_lock:
+        for source in _sources.values():
+            source.close()
+        _sources.clear()
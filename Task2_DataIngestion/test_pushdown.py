@@ -0,0 +1,90 @@
+"""
+Test projection and predicate pushdown: the same column lists and row filters give the same
+rows from SQLite (rendered as SQL) and from CSV (applied per chunk)
+"""
+
+import sys
+import os
+import sqlite3
+import tempfile
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import Task2_DataIngestion.connectors as connectors
+from Task2_DataIngestion.ingestion import ingest_billing_data, ingest_crm_data, ingest_source
+from Task2_DataIngestion.predicates import apply_filters
+
+def test_pushdown():
+    billing = pd.DataFrame({
+        "invoice_id": [f"INV{i:03d}" for i in range(60)],
+        "customer_id": [f"CUST{i % 12:03d}" for i in range(60)],
+        "amount_due": [float(i) for i in range(60)],
+        "payment_status": ["paid", "unpaid", None] * 20,
+        "invoice_date": [f"2024-{i % 6 + 6:02d}-15" for i in range(60)]
+    })
+    crm = pd.DataFrame({
+        "ticket_id": [f"TKT{i:03d}" for i in range(60)],
+        "customer_id": billing["customer_id"],
+        "created_at": [f"2024-{i % 6 + 6:02d}-15 10:30:00" for i in range(60)],
+        "request_type": ["disconnect", "complaint", "upgrade"] * 20
+    })
+    filters = {"invoice_date": ("2024-08-01", "2024-10-01"), "customer_id": ("CUST003", None)}
+
+    metrics_file = os.environ.get("DMML_METRICS_FILE")
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DMML_METRICS_FILE"] = os.path.join(tmp, "metrics.jsonl")
+        try:
+            db_file = os.path.join(tmp, "telecom.db")
+            with sqlite3.connect(db_file) as conn:
+                billing.to_sql("billing", conn, index=False)
+            crm_file = os.path.join(tmp, "crm.csv")
+            crm.to_csv(crm_file, index=False)
+
+            # SQL: only the requested columns and matching rows come back
+            result = ingest_billing_data(db_file, columns=["invoice_id", "amount_due"], filters=filters)["data"]
+            mask = billing["invoice_date"].between("2024-08-01", "2024-09-30") & (billing["customer_id"] >= "CUST003")
+            assert list(result.columns) == ["invoice_id", "amount_due"]
+            assert result["invoice_id"].tolist() == billing.loc[mask, "invoice_id"].tolist()
+
+            unpaid = ingest_billing_data(db_file, filters={"payment_status": ["unpaid"]})["data"]
+            assert len(unpaid) == 20 and set(unpaid["payment_status"]) == {"unpaid"}
+
+            # CSV: filtered per chunk (without a dedup key) or after dedup, filter columns dropped unless requested
+            crm_filters = {"created_at": ("2024-08-01", "2024-10-01"), "customer_id": ("CUST003", None)}
+            chunk_rows, connectors.CSV_CHUNK_ROWS = connectors.CSV_CHUNK_ROWS, 7
+            try:
+                chunked = ingest_source(connectors.CSVGlobConnector("crm", crm_file), ["ticket_id", "created_at"], crm_filters)["data"]
+            finally:
+                connectors.CSV_CHUNK_ROWS = chunk_rows
+            tickets = ingest_crm_data(crm_file, columns=["ticket_id", "created_at"], filters=crm_filters)["data"]
+            pd.testing.assert_frame_equal(chunked, tickets)
+            assert list(tickets.columns) == ["ticket_id", "created_at"]
+            assert tickets["ticket_id"].str[3:].tolist() == billing.loc[mask, "invoice_id"].str[3:].tolist()
+            assert str(tickets["created_at"].dtype).startswith("datetime64")
+
+            # Datetime columns (parsed while reading) match equality, list and range filters like SQL does
+            with sqlite3.connect(db_file) as conn:
+                crm.to_sql("crm", conn, index=False)
+            created = ["2024-08-15 10:30:00", "2024-09-15 10:30:00"]
+            for condition in (created[0], created, (created[0], "2024-09-01")):
+                from_csv = ingest_crm_data(crm_file, filters={"created_at": condition})["data"]
+                from_sql = ingest_source(connectors.SQLiteTableConnector("crm", db_file), None, {"created_at": condition})["data"]
+                assert len(from_csv) == (20 if isinstance(condition, list) else 10)
+                assert sorted(from_csv["ticket_id"]) == sorted(from_sql["ticket_id"])
+            parsed = crm.assign(created_at=pd.to_datetime(crm["created_at"]))
+            assert len(apply_filters(parsed, {"created_at": [created[0]]})) == 10
+
+            none = ingest_crm_data(crm_file, filters={"request_type": "unknown"})["data"]
+            assert none.empty and "request_type" in none.columns
+        finally:
+            if metrics_file is None:
+                os.environ.pop("DMML_METRICS_FILE", None)
+            else:
+                os.environ["DMML_METRICS_FILE"] = metrics_file
+
+    print("✅ Pushdown test passed")
+
+if __name__ == "__main__":
+    test_pushdown()
@@ -0,0 +1,71 @@
+"""
+Test pooled SQLite source reads: connections are read-only, range-partitioned reads return
+the same frame as a single query and connections are reused across reads
+"""
+
+import sys
+import os
+import sqlite3
+import tempfile
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Task2_DataIngestion.sqlite_source import SQLiteSource
+
+def test_sqlite_source():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "telecom.db")
+        conn = sqlite3.connect(db_file)
+        conn.execute("CREATE TABLE billing (invoice_id TEXT, customer_id TEXT, amount_due REAL, billing_date TEXT)")
+        conn.executemany("INSERT INTO billing VALUES (?, ?, ?, ?)", [
+            (f"INV{i:05d}", f"CUST{i % 37:03d}", i * 1.5, f"2025-01-{i % 28 + 1:02d}") for i in range(1000)
+        ])
+        conn.commit()
+        conn.close()
+
+        source = SQLiteSource(db_file, pool_size=3)
+        expected = pd.read_sql_query("SELECT * FROM billing", sqlite3.connect(db_file))
+
+        single = source.read_table("billing", partitions=1)
+        partitioned = source.read_table("billing", partitions=3)
+        pd.testing.assert_frame_equal(single, expected)
+        pd.testing.assert_frame_equal(partitioned, expected)
+        assert list(source.read_table("billing", columns=["invoice_id"]).columns) == ["invoice_id"]
+
+        # Connections are pooled, never more than pool_size
+        assert 1 <= source._opened <= 3
+        with source.connection() as first, source.connection() as second:
+            assert first is not second
+
+        # Sources can never be written to
+        try:
+            with source.connection() as conn:
+                conn.execute("DELETE FROM billing")
+            assert False, "read-only connection must refuse writes"
+        except sqlite3.OperationalError:
+            pass
+
+        # Closing while a connection is borrowed only uncounts the idle connections it closed
+        with source.connection():
+            source.close()
+            assert source._opened == 1
+        source.close()
+        assert source._opened == 0
+
+        # Failed connects give their slot back: more failures than pool_size still raise, never hang
+        unopened = SQLiteSource(db_file, pool_size=2, timeout=5)
+        os.remove(db_file)
+        for _ in range(3):
+            try:
+                unopened.query("SELECT 1")
+                assert False, "connecting to a deleted database must fail"
+            except sqlite3.OperationalError:
+                pass
+        assert unopened._opened == 0
+
+    print("✅ SQLite source test passed")
+
+if __name__ == "__main__":
+    test_sqlite_source()
@@ -12,16 +12,18 @@ import sys
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.append(project_root)
 from utils.logger import get_logger
+from utils.metrics import track_stage, file_size
 
 logger = get_logger("data_storage", log_file=os.path.join(project_root, "logs", "data_storage.log"))
 
-def store_dataframe_to_raw(data_dict, table_name=None):
+def store_dataframe_to_raw(data_dict, table_name=None, data_root=None):
     """
     Store a DataFrame to the raw data storage with proper partitioning
     
     Args:
         data_dict: Dictionary containing 'data' (DataFrame) and metadata
         table_name: Optional override for table name (uses data_dict['table'] if not provided)
+        data_root: Optional data lake root (defaults to <project root>/data)
     
     Returns:
         Dictionary with storage results and metadata
@@ -33,14 +35,17 @@ def store_dataframe_to_raw(data_dict, table_name=None):
         ingestion_date = data_dict.get('ingestion_date', date.today().isoformat())
         
         # Create partitioned directory structure (relative to project root)
-        out_dir = os.path.join(project_root, "data", "raw", table, f"dt={ingestion_date}")
+        out_dir = os.path.join(data_root or os.path.join(project_root, "data"), "raw", table, f"dt={ingestion_date}")
         os.makedirs(out_dir, exist_ok=True)
         
         # Define output file path
         out_file = os.path.join(out_dir, f"{table}.csv")
         
         # Write DataFrame to CSV
-        df.to_csv(out_file, index=False)
+        with track_stage(f"storage.{table}") as m:
+            df.to_csv(out_file, index=False)
+            m.rows_in = m.rows_out = len(df)
+            m.bytes_written = file_size(out_file)
         
         # Log success
         logger.info(f"Data stored successfully: {out_file} ({len(df)} records)")
@@ -58,12 +63,14 @@ def store_dataframe_to_raw(data_dict, table_name=None):
         logger.error(f"Failed to store {table} data: {e}")
         raise
 
-def store_multiple_tables(ingested_data):
+def store_multiple_tables(ingested_data, partition_date=None, data_root=None):
     """
     Store multiple tables from ingestion results
     
     Args:
         ingested_data: Dictionary containing multiple table data
+        partition_date: Optional dt= partition override (uses each source's ingestion_date if not provided)
+        data_root: Optional data lake root (defaults to <project root>/data)
         
     Returns:
         Dictionary with all storage results
@@ -72,10 +79,15 @@ def store_multiple_tables(ingested_data):
     
     try:
         
-        for source in ingested_data:
-            logger.info(f"Storing {source['table']} data...")
-            result = store_dataframe_to_raw(source, source['table'])
-            storage_results[source['table']] = result
+        with track_stage("storage") as m:
+            for source in ingested_data:
+                logger.info(f"Storing {source['table']} data...")
+                if partition_date:
+                    source = {**source, "ingestion_date": partition_date}
+                result = store_dataframe_to_raw(source, source['table'], data_root=data_root)
+                storage_results[source['table']] = result
+            m.rows_in = m.rows_out = sum(r["records_stored"] for r in storage_results.values())
+            m.bytes_written = sum(file_size(r["file_path"]) for r in storage_results.values())
         
         logger.info(f"All tables stored successfully: {list(storage_results.keys())}")
         return {
@@ -15,6 +15,10 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.append(project_root)
 
 from utils.logger import get_logger
+from utils.metrics import track_stage, file_size
+from utils.csv_reader import read_csv
+from Task4_DataValidation.referential_integrity import check_referential_integrity, integrity_issues
+from Task4_DataValidation.drift_monitoring import monitor_drift, drift_issues, SketchStore
 
 # Initialize logger
 logger = get_logger("data_validation", log_file=os.path.join(project_root, "logs", "data_validation.log"))
@@ -22,17 +26,19 @@ logger = get_logger("data_validation", log_file=os.path.join(project_root, "logs
 class DataValidator:
     """Data validation and quality assessment class"""
     
-    def __init__(self, date):
+    def __init__(self, date, data_root=None):
         self.validation_results = {}
         self.issues_found = []
         self.data_quality_score = 0
         self.file_date = date
+        self.data_root = data_root or os.path.join(project_root, "data")
+        self.bytes_read = 0
     
     def load_data(self):
         """Load the most recent data from the data lake"""
         try:
             data = {}
-            data_root = os.path.join(project_root, "data", "raw")
+            data_root = os.path.join(self.data_root, "raw")
         
             
             # Load data from latest partition
@@ -41,7 +47,8 @@ class DataValidator:
                 if os.path.isdir(table_path):
                     csv_files = glob.glob(os.path.join(table_path, "*.csv"))
                     if csv_files:
-                        data[table_dir] = pd.read_csv(csv_files[0])
+                        data[table_dir] = read_csv(csv_files[0])
+                        self.bytes_read += file_size(csv_files[0])
                         logger.info(f"Loaded {table_dir}: {data[table_dir].shape}")
                 else:
                     logger.warning(f"File for given date {self.file_date} not found for {table_dir}")
@@ -287,6 +294,25 @@ class DataValidator:
         
         return business_validation
     
+    def validate_referential_integrity(self, data):
+        """Check foreign keys between tables and record orphaned keys as issues"""
+        results = check_referential_integrity(data)
+        self.issues_found.extend(integrity_issues(results))
+        return results
+    
+    def validate_drift(self, data):
+        """Sketch this partition and compare it with the previous ones; significant drift is an issue"""
+        store = SketchStore(os.path.join(self.data_root, "drift_sketches"))
+        # Every raw partition is expected to be sketched, so ones not validated yet show up as missing
+        raw_root = os.path.join(self.data_root, "raw")
+        expected = {
+            table: [os.path.basename(path)[3:] for path in glob.glob(os.path.join(raw_root, table, "dt=*"))]
+            for table in data
+        }
+        results = monitor_drift(data, self.file_date, store=store, expected_partitions=expected)
+        self.issues_found.extend(drift_issues(results))
+        return results
+    
     def calculate_data_quality_score(self):
         """Calculate overall data quality score"""
         total_score = 100
@@ -329,31 +355,58 @@ class DataValidator:
         else:
             return "CRITICAL - Major data quality issues require immediate attention"
 
-def validate_all_data(validation_date):
-    """Main validation function"""
+def validate_all_data(validation_date, data_root=None):
+    """
+    Main validation function
+    
+    Args:
+        validation_date: dt= partition to validate
+        data_root: Optional data lake root (defaults to <project root>/data)
+    """
     logger.info("Starting comprehensive data validation...")
-    validator = DataValidator(date=validation_date)
+    validator = DataValidator(date=validation_date, data_root=data_root)
     
     try:
-        # Load data
-        data = validator.load_data()
-        logger.info(f"Loaded {len(data)} tables for validation")
-        
-        # Run validation checks for each table
-        for table_name, df in data.items():
-            logger.info(f"Validating {table_name}...")
+        with track_stage("validation", partition_date=validation_date) as stage_metrics:
+            # Load data
+            with track_stage("validation.load") as m:
+                data = validator.load_data()
+                m.rows_out = sum(len(df) for df in data.values())
+                m.bytes_read = validator.bytes_read
+            logger.info(f"Loaded {len(data)} tables for validation")
+            stage_metrics.rows_in = m.rows_out
+            stage_metrics.bytes_read = m.bytes_read
             
-            # Completeness validation
-            completeness_results = validator.validate_data_completeness(df, table_name)
-            validator.validation_results[f"{table_name}_completeness"] = completeness_results
+            # Run validation checks for each table
+            for table_name, df in data.items():
+                logger.info(f"Validating {table_name}...")
+                
+                with track_stage(f"validation.{table_name}") as m:
+                    m.rows_in = len(df)
+                    
+                    # Completeness validation
+                    completeness_results = validator.validate_data_completeness(df, table_name)
+                    validator.validation_results[f"{table_name}_completeness"] = completeness_results
+                    
+                    # Data type validation
+                    type_results = validator.validate_data_types(df, table_name)
+                    validator.validation_results[f"{table_name}_types"] = type_results
+                    
+                    # Range validation
+                    range_results = validator.validate_data_ranges(df, table_name)
+                    validator.validation_results[f"{table_name}_ranges"] = range_results
             
-            # Data type validation
-            type_results = validator.validate_data_types(df, table_name)
-            validator.validation_results[f"{table_name}_types"] = type_results
+            # Foreign keys across tables (e.g. CRM customers without billing)
+            with track_stage("validation.referential_integrity") as m:
+                m.rows_in = stage_metrics.rows_in
+                integrity_results = validator.validate_referential_integrity(data)
+                validator.validation_results["referential_integrity"] = integrity_results
             
-            # Range validation
-            range_results = validator.validate_data_ranges(df, table_name)
-            validator.validation_results[f"{table_name}_ranges"] = range_results
+            # Distribution shifts against the previous partitions (from stored column sketches)
+            with track_stage("validation.drift") as m:
+                m.rows_in = stage_metrics.rows_in
+                drift_results = validator.validate_drift(data)
+                validator.validation_results["drift"] = drift_results
         
         # # Business rules validation
         # business_results = validator.validate_business_rules(data)
@@ -0,0 +1,311 @@
+"""
+Task 4: Data Validation - Drift Monitoring
+Detects distribution shifts between a partition and the partitions before it
+(e.g. payment_status, amount_due or the CRM ticket mix moving sharply day over day)
+
+Every validated partition leaves a compact sketch per column under
+data/drift_sketches/<table>/dt=<date>.json:
+- numeric columns: count, nulls, min/max/mean and a quantile sketch (101 percentiles)
+- categorical columns: frequency table of the most common values, the rest counted as other
+Dates and identifiers (*_id columns, or text where almost every value is distinct) are not
+sketched.
+
+Drift is computed from the sketches alone, without reloading old partitions. The previous
+N sketches are merged into one baseline (frequencies summed; quantile sketches combined
+as a count-weighted mixture of their CDFs), then per column:
+- PSI (population stability index) over the baseline's deciles or categories
+- KS statistic (largest CDF difference) for numeric columns
+PSI below 0.1 is stable, 0.1 - 0.25 moderate, above 0.25 significant.
+
+The baseline is the N partitions before the current one that exist (expected_partitions, e.g.
+the raw dt= partitions), not just those sketched so far. When some of them have no sketch yet,
+the table's drift is reported as incomplete (with the missing partitions) and not scored as an
+issue, so the result never depends on which partitions a parallel run happened to finish first.
+Backfills must therefore validate partitions in date order for complete drift results (or
+re-validate the partitions reported as incomplete once the earlier ones are done).
+"""
+
+import os
+import sys
+import glob
+import json
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+
+from utils.logger import get_logger
+
+logger = get_logger("data_validation", log_file=os.path.join(project_root, "logs", "data_validation.log"))
+
+QUANTILES = np.linspace(0, 1, 101)
+# Values kept per categorical frequency table
+MAX_CATEGORIES = 50
+# Columns whose share of distinct values is above this are treated as identifiers
+IDENTIFIER_RATIO = 0.9
+DEFAULT_BASELINE_PARTITIONS = 7
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+# Floor of bin shares in PSI, so empty bins do not make it infinite
+PSI_EPSILON = 1e-4
+OTHER = "__other__"
+
+
+def sketch_column(series):
+    """Sketch of one column, or None for columns that are not monitored (dates, identifiers)"""
+    if pd.api.types.is_datetime64_any_dtype(series) or str(series.name).endswith("_id"):
+        return None
+    values = series.dropna()
+    sketch = {"count": int(len(values)), "nulls": int(series.isna().sum())}
+
+    if pd.api.types.is_bool_dtype(series):
+        values = values.astype(str)
+    elif pd.api.types.is_numeric_dtype(series):
+        sketch["kind"] = "numeric"
+        if len(values):
+            numbers = values.to_numpy(dtype=float)
+            sketch.update(
+                min=float(numbers.min()),
+                max=float(numbers.max()),
+                mean=float(numbers.mean()),
+                quantiles=np.quantile(numbers, QUANTILES).tolist()
+            )
+        return sketch
+
+    counts = values.astype(str).value_counts()
+    if len(values) > 10 and len(counts) > IDENTIFIER_RATIO * len(values):
+        return None
+    sketch["kind"] = "categorical"
+    sketch["frequencies"] = {str(value): int(count) for value, count in counts.head(MAX_CATEGORIES).items()}
+    if len(counts) > MAX_CATEGORIES:
+        sketch["frequencies"][OTHER] = int(counts.iloc[MAX_CATEGORIES:].sum())
+    return sketch
+
+
+def sketch_table(df):
+    """Sketches of every monitored column of a table"""
+    sketches = {}
+    for column in df.columns:
+        sketch = sketch_column(df[column])
+        if sketch is not None:
+            sketches[str(column)] = sketch
+    return {"rows": int(len(df)), "columns": sketches}
+
+
+class SketchStore:
+    """
+    Column sketches recorded per table and partition
+
+    Args:
+        root: Sketch directory (default: data/drift_sketches)
+    """
+
+    def __init__(self, root=None):
+        self.root = root or os.path.join(project_root, "data", "drift_sketches")
+
+    def _file(self, table, partition_date):
+        return os.path.join(self.root, table, f"dt={partition_date}.json")
+
+    def partitions(self, table):
+        """Sketched partition dates of a table, oldest first"""
+        files = glob.glob(os.path.join(self.root, table, "dt=*.json"))
+        return sorted(os.path.basename(path)[3:-5] for path in files)
+
+    def record(self, table, partition_date, sketch):
+        """Store (or replace) the sketch of a partition"""
+        table_dir = os.path.join(self.root, table)
+        os.makedirs(table_dir, exist_ok=True)
+        tmp_file = os.path.join(table_dir, f".dt={partition_date}.json.tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(dict(sketch, table=table, partition_date=partition_date), f)
+        os.replace(tmp_file, self._file(table, partition_date))
+
+    def load(self, table, partition_date):
+        with open(self._file(table, partition_date)) as f:
+            return json.load(f)
+
+    def baseline(self, table, before, n=DEFAULT_BASELINE_PARTITIONS, expected=None):
+        """
+        Sketches of the n latest partitions older than before, oldest first
+
+        Args:
+            expected: Partition dates that should have a sketch (default: the sketched ones)
+
+        Returns:
+            (sketches of the window, window partitions without a sketch)
+        """
+        recorded = set(self.partitions(table))
+        window = sorted(d for d in recorded | set(expected or []) if d < before)[-n:]
+        return [self.load(table, d) for d in window if d in recorded], [d for d in window if d not in recorded]
+
+
+def _cdf(sketch, points):
+    """CDF of a numeric column at points, interpolated from its quantile sketch"""
+    quantiles = np.asarray(sketch["quantiles"])
+    return np.interp(points, quantiles, QUANTILES, left=0.0, right=1.0)
+
+
+def _mixture_cdf(sketches, points):
+    """CDF of the union of several partitions (weighted by their counts) at points"""
+    weights = np.array([sketch["count"] for sketch in sketches], dtype=float)
+    cdfs = np.array([_cdf(sketch, points) for sketch in sketches])
+    return weights @ cdfs / weights.sum()
+
+
+def psi(expected, actual):
+    """Population stability index between two vectors of bin shares"""
+    expected = np.maximum(np.asarray(expected, dtype=float), PSI_EPSILON)
+    actual = np.maximum(np.asarray(actual, dtype=float), PSI_EPSILON)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def numeric_drift(baseline, current):
+    """PSI over the baseline deciles and KS statistic between numeric sketches"""
+    # Bin edges: deciles of the baseline mixture, found by inverting its CDF on the pooled quantiles
+    grid = np.unique(np.concatenate([sketch["quantiles"] for sketch in baseline + [current]]))
+    base_cdf = _mixture_cdf(baseline, grid)
+    edges = np.unique(np.interp(np.linspace(0.1, 0.9, 9), base_cdf, grid))
+
+    base_at_edges = np.concatenate(([0.0], _mixture_cdf(baseline, edges), [1.0]))
+    current_at_edges = np.concatenate(([0.0], _cdf(current, edges), [1.0]))
+    ks = float(np.max(np.abs(_cdf(current, grid) - base_cdf)))
+    return psi(np.diff(base_at_edges), np.diff(current_at_edges)), ks
+
+
+def categorical_drift(baseline, current):
+    """PSI over the categories seen in the baseline or the current partition"""
+    totals = {}
+    for sketch in baseline:
+        for value, count in sketch["frequencies"].items():
+            totals[value] = totals.get(value, 0) + count
+    categories = sorted(set(totals) | set(current["frequencies"]))
+    expected = np.array([totals.get(value, 0) for value in categories], dtype=float)
+    actual = np.array([current["frequencies"].get(value, 0) for value in categories], dtype=float)
+    if not expected.sum() or not actual.sum():
+        return 0.0
+    return psi(expected / expected.sum(), actual / actual.sum())
+
+
+def _severity(score):
+    if score > PSI_SIGNIFICANT:
+        return "significant"
+    if score > PSI_MODERATE:
+        return "moderate"
+    return "stable"
+
+
+def compare_sketches(baseline, current):
+    """
+    Drift of every column of current against a baseline (list of earlier table sketches)
+
+    Returns:
+        List of {"column", "kind", "psi", "ks", "null_rate", "baseline_null_rate", "severity"}
+    """
+    results = []
+    for column, sketch in current["columns"].items():
+        history = [table["columns"][column] for table in baseline
+                   if table["columns"].get(column, {}).get("kind") == sketch["kind"]]
+        history = [entry for entry in history if entry["count"]]
+        if not history or not sketch["count"]:
+            continue
+
+        if sketch["kind"] == "numeric":
+            score, ks = numeric_drift(history, sketch)
+        else:
+            score, ks = categorical_drift(history, sketch), None
+
+        base_rows = sum(entry["count"] + entry["nulls"] for entry in history)
+        results.append({
+            "column": column,
+            "kind": sketch["kind"],
+            "psi": round(score, 4),
+            "ks": round(ks, 4) if ks is not None else None,
+            "null_rate": round(sketch["nulls"] / (sketch["count"] + sketch["nulls"]), 4),
+            "baseline_null_rate": round(sum(entry["nulls"] for entry in history) / base_rows, 4),
+            "severity": _severity(score)
+        })
+    return results
+
+
+def monitor_drift(data, partition_date, store=None, baseline_partitions=DEFAULT_BASELINE_PARTITIONS,
+                  expected_partitions=None):
+    """
+    Sketch the tables of a partition, record the sketches and compare them with the
+    previous partitions
+
+    Args:
+        data: Table name -> DataFrame
+        partition_date: dt= partition the tables belong to
+        store: SketchStore (default: data/drift_sketches)
+        baseline_partitions: Earlier partitions merged into the baseline
+        expected_partitions: Table name -> partition dates that should have sketches (e.g. the
+            raw partitions); baseline partitions among them without a sketch make the table's
+            drift incomplete
+
+    Returns:
+        {"tables": {table: {"baseline_partitions": [...], "missing_partitions": [...], "complete": bool,
+        "columns": [...]}}, "drifted_columns": n}
+    """
+    store = store or SketchStore()
+    expected_partitions = expected_partitions or {}
+    tables = {}
+    for table, df in data.items():
+        sketch = sketch_table(df)
+        baseline, missing = store.baseline(table, partition_date, baseline_partitions,
+                                           expected=expected_partitions.get(table))
+        columns = compare_sketches(baseline, sketch) if baseline else []
+        store.record(table, partition_date, sketch)
+
+        tables[table] = {
+            "baseline_partitions": [entry["partition_date"] for entry in baseline],
+            "missing_partitions": missing,
+            "complete": not missing,
+            "columns": columns
+        }
+        if missing:
+            logger.warning(f"Drift of {table} is incomplete: no sketch yet for earlier partitions {', '.join(missing)}")
+            continue
+        drifted = [column["column"] for column in columns if column["severity"] != "stable"]
+        logger.info(f"Drift of {table} against {len(baseline)} earlier partitions: "
+                    f"{', '.join(drifted) if drifted else 'no drift'}")
+
+    return {
+        "partition_date": partition_date,
+        "tables": tables,
+        "incomplete_tables": [table for table, result in tables.items() if not result["complete"]],
+        "drifted_columns": sum(column["severity"] == "significant"
+                               for result in tables.values() if result["complete"] for column in result["columns"])
+    }
+
+
+def drift_issues(results):
+    """
+    Validation issues (same severity prefixes as DataValidator) for significantly drifted columns;
+    tables with an incomplete baseline get one unprefixed (informational) issue instead
+    """
+    issues = []
+    for table, result in results["tables"].items():
+        if not result["complete"]:
+            issues.append(f"{table} drift not scored: baseline partitions {', '.join(result['missing_partitions'])} "
+                          f"are not validated yet")
+            continue
+        for column in result["columns"]:
+            if column["severity"] == "significant":
+                ks = f", KS {column['ks']:.2f}" if column["ks"] is not None else ""
+                issues.append(f"WARNING: {table}.{column['column']} distribution drifted "
+                              f"(PSI {column['psi']:.2f}{ks} vs {len(result['baseline_partitions'])} earlier partitions)")
+    return issues
+
+
+if __name__ == "__main__":
+    store = SketchStore()
+    for table in sorted(os.listdir(store.root)) if os.path.isdir(store.root) else []:
+        partitions = store.partitions(table)
+        if len(partitions) < 2:
+            continue
+        latest = store.load(table, partitions[-1])
+        baseline, _ = store.baseline(table, partitions[-1])
+        for column in compare_sketches(baseline, latest):
+            print(f"{table}.{column['column']}: PSI {column['psi']} ({column['severity']})")
@@ -0,0 +1,150 @@
+"""
+Task 4: Data Validation - Referential Integrity
+Checks that foreign keys of one table exist in the table they refer to (e.g. every CRM
+customer_id has billing), which the customer join in data preparation relies on
+
+Keys are hashed to 64 bits (pandas' vectorized hashing) and each referenced column becomes a
+sorted array of its distinct hashes, built once per partition and shared by every check that
+refers to it. A check then factorizes the foreign key column and binary-searches each distinct
+value once (vectorized): 8 bytes per referenced key and O(n log n) time, which keeps hundreds of
+millions of keys in reach of one machine. 64-bit hashes collide with negligible probability.
+
+Missing (null) foreign keys are counted separately and are not orphans.
+"""
+
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+
+from utils.logger import get_logger
+
+logger = get_logger("data_validation", log_file=os.path.join(project_root, "logs", "data_validation.log"))
+
+# (table, column) -> (referenced table, referenced column)
+FOREIGN_KEYS = [
+    {"table": "crm", "column": "customer_id", "references": "billing", "referenced_column": "customer_id"},
+    {"table": "subscriptions", "column": "customer_id", "references": "billing", "referenced_column": "customer_id"},
+    {"table": "subscriptions", "column": "product_id", "references": "billing", "referenced_column": "product_id"},
+    {"table": "billing", "column": "product_id", "references": "subscriptions", "referenced_column": "product_id"}
+]
+
+ORPHAN_SAMPLE_SIZE = 10
+# Share of orphaned rows above which a foreign key is reported as a HIGH issue
+HIGH_ORPHAN_PCT = 5.0
+
+
+def hash_column(series):
+    """64-bit hash of every value of a column (nulls hash too; mask them with series.notna())"""
+    return pd.util.hash_pandas_object(series, index=False, categorize=True).to_numpy()
+
+
+class KeyIndex:
+    """Sorted distinct key hashes of one column"""
+
+    def __init__(self, series):
+        hashes = np.sort(hash_column(series.dropna()))
+        # Neighbour comparison instead of np.unique, which is several times slower on uint64
+        self.hashes = hashes[np.concatenate(([True], hashes[1:] != hashes[:-1]))] if len(hashes) else hashes
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def contains(self, hashes):
+        """Which hashes are in the index"""
+        found = np.zeros(len(hashes), dtype=bool)
+        if not len(self.hashes) or not len(hashes):
+            return found
+        # Query in sorted order: the binary searches then walk the index sequentially
+        order = np.argsort(hashes, kind="stable")
+        wanted = hashes[order]
+        position = np.minimum(np.searchsorted(self.hashes, wanted), len(self.hashes) - 1)
+        found[order] = self.hashes[position] == wanted
+        return found
+
+
+def check_foreign_key(child, column, index, sample_size=ORPHAN_SAMPLE_SIZE):
+    """
+    Rows of child whose column value is not in index
+
+    Returns:
+        Dictionary with checked/missing/orphan row counts, distinct orphan keys and a sample of them
+    """
+    values = child[column]
+    # Foreign keys repeat (many tickets per customer): look up each distinct value once
+    codes, uniques = pd.factorize(values)
+    present = codes >= 0
+    orphan_uniques = ~index.contains(hash_column(pd.Series(uniques)))
+    orphaned = present & orphan_uniques[np.maximum(codes, 0)] if len(uniques) else present
+
+    # Distinct orphans in order of first appearance
+    distinct_orphans = pd.Series(uniques[orphan_uniques]) if len(uniques) else pd.Series([], dtype=object)
+    checked = int(present.sum())
+    return {
+        "rows_checked": checked,
+        "missing_keys": int(len(values) - checked),
+        "orphan_rows": int(orphaned.sum()),
+        "orphan_keys": int(len(distinct_orphans)),
+        "orphan_pct": round(orphaned.sum() / checked * 100, 2) if checked else 0.0,
+        "orphan_sample": [str(value) for value in distinct_orphans.head(sample_size)]
+    }
+
+
+def check_referential_integrity(data, foreign_keys=None, sample_size=ORPHAN_SAMPLE_SIZE):
+    """
+    Check all foreign keys between the tables of a partition
+
+    Args:
+        data: Table name -> DataFrame
+        foreign_keys: Relations to check (default: FOREIGN_KEYS); relations whose tables or
+            columns are not in data are reported as skipped
+        sample_size: Orphaned keys listed per relation
+
+    Returns:
+        {"relations_checked": n, "relations": [...], "skipped": [...], "total_orphan_rows": n}
+    """
+    indexes = {}
+    relations, skipped = [], []
+    for fk in foreign_keys or FOREIGN_KEYS:
+        name = f"{fk['table']}.{fk['column']} -> {fk['references']}.{fk['referenced_column']}"
+        child, parent = data.get(fk["table"]), data.get(fk["references"])
+        if child is None or parent is None or fk["column"] not in child.columns \
+                or fk["referenced_column"] not in parent.columns:
+            skipped.append(name)
+            continue
+
+        key = (fk["references"], fk["referenced_column"])
+        if key not in indexes:
+            indexes[key] = KeyIndex(parent[fk["referenced_column"]])
+
+        result = check_foreign_key(child, fk["column"], indexes[key], sample_size)
+        result.update(relation=name, table=fk["table"], column=fk["column"],
+                      referenced_keys=len(indexes[key]))
+        relations.append(result)
+        logger.info(f"Referential integrity {name}: {result['orphan_rows']} orphaned rows "
+                    f"({result['orphan_keys']} keys) of {result['rows_checked']}")
+
+    if skipped:
+        logger.warning(f"Referential integrity checks skipped (table or column missing): {', '.join(skipped)}")
+    return {
+        "relations_checked": len(relations),
+        "relations": relations,
+        "skipped": skipped,
+        "total_orphan_rows": sum(result["orphan_rows"] for result in relations)
+    }
+
+
+def integrity_issues(results):
+    """Validation issues (same severity prefixes as DataValidator) for relations with orphans"""
+    issues = []
+    for result in results["relations"]:
+        if not result["orphan_rows"]:
+            continue
+        level = "HIGH" if result["orphan_pct"] > HIGH_ORPHAN_PCT else "WARNING"
+        issues.append(f"{level}: {result['relation']} has {result['orphan_rows']} orphaned rows "
+                      f"({result['orphan_pct']:.1f}%, e.g. {', '.join(result['orphan_sample'][:3])})")
+    return issues
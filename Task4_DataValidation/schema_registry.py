@@ -0,0 +1,348 @@
+"""
+Task 4: Data Validation - Schema Registry and Drift Gate
+Fingerprints the schema of every source (column names, types, nullability) and checks it
+before ingestion, so incompatible data stops the pipeline before the expensive stages run
+
+- Each table has a contract: required columns and their kind (string, numeric, date, boolean),
+  plus optional columns that downstream code uses when present
+- Fingerprints are taken from the first rows of each source (connector.sample), which takes
+  milliseconds regardless of the source size, and are recorded per partition under
+  data/schemas/<table>/dt=<date>.json
+- The check compares each fingerprint with the contract and with the table's latest earlier
+  fingerprint: a missing or retyped required column is an error, anything else is a warning
+- The baseline is the latest earlier partition in the raw data lake, not merely the latest one
+  fingerprinted so far: raw partitions after the last fingerprint (e.g. written by a backfill,
+  which has no schema gate, or by runs still in flight) are reported as a missing baseline and
+  warned about, never skipped silently. Partitions should be checked in date order.
+
+Nullability is inferred from the sample, so it is only reported (never an error).
+"""
+
+import os
+import sys
+import json
+import glob
+import time
+import hashlib
+import pandas as pd
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+
+from utils.logger import get_logger
+from utils.metrics import track_stage
+from utils.csv_reader import DATE_FORMATS
+from Task2_DataIngestion.connectors import create_connector, default_sources
+
+logger = get_logger("data_validation", log_file=os.path.join(project_root, "logs", "data_validation.log"))
+
+# Columns each table must provide (and their kind), and columns used downstream when present
+SCHEMA_CONTRACTS = {
+    "billing": {
+        "required": {
+            "invoice_id": "string",
+            "customer_id": "string",
+            "amount_due": "numeric",
+            "amount_paid": "numeric",
+            "invoice_date": "date",
+            "payment_date": "date"
+        },
+        "optional": {
+            "payment_status": "string"
+        }
+    },
+    "subscriptions": {
+        "required": {
+            "customer_id": "string",
+            "monthly_fee": "numeric",
+            "subscription_start": "date"
+        },
+        "optional": {
+            "status": "string",
+            "plan_type": "string"
+        }
+    },
+    "crm": {
+        "required": {
+            "ticket_id": "string",
+            "customer_id": "string",
+            "request_type": "string",
+            "created_at": "date"
+        },
+        "optional": {
+            "status": "string",
+            "disconnect_reason": "string",
+            "request_reason": "string"
+        }
+    }
+}
+
+SAMPLE_ROWS = 1000
+
+
+class SchemaDriftError(Exception):
+    """Raised by the schema gate when a source is incompatible with its contract"""
+
+
+def column_kind(series):
+    """Coarse type of a column: null (no values), date, boolean, numeric or string"""
+    if series.isna().all():
+        return "null"
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return "date"
+    if pd.api.types.is_bool_dtype(series):
+        return "boolean"
+    if pd.api.types.is_numeric_dtype(series):
+        return "numeric"
+    return "string"
+
+
+def fingerprint(df):
+    """
+    Schema fingerprint of a DataFrame (or of a sample of it)
+
+    Returns:
+        {"columns": [{"name", "dtype", "kind", "nullable"}, ...], "hash": sha256 of the columns}
+    """
+    columns = [
+        {
+            "name": str(column),
+            "dtype": str(df[column].dtype),
+            "kind": column_kind(df[column]),
+            "nullable": bool(df[column].isna().any())
+        }
+        for column in df.columns
+    ]
+    digest = hashlib.sha256(json.dumps(columns, sort_keys=True).encode("utf-8")).hexdigest()
+    return {"columns": columns, "hash": digest}
+
+
+def _kind_matches(expected, actual, values=None, column=None):
+    """Whether a column of kind actual can be used as kind expected"""
+    if actual == expected or actual == "null":
+        return True
+    if expected == "date" and actual == "string" and values is not None:
+        # Dates not parsed at read time must still parse with the source's format
+        date_format = DATE_FORMATS.get(column)
+        parsed = pd.to_datetime(values.dropna(), format=date_format, errors="coerce")
+        return bool(parsed.notna().all())
+    return False
+
+
+def check_contract(table, df, contracts=None):
+    """
+    Compare a table (sample) with its contract
+
+    Returns:
+        (errors, warnings) lists of messages
+    """
+    contract = (contracts or SCHEMA_CONTRACTS).get(table)
+    errors, warnings = [], []
+    if contract is None:
+        warnings.append(f"{table}: no schema contract defined")
+        return errors, warnings
+
+    for level, messages in (("required", errors), ("optional", warnings)):
+        for column, expected in contract.get(level, {}).items():
+            if column not in df.columns:
+                messages.append(f"{table}.{column}: {level} column is missing")
+                continue
+            actual = column_kind(df[column])
+            if not _kind_matches(expected, actual, df[column], column):
+                messages.append(f"{table}.{column}: expected {expected}, found {actual} ({df[column].dtype})")
+    return errors, warnings
+
+
+def compare(previous, current):
+    """
+    Differences between two fingerprints
+
+    Returns:
+        {"added": [...], "removed": [...], "type_changed": [{"name", "from", "to"}],
+         "nullability_changed": [{"name", "from", "to"}]}
+    """
+    before = {column["name"]: column for column in previous["columns"]}
+    after = {column["name"]: column for column in current["columns"]}
+    diff = {
+        "added": [name for name in after if name not in before],
+        "removed": [name for name in before if name not in after],
+        "type_changed": [],
+        "nullability_changed": []
+    }
+    for name in after:
+        if name not in before:
+            continue
+        old, new = before[name], after[name]
+        # A column without values in either sample says nothing about its type
+        if old["kind"] != new["kind"] and "null" not in (old["kind"], new["kind"]):
+            diff["type_changed"].append({"name": name, "from": old["kind"], "to": new["kind"]})
+        if old["nullable"] != new["nullable"]:
+            diff["nullability_changed"].append({"name": name, "from": old["nullable"], "to": new["nullable"]})
+    return diff
+
+
+class SchemaRegistry:
+    """
+    Schema fingerprints recorded per table and partition
+
+    Args:
+        root: Registry directory (default: data/schemas)
+    """
+
+    def __init__(self, root=None):
+        self.root = root or os.path.join(project_root, "data", "schemas")
+
+    def _file(self, table, partition_date):
+        return os.path.join(self.root, table, f"dt={partition_date}.json")
+
+    def partitions(self, table):
+        """Recorded partition dates of a table, oldest first"""
+        files = glob.glob(os.path.join(self.root, table, "dt=*.json"))
+        return sorted(os.path.basename(path)[3:-5] for path in files)
+
+    def record(self, table, partition_date, schema):
+        """Store (or replace) the fingerprint of a partition"""
+        table_dir = os.path.join(self.root, table)
+        os.makedirs(table_dir, exist_ok=True)
+        tmp_file = os.path.join(table_dir, f".dt={partition_date}.json.tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(dict(schema, table=table, partition_date=partition_date), f, indent=2)
+        os.replace(tmp_file, self._file(table, partition_date))
+
+    def load(self, table, partition_date):
+        with open(self._file(table, partition_date)) as f:
+            return json.load(f)
+
+    def latest(self, table, before=None, expected=None):
+        """
+        Latest recorded fingerprint of a table (older than before, if given)
+
+        Args:
+            expected: Partition dates that should have a fingerprint (e.g. the raw partitions)
+
+        Returns:
+            (fingerprint or None, expected partitions newer than it without a fingerprint)
+        """
+        partitions = [d for d in self.partitions(table) if before is None or d < before]
+        newest = partitions[-1] if partitions else ""
+        missing = sorted(d for d in set(expected or []) - set(partitions) if d > newest and (before is None or d < before))
+        return (self.load(table, newest) if partitions else None), missing
+
+
+def check_table(table, sample, partition_date, registry=None, contracts=None, expected=None):
+    """
+    Fingerprint a table sample, check it against its contract and its previous fingerprint,
+    and record it
+
+    Args:
+        expected: Earlier partition dates that should have a fingerprint (e.g. the raw partitions)
+
+    Returns:
+        Result dictionary with status "passed", "warning" or "failed"
+    """
+    registry = registry or SchemaRegistry()
+    schema = fingerprint(sample)
+    errors, warnings = check_contract(table, sample, contracts)
+
+    previous, missing = registry.latest(table, before=partition_date, expected=expected)
+    if missing:
+        earlier = f" and {len(missing) - 1} earlier partition{'s' if len(missing) > 2 else ''}" if len(missing) > 1 else ""
+        against = f"compared with dt={previous['partition_date']}" if previous else "not compared"
+        warnings.append(f"{table}: no schema fingerprint for dt={missing[-1]}{earlier} ({against})")
+    diff = compare(previous, schema) if previous else None
+    if diff:
+        contract = (contracts or SCHEMA_CONTRACTS).get(table, {})
+        required = contract.get("required", {})
+        for change in diff["type_changed"]:
+            message = f"{table}.{change['name']}: type changed from {change['from']} to {change['to']}"
+            (errors if change["name"] in required else warnings).append(message)
+        for name in diff["removed"]:
+            if name not in required:  # Missing required columns are already errors
+                warnings.append(f"{table}.{name}: column removed since {previous['partition_date']}")
+        for name in diff["added"]:
+            warnings.append(f"{table}.{name}: new column since {previous['partition_date']}")
+        for change in diff["nullability_changed"]:
+            if change["to"]:
+                warnings.append(f"{table}.{change['name']}: now contains missing values")
+
+    registry.record(table, partition_date, schema)
+    status = "failed" if errors else "warning" if warnings else "passed"
+    return {
+        "table": table,
+        "status": status,
+        "columns": len(schema["columns"]),
+        "sample_rows": len(sample),
+        "hash": schema["hash"],
+        "changed": previous is not None and previous["hash"] != schema["hash"],
+        "compared_with": previous["partition_date"] if previous else None,
+        "baseline_missing": missing,
+        "diff": diff,
+        "errors": errors,
+        "warnings": warnings
+    }
+
+
+def check_sources(partition_date, sources=None, sample_rows=SAMPLE_ROWS, registry=None, contracts=None, fail_fast=True,
+                  raw_root=None):
+    """
+    Schema gate: check the first rows of every source before ingesting it
+
+    Args:
+        partition_date: Partition the fingerprints are recorded under
+        sources: Connectors or connector specs (default: the pipeline's sources)
+        sample_rows: Rows sampled per source
+        registry: SchemaRegistry (default: data/schemas)
+        contracts: Table contracts (default: SCHEMA_CONTRACTS)
+        fail_fast: Raise SchemaDriftError when any table fails
+        raw_root: Raw data lake whose dt= partitions are expected to have fingerprints
+            (default: data/raw)
+
+    Returns:
+        Dictionary with the overall status and one result per table
+    """
+    registry = registry or SchemaRegistry()
+    raw_root = raw_root or os.path.join(project_root, "data", "raw")
+    connectors = [create_connector(source) if isinstance(source, dict) else source
+                  for source in (sources or default_sources())]
+    try:
+        tables = []
+        with track_stage("schema_check", partition_date=partition_date) as m:
+            for connector in connectors:
+                start = time.perf_counter()
+                expected = [os.path.basename(path)[3:] for path in glob.glob(os.path.join(raw_root, connector.table, "dt=*"))]
+                result = check_table(connector.table, connector.sample(sample_rows), partition_date, registry, contracts,
+                                     expected=expected)
+                result["seconds"] = round(time.perf_counter() - start, 4)
+                tables.append(result)
+                for message in result["errors"]:
+                    logger.error(f"Schema check: {message}")
+                for message in result["warnings"]:
+                    logger.warning(f"Schema check: {message}")
+            m.rows_in = sum(result["sample_rows"] for result in tables)
+
+        statuses = {result["status"] for result in tables}
+        status = "failed" if "failed" in statuses else "warning" if "warning" in statuses else "passed"
+        logger.info(f"Schema check for {partition_date}: {status} ({len(tables)} tables)")
+
+        summary = {"status": status, "partition_date": partition_date, "tables": tables}
+        if status == "failed" and fail_fast:
+            failed = [message for result in tables for message in result["errors"]]
+            raise SchemaDriftError("Incompatible source schema: " + "; ".join(failed))
+        return summary
+
+    except SchemaDriftError:
+        raise
+    except Exception as e:
+        logger.error(f"Error checking source schemas: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    from datetime import datetime
+
+    result = check_sources(datetime.today().date().isoformat(), fail_fast=False)
+    for table in result["tables"]:
+        print(f"{table['table']}: {table['status']} ({table['seconds'] * 1000:.1f} ms)")
+        for message in table["errors"] + table["warnings"]:
+            print(f"  - {message}")
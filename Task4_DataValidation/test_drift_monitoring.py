@@ -0,0 +1,91 @@
+"""
+Test drift monitoring: sketches are recorded per partition, a stable day scores low, shifted
+amounts and a changed status mix are flagged from the stored sketches alone, a baseline with
+partitions not sketched yet is reported as incomplete, and the validation report carries the
+drift results
+"""
+
+import sys
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Task4_DataValidation.drift_monitoring import monitor_drift, drift_issues, sketch_table, SketchStore
+from Task4_DataValidation.data_validation import validate_all_data
+
+def billing_day(rng, amount_mean=100.0, status_mix=(0.7, 0.2, 0.1), rows=2000):
+    return pd.DataFrame({
+        "invoice_id": [f"INV{i}" for i in range(rows)],
+        "amount_due": rng.normal(amount_mean, 20.0, rows),
+        "payment_status": rng.choice(["Paid", "Pending", "Failed"], rows, p=status_mix),
+        "invoice_date": pd.Timestamp("2025-08-01")
+    })
+
+def test_drift_monitoring():
+    rng = np.random.default_rng(7)
+
+    # Identifiers and dates are not sketched
+    sketch = sketch_table(billing_day(rng))
+    assert set(sketch["columns"]) == {"amount_due", "payment_status"}
+    assert len(sketch["columns"]["amount_due"]["quantiles"]) == 101
+
+    metrics_file = os.environ.get("DMML_METRICS_FILE")
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DMML_METRICS_FILE"] = os.path.join(tmp, "metrics.jsonl")
+        try:
+            store = SketchStore(os.path.join(tmp, "sketches"))
+            for day in range(1, 5):
+                first = monitor_drift({"billing": billing_day(rng)}, f"2025-08-0{day}", store=store)
+            assert first["tables"]["billing"]["baseline_partitions"] == ["2025-08-01", "2025-08-02", "2025-08-03"]
+            assert all(column["severity"] == "stable" for column in first["tables"]["billing"]["columns"])
+            assert drift_issues(first) == []
+
+            # Only the latest baseline_partitions sketches form the baseline
+            shifted = monitor_drift({"billing": billing_day(rng, 140.0, (0.3, 0.3, 0.4))}, "2025-08-05",
+                                    store=store, baseline_partitions=2)
+            result = shifted["tables"]["billing"]
+            assert result["baseline_partitions"] == ["2025-08-03", "2025-08-04"]
+            columns = {column["column"]: column for column in result["columns"]}
+            assert columns["amount_due"]["severity"] == "significant" and columns["amount_due"]["ks"] > 0.5
+            assert columns["payment_status"]["severity"] == "significant" and columns["payment_status"]["ks"] is None
+            assert shifted["drifted_columns"] == 2 and len(drift_issues(shifted)) == 2
+
+            # An expected partition without a sketch (still running in a backfill) makes drift incomplete
+            late = monitor_drift({"billing": billing_day(rng, 140.0, (0.3, 0.3, 0.4))}, "2025-08-07", store=store,
+                                 baseline_partitions=2, expected_partitions={"billing": ["2025-08-06"]})
+            assert late["tables"]["billing"]["missing_partitions"] == ["2025-08-06"]
+            assert late["tables"]["billing"]["baseline_partitions"] == ["2025-08-05"]
+            assert late["incomplete_tables"] == ["billing"] and late["drifted_columns"] == 0
+            assert drift_issues(late) == ["billing drift not scored: baseline partitions 2025-08-06 are not validated yet"]
+
+            # Validation records sketches under the data lake root and reports drift
+            for partition_date, status in (("2025-08-23", ["Paid"] * 9 + ["Pending"]), ("2025-08-24", ["Pending"] * 10)):
+                partition_dir = os.path.join(tmp, "lake", "raw", "billing", f"dt={partition_date}")
+                os.makedirs(partition_dir)
+                pd.DataFrame({"amount_due": [50.0] * 10, "payment_status": status}).to_csv(
+                    os.path.join(partition_dir, "billing.csv"), index=False)
+            data_root = os.path.join(tmp, "lake")
+            # Validated out of order: the earlier raw partition is reported missing, not skipped
+            report = validate_all_data("2025-08-24", data_root=data_root)["validation_report"]
+            drift = report["validation_results"]["drift"]["tables"]["billing"]
+            assert not drift["complete"] and drift["missing_partitions"] == ["2025-08-23"]
+            validate_all_data("2025-08-23", data_root=data_root)
+            report = validate_all_data("2025-08-24", data_root=data_root)["validation_report"]
+            drift = report["validation_results"]["drift"]["tables"]["billing"]
+            assert drift["complete"] and drift["baseline_partitions"] == ["2025-08-23"]
+            assert any("billing.payment_status distribution drifted" in issue for issue in report["issues_summary"])
+            assert os.path.exists(os.path.join(data_root, "drift_sketches", "billing", "dt=2025-08-24.json"))
+        finally:
+            if metrics_file is None:
+                os.environ.pop("DMML_METRICS_FILE", None)
+            else:
+                os.environ["DMML_METRICS_FILE"] = metrics_file
+
+    print("✅ Drift monitoring test passed")
+
+if __name__ == "__main__":
+    test_drift_monitoring()
@@ -0,0 +1,59 @@
+"""
+Test referential integrity: orphaned foreign keys are counted and sampled per relation,
+null keys are not orphans, and relations over missing tables or columns are skipped
+"""
+
+import sys
+import os
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Task4_DataValidation.referential_integrity import check_referential_integrity, integrity_issues, KeyIndex, hash_column
+
+def test_referential_integrity():
+    data = {
+        "billing": pd.DataFrame({
+            "customer_id": ["CUST001", "CUST002", "CUST002"],
+            "product_id": ["TV001", "BB001", "BB001"]
+        }),
+        "subscriptions": pd.DataFrame({
+            "customer_id": ["CUST001", "CUST002"],
+            "product_id": ["TV001", "BB001"]
+        }),
+        "crm": pd.DataFrame({
+            "ticket_id": ["T1", "T2", "T3", "T4", "T5"],
+            "customer_id": ["CUST001", "CUST009", "CUST009", None, "CUST007"]
+        })
+    }
+
+    results = check_referential_integrity(data)
+    relations = {relation["relation"]: relation for relation in results["relations"]}
+    assert results["relations_checked"] == 4 and results["skipped"] == []
+
+    crm = relations["crm.customer_id -> billing.customer_id"]
+    assert crm["orphan_rows"] == 3 and crm["orphan_keys"] == 2
+    assert crm["orphan_sample"] == ["CUST009", "CUST007"]
+    assert crm["missing_keys"] == 1 and crm["rows_checked"] == 4 and crm["orphan_pct"] == 75.0
+    assert crm["referenced_keys"] == 2
+    assert relations["subscriptions.product_id -> billing.product_id"]["orphan_rows"] == 0
+    assert results["total_orphan_rows"] == 3
+
+    issues = integrity_issues(results)
+    assert len(issues) == 1 and issues[0].startswith("HIGH: crm.customer_id")
+
+    # Relations whose table is not in the partition are skipped, not failed
+    partial = check_referential_integrity({"crm": data["crm"], "billing": data["billing"]})
+    assert partial["relations_checked"] == 1 and len(partial["skipped"]) == 3
+
+    # The index agrees with a plain membership test
+    keys = pd.Series([f"K{i}" for i in range(0, 20_000, 2)])
+    queries = pd.Series([f"K{i}" for i in range(20_000)])
+    found = KeyIndex(keys).contains(hash_column(queries))
+    assert (found == queries.isin(set(keys)).to_numpy()).all()
+
+    print("✅ Referential integrity test passed")
+
+if __name__ == "__main__":
+    test_referential_integrity()
@@ -0,0 +1,80 @@
+"""
+Test the schema gate: fingerprints are recorded per partition, drift against the previous
+partition and contract violations are reported, raw partitions without a fingerprint are
+reported as a missing baseline, and the gate raises on incompatible sources
+"""
+
+import sys
+import os
+import tempfile
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Task4_DataValidation.schema_registry import check_sources, fingerprint, compare, SchemaRegistry, SchemaDriftError
+
+def test_schema_registry():
+    metrics_file = os.environ.get("DMML_METRICS_FILE")
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DMML_METRICS_FILE"] = os.path.join(tmp, "metrics.jsonl")
+        try:
+            def write_crm(name, frame):
+                path = os.path.join(tmp, name)
+                frame.to_csv(path, index=False)
+                return {"type": "csv_glob", "table": "crm", "path": path}
+
+            crm = pd.DataFrame({
+                "ticket_id": ["T1", "T2"],
+                "customer_id": ["CUST001", "CUST002"],
+                "request_type": ["complaint", "disconnect"],
+                "created_at": ["2025-08-23 10:00:00", "2025-08-23 11:30:00"],
+                "status": ["open", None]
+            })
+            registry = SchemaRegistry(os.path.join(tmp, "schemas"))
+            raw_root = os.path.join(tmp, "raw")
+
+            # Compatible source: optional columns that are missing only warn
+            result = check_sources("2025-08-23", sources=[write_crm("day1.csv", crm)], registry=registry, raw_root=raw_root)
+            table = result["tables"][0]
+            assert result["status"] == "warning" and table["errors"] == []
+            assert any("disconnect_reason" in message for message in table["warnings"])
+            assert registry.partitions("crm") == ["2025-08-23"] and not table["changed"]
+            assert table["baseline_missing"] == [] and table["compared_with"] is None
+
+            # A raw partition stored without a schema check (e.g. by a backfill) is a missing baseline
+            os.makedirs(os.path.join(raw_root, "crm", "dt=2025-08-25"))
+            result = check_sources("2025-08-26", sources=[write_crm("day4.csv", crm)], registry=registry, raw_root=raw_root)
+            table = result["tables"][0]
+            assert table["baseline_missing"] == ["2025-08-25"] and table["compared_with"] == "2025-08-23"
+            assert "crm: no schema fingerprint for dt=2025-08-25 (compared with dt=2025-08-23)" in table["warnings"]
+
+            # New column and a renamed required column: drift is reported, the gate fails fast
+            drifted = crm.rename(columns={"request_type": "type"}).assign(channel=["web", "phone"])
+            source = write_crm("day2.csv", drifted)
+            try:
+                check_sources("2025-08-24", sources=[source], registry=registry, raw_root=raw_root)
+                assert False, "Expected SchemaDriftError"
+            except SchemaDriftError as e:
+                assert "crm.request_type" in str(e)
+            result = check_sources("2025-08-24", sources=[source], registry=registry, fail_fast=False, raw_root=raw_root)
+            table = result["tables"][0]
+            assert result["status"] == "failed" and table["changed"]
+            assert table["diff"]["added"] == ["type", "channel"] and table["diff"]["removed"] == ["request_type"]
+
+            # Text in a numeric column is a type change
+            before = fingerprint(pd.DataFrame({"amount_due": [1.0, 2.0], "note": [None, None]}))
+            after = fingerprint(pd.DataFrame({"amount_due": ["1.0", "n/a"], "note": ["a", "b"]}))
+            diff = compare(before, after)
+            assert diff["type_changed"] == [{"name": "amount_due", "from": "numeric", "to": "string"}]
+            assert before["hash"] != after["hash"]
+        finally:
+            if metrics_file is None:
+                os.environ.pop("DMML_METRICS_FILE", None)
+            else:
+                os.environ["DMML_METRICS_FILE"] = metrics_file
+
+    print("✅ Schema registry test passed")
+
+if __name__ == "__main__":
+    test_schema_registry()
@@ -23,6 +23,9 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.append(project_root)
 
 from utils.logger import get_logger
+from utils.metrics import track_stage, file_size
+from utils.csv_reader import read_csv
+from Task5_DataPreparation.deduplication import deduplicate, KeyIndex
 
 # Set plotting style
 plt.style.use('default')
@@ -36,16 +39,18 @@ logger = get_logger("data_preparation", log_file=os.path.join(project_root, "log
 class DataPreparation:
     """Data cleaning and basic preparation class"""
     
-    def __init__(self):
+    def __init__(self, data_root=None):
+        self.data_root = data_root or os.path.join(project_root, "data")
         self.cleaning_summary = {}
         self.data_quality_issues = []
         self.eda_insights = {}
+        self.deduplication_summary = {}
+        self.bytes_read = 0
     
     def load_latest_validated_data(self):
         """Load the most recent validated data from the data lake"""
         try:
-            data = {}
-            data_root = os.path.join(project_root, "data", "raw")
+            data_root = os.path.join(self.data_root, "raw")
             
             # Find the latest date partition
             latest_date = None
@@ -63,22 +68,69 @@ class DataPreparation:
             
             logger.info(f"Loading data from latest partition: {latest_date}")
             
-            # Load data from latest partition
+            return self.load_partition_data(latest_date), latest_date
+            
+        except Exception as e:
+            logger.error(f"Error loading validated data: {str(e)}")
+            raise
+    
+    def load_partition_data(self, partition_date):
+        """Load validated data for a specific dt= partition from the data lake"""
+        try:
+            data = {}
+            data_root = os.path.join(self.data_root, "raw")
+            
             for table_dir in os.listdir(data_root):
-                table_path = os.path.join(data_root, table_dir, f"dt={latest_date}")
+                table_path = os.path.join(data_root, table_dir, f"dt={partition_date}")
                 if os.path.isdir(table_path):
                     csv_files = glob.glob(os.path.join(table_path, "*.csv"))
                     if csv_files:
-                        df = pd.read_csv(csv_files[0])
+                        df = read_csv(csv_files[0])
+                        self.bytes_read += file_size(csv_files[0])
                         data[table_dir] = df
                         logger.info(f"Loaded {table_dir}: {df.shape}")
             
-            return data, latest_date
+            if not data:
+                raise FileNotFoundError(f"No data found for partition dt={partition_date}")
+            
+            return data
             
         except Exception as e:
-            logger.error(f"Error loading validated data: {str(e)}")
+            logger.error(f"Error loading partition {partition_date}: {str(e)}")
             raise
     
+    def deduplicate_data(self, data, partition_date, against_history=False, use_bloom=False):
+        """
+        Remove repeated invoice_id / ticket_id rows before cleaning so they cannot inflate the join
+        
+        Args:
+            data: Loaded tables of the partition
+            partition_date: dt= partition being prepared
+            against_history: Also drop keys already prepared in earlier partitions (incremental sources)
+            use_bloom: Check history through the key index's Bloom filter first
+        """
+        index_root = os.path.join(self.data_root, "dedup_index")
+        deduplicated = {}
+        for table_name, df in data.items():
+            index = KeyIndex(table_name, root=index_root, use_bloom=use_bloom)
+            deduplicated[table_name], stats = deduplicate(
+                df, table_name, partition_date, index=index, against_history=against_history
+            )
+            if stats["key"] is None:
+                continue
+            self.deduplication_summary[table_name] = stats
+            if stats["duplicates_within_partition"]:
+                self.data_quality_issues.append(
+                    f"Removed {stats['duplicates_within_partition']} {table_name} records with duplicate {stats['key']}"
+                )
+            if stats["duplicates_across_partitions"]:
+                action = "removed" if against_history else "kept"
+                self.data_quality_issues.append(
+                    f"{stats['duplicates_across_partitions']} {table_name} records repeat a {stats['key']} "
+                    f"from an earlier partition ({action})"
+                )
+        return deduplicated
+    
     def clean_billing_data(self, billing_df):
         """Clean and prepare billing data"""
         logger.info("Cleaning billing data...")
@@ -208,10 +260,7 @@ class DataPreparation:
         logger.info("Creating churn labels from CRM data...")
         
         # Identify churn events (disconnect requests that are closed)
-        churn_events = crm_df[
-            (crm_df['request_type'] == 'disconnect') & 
-            (crm_df['status'] == 'closed')
-        ].copy()
+        churn_events = self.create_churn_label_events(crm_df)
         
         # Create simple customer-level churn indicator
         churned_customers = churn_events['customer_id'].unique()
@@ -220,6 +269,42 @@ class DataPreparation:
         
         return churned_customers
     
+    def create_churn_label_events(self, crm_df, customers=None, observation_time=None):
+        """
+        Time-stamped churn labels for point-in-time training sets
+        
+        Args:
+            crm_df: Cleaned CRM tickets
+            customers: Optional customer ids observed in the partition; those without a
+                churn event become negative labels at observation_time
+            observation_time: When the negative labels were observed (e.g. end of the partition day)
+        
+        Returns:
+            DataFrame with customer_id, label_timestamp and is_churned, one row per customer
+        """
+        # A customer churns at the created_at of their first closed disconnect ticket
+        churn_events = crm_df[
+            (crm_df['request_type'] == 'disconnect') & 
+            (crm_df['status'] == 'closed')
+        ]
+        positives = (
+            churn_events.groupby('customer_id', as_index=False)['created_at'].min()
+            .rename(columns={'created_at': 'label_timestamp'})
+        )
+        positives['is_churned'] = 1
+        
+        if customers is None:
+            return positives
+        
+        retained = pd.Index(pd.unique(pd.Series(customers).dropna())).difference(positives['customer_id'])
+        negatives = pd.DataFrame({
+            'customer_id': retained,
+            'label_timestamp': pd.Timestamp(observation_time),
+            'is_churned': 0
+        })
+        logger.info(f"Label events: {len(positives)} churned, {len(negatives)} retained as of {observation_time}")
+        return pd.concat([positives, negatives], ignore_index=True)
+    
     def join_customer_data(self, billing_df, subscriptions_df, crm_df, churned_customers):
         """Simple join of all data sources into master table"""
         logger.info("Joining customer data from all sources...")
@@ -251,11 +336,16 @@ class DataPreparation:
                 'created_at': 'last_ticket_date'
             })
             
+            # Ticket counts per request type (tickets_complaint, tickets_disconnect, ...)
+            ticket_counts = pd.crosstab(crm_df['customer_id'], crm_df['request_type']).add_prefix('tickets_')
+            crm_summary = crm_summary.join(ticket_counts)
+            
             master_df = master_df.merge(
                 crm_summary,
                 on='customer_id',
                 how='left'
             )
+            master_df[ticket_counts.columns] = master_df[ticket_counts.columns].fillna(0).astype(int)
             logger.info(f"After joining CRM data: {len(master_df)} records")
         
         # Add simple churn label
@@ -306,7 +396,7 @@ class DataPreparation:
         """Save the cleaned dataset to the clean data location"""
         try:
             # Create clean data directory structure
-            clean_dir = os.path.join(project_root, "data", "clean", "churn_dataset", f"dt={partition_date}")
+            clean_dir = os.path.join(self.data_root, "clean", "churn_dataset", f"dt={partition_date}")
             os.makedirs(clean_dir, exist_ok=True)
             
             # Save the master dataset
@@ -333,39 +423,74 @@ class DataPreparation:
         return {
             "cleaning_summary": self.cleaning_summary,
             "data_quality_issues": self.data_quality_issues,
+            "deduplication_summary": self.deduplication_summary,
             "eda_insights": self.eda_insights,
             "preparation_timestamp": datetime.now().isoformat()
         }
 
-def prepare_clean_dataset():
-    """Main function to prepare clean, joined dataset (NO feature engineering)"""
+def prepare_clean_dataset(partition_date=None, data_root=None, dedup_against_history=False):
+    """
+    Main function to prepare clean, joined dataset (NO feature engineering)
+    
+    Args:
+        partition_date: Optional dt= partition to prepare (defaults to the latest partition)
+        data_root: Optional data lake root (defaults to <project root>/data)
+        dedup_against_history: Drop invoice/ticket keys already seen in earlier partitions
+            (for incremental sources; raw partitions are full snapshots by default)
+    """
     logger.info("Starting data preparation - cleaning and joining only...")
     
-    prep = DataPreparation()
+    prep = DataPreparation(data_root=data_root)
     
     try:
-        # Step 1: Load validated data
-        data, latest_date = prep.load_latest_validated_data()
-        logger.info(f"Loaded {len(data)} tables from partition: {latest_date}")
-        
-        # Step 2: Clean individual datasets
-        billing_clean = prep.clean_billing_data(data['billing'])
-        subscriptions_clean = prep.clean_subscriptions_data(data['subscriptions'])
-        crm_clean = prep.clean_crm_data(data['crm'])
-        
-        # Step 3: Create simple churn labels
-        churned_customers = prep.create_churn_labels(crm_clean)
-        
-        # Step 4: Join all data into master table (NO feature engineering)
-        master_dataset = prep.join_customer_data(
-            billing_clean, subscriptions_clean, crm_clean, churned_customers
-        )
-        
-        # Step 5: Basic EDA only
-        eda_results = prep.perform_basic_eda(master_dataset)
-        
-        # Step 6: Save clean dataset
-        save_results = prep.save_cleaned_dataset(master_dataset, latest_date)
+        with track_stage("preparation", partition_date=partition_date) as stage_metrics:
+            # Step 1: Load validated data
+            with track_stage("preparation.load") as m:
+                if partition_date:
+                    data, latest_date = prep.load_partition_data(partition_date), partition_date
+                else:
+                    data, latest_date = prep.load_latest_validated_data()
+                m.rows_out = sum(len(df) for df in data.values())
+                m.bytes_read = prep.bytes_read
+            logger.info(f"Loaded {len(data)} tables from partition: {latest_date}")
+            stage_metrics.rows_in = m.rows_out
+            stage_metrics.bytes_read = m.bytes_read
+            
+            # Step 1b: Remove duplicate invoice_id / ticket_id rows
+            with track_stage("preparation.dedup") as m:
+                m.rows_in = stage_metrics.rows_in
+                data = prep.deduplicate_data(data, latest_date, against_history=dedup_against_history)
+                m.rows_out = sum(len(df) for df in data.values())
+            
+            # Step 2: Clean individual datasets
+            with track_stage("preparation.clean") as m:
+                billing_clean = prep.clean_billing_data(data['billing'])
+                subscriptions_clean = prep.clean_subscriptions_data(data['subscriptions'])
+                crm_clean = prep.clean_crm_data(data['crm'])
+                m.rows_in = stage_metrics.rows_in
+                m.rows_out = len(billing_clean) + len(subscriptions_clean) + len(crm_clean)
+            
+            # Step 3: Create simple churn labels
+            churned_customers = prep.create_churn_labels(crm_clean)
+            
+            # Step 4: Join all data into master table (NO feature engineering)
+            with track_stage("preparation.join") as m:
+                master_dataset = prep.join_customer_data(
+                    billing_clean, subscriptions_clean, crm_clean, churned_customers
+                )
+                m.rows_in = len(billing_clean) + len(subscriptions_clean) + len(crm_clean)
+                m.rows_out = len(master_dataset)
+            
+            # Step 5: Basic EDA only
+            with track_stage("preparation.eda") as m:
+                eda_results = prep.perform_basic_eda(master_dataset)
+                m.rows_in = len(master_dataset)
+            
+            # Step 6: Save clean dataset
+            with track_stage("preparation.save") as m:
+                save_results = prep.save_cleaned_dataset(master_dataset, latest_date)
+                m.rows_out = stage_metrics.rows_out = len(master_dataset)
+                m.bytes_written = stage_metrics.bytes_written = file_size(save_results['output_file'])
         
         # Step 7: Generate summary
         preparation_summary = prep.generate_preparation_summary()
@@ -0,0 +1,266 @@
+"""
+Task 5: Data Preparation - Deduplication
+Detects and removes repeated primary keys (invoice_id, ticket_id) within a partition and
+against earlier partitions
+
+Keys are hashed to 64 bits with pandas' vectorized hashing, so duplicate detection is a sort /
+searchsorted over integers rather than a join on strings. The keys of every prepared partition
+are kept in an on-disk index (one sorted .npy array per partition under data/dedup_index/<table>/),
+which lets incoming data be checked against history without reloading any earlier raw file;
+an optional Bloom filter in front of the index skips the exact lookup for keys that are
+certainly new. Writers of one table (e.g. partitions prepared in parallel by a backfill) take a
+file lock, so concurrent Bloom filter updates are not lost.
+
+Raw partitions are full daily snapshots of the sources, so the same invoice legitimately appears
+in dt=2025-08-23 and dt=2025-08-24: cross-partition duplicates are counted by default and only
+removed when against_history=True (incremental loads). Duplicates inside one partition (re-sent
+files, overlapping exports) are always removed, keeping the last occurrence.
+"""
+
+import os
+import sys
+import glob
+import json
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # fcntl is not available on Windows
+    fcntl = None
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+
+from utils.logger import get_logger
+
+logger = get_logger("data_preparation", log_file=os.path.join(project_root, "logs", "data_preparation.log"))
+
+# Primary key of each table that has one
+PRIMARY_KEYS = {
+    "billing": ["invoice_id"],
+    "crm": ["ticket_id"]
+}
+
+BLOOM_HASHES = 7
+# Bits per key for a ~1% false positive rate at BLOOM_HASHES hash functions
+BLOOM_BITS_PER_KEY = 10
+# Keys hashed at once, bounding the BLOOM_HASHES x chunk position matrix (~56 MB at 1M keys)
+BLOOM_CHUNK = 1 << 20
+
+
+def hash_keys(df, key_columns):
+    """
+    64-bit hash of each row's key (vectorized)
+
+    Returns:
+        (uint64 hashes, boolean mask of rows whose key is complete)
+    """
+    keys = df[key_columns]
+    complete = keys.notna().all(axis=1).to_numpy()
+    hashes = pd.util.hash_pandas_object(keys.astype(object), index=False, categorize=False).to_numpy()
+    return hashes, complete
+
+
+def _sorted_unique(hashes):
+    # np.sort + neighbour comparison; np.unique is several times slower on uint64
+    ordered = np.sort(np.asarray(hashes, dtype=np.uint64))
+    return ordered[np.concatenate(([True], ordered[1:] != ordered[:-1]))] if len(ordered) else ordered
+
+
+def duplicate_mask(hashes, complete=None):
+    """Rows whose key occurs again later in the frame (the last occurrence is kept)"""
+    duplicated = pd.Series(hashes).duplicated(keep="last").to_numpy()
+    return duplicated & complete if complete is not None else duplicated
+
+
+class BloomFilter:
+    """Bit array with k hash positions per key, derived from one 64-bit hash by double hashing"""
+
+    def __init__(self, bits, hashes=BLOOM_HASHES):
+        self.bits = bits
+        self.size = len(bits) * 8
+        self.hashes = hashes
+
+    @classmethod
+    def empty(cls, capacity):
+        size = max(int(capacity) * BLOOM_BITS_PER_KEY, 1 << 16)
+        return cls(np.zeros((size + 7) // 8, dtype=np.uint8))
+
+    def _positions(self, hashes):
+        low = hashes & np.uint64(0xFFFFFFFF)
+        high = (hashes >> np.uint64(32)) | np.uint64(1)
+        steps = np.arange(self.hashes, dtype=np.uint64)[:, None]
+        return ((low[None, :] + steps * high[None, :]) % np.uint64(self.size)).astype(np.int64)
+
+    def add(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        for start in range(0, len(hashes), BLOOM_CHUNK):
+            positions = self._positions(hashes[start:start + BLOOM_CHUNK]).ravel()
+            # Set the bits in the packed array itself (no unpacked copy of 8 bytes per bit)
+            np.bitwise_or.at(self.bits, positions >> 3, (1 << (positions & 7)).astype(np.uint8))
+
+    def might_contain(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        found = np.empty(len(hashes), dtype=bool)
+        for start in range(0, len(hashes), BLOOM_CHUNK):
+            positions = self._positions(hashes[start:start + BLOOM_CHUNK])
+            found[start:start + BLOOM_CHUNK] = ((self.bits[positions >> 3] >> (positions & 7)) & 1).all(axis=0)
+        return found
+
+
+class KeyIndex:
+    """
+    On-disk key hashes of every indexed partition of a table
+
+    Args:
+        table: Table name
+        root: Index directory (default: data/dedup_index)
+        use_bloom: Keep a Bloom filter over all indexed keys and use it to skip exact lookups
+    """
+
+    def __init__(self, table, root=None, use_bloom=False):
+        self.table = table
+        self.table_dir = os.path.join(root or os.path.join(project_root, "data", "dedup_index"), table)
+        self.use_bloom = use_bloom
+        self.bloom_file = os.path.join(self.table_dir, "bloom.npy")
+        self.lock_file = os.path.join(self.table_dir, ".lock")
+
+    def partitions(self):
+        """Indexed partition dates, oldest first"""
+        files = glob.glob(os.path.join(self.table_dir, "dt=*.npy"))
+        return sorted(os.path.basename(path)[3:-4] for path in files)
+
+    def _partition_file(self, partition_date):
+        return os.path.join(self.table_dir, f"dt={partition_date}.npy")
+
+    def _load_bloom(self):
+        if not self.use_bloom or not os.path.exists(self.bloom_file):
+            return None
+        return BloomFilter(np.load(self.bloom_file))
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive lock on the table's index across threads and processes"""
+        os.makedirs(self.table_dir, exist_ok=True)
+        with open(self.lock_file, "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def add(self, partition_date, hashes):
+        """Index (or re-index) a partition's keys"""
+        hashes = _sorted_unique(hashes)
+        with self._locked():
+            # Bloom filter first: readers may then see a filter covering keys of a partition
+            # file not yet written (a false positive), never a partition the filter misses
+            if self.use_bloom:
+                self._update_bloom(partition_date, hashes)
+            tmp_file = os.path.join(self.table_dir, f".dt={partition_date}.tmp.npy")
+            np.save(tmp_file, hashes)
+            os.replace(tmp_file, self._partition_file(partition_date))
+
+    def _update_bloom(self, partition_date, hashes):
+        """Add a partition's keys to the Bloom filter (caller holds the lock)"""
+        bloom = self._load_bloom()
+        others = [d for d in self.partitions() if d != partition_date]
+        total = len(hashes) + sum(len(np.load(self._partition_file(d), mmap_mode="r")) for d in others)
+        if bloom is None or total * BLOOM_BITS_PER_KEY > bloom.size:
+            # Rebuild with room to grow so the false positive rate stays near 1%
+            bloom = BloomFilter.empty(2 * total)
+            for other in others:
+                bloom.add(np.load(self._partition_file(other), mmap_mode="r"))
+        bloom.add(hashes)
+        tmp_file = os.path.join(self.table_dir, ".bloom.tmp.npy")
+        np.save(tmp_file, bloom.bits)
+        os.replace(tmp_file, self.bloom_file)
+
+    def contains(self, hashes, before=None):
+        """
+        Which hashes are already indexed (only partitions older than before, if given)
+        Partition arrays are memory-mapped and searched with a vectorized binary search.
+        """
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        found = np.zeros(len(hashes), dtype=bool)
+        candidates = np.arange(len(hashes))
+
+        bloom = self._load_bloom()
+        if bloom is not None:
+            candidates = candidates[bloom.might_contain(hashes)]
+
+        # Query in sorted order: the binary searches then walk the index sequentially
+        candidates = candidates[np.argsort(hashes[candidates], kind="stable")]
+        for partition_date in self.partitions():
+            if before is not None and partition_date >= before:
+                continue
+            if not len(candidates):
+                break
+            indexed = np.load(self._partition_file(partition_date), mmap_mode="r")
+            if not len(indexed):
+                continue
+            wanted = hashes[candidates]
+            position = np.minimum(np.searchsorted(indexed, wanted), len(indexed) - 1)
+            hit = indexed[position] == wanted
+            found[candidates[hit]] = True
+            candidates = candidates[~hit]
+        return found
+
+
+def deduplicate(df, table, partition_date=None, index=None, against_history=False):
+    """
+    Remove repeated primary keys from one table of a partition
+
+    Args:
+        df: Table rows
+        table: Table name (tables without an entry in PRIMARY_KEYS are returned unchanged)
+        partition_date: dt= partition the rows belong to (needed for the history check)
+        index: KeyIndex of the table; the partition's keys are added to it
+        against_history: Also drop rows whose key was seen in an earlier indexed partition
+
+    Returns:
+        (deduplicated DataFrame, statistics dictionary)
+    """
+    key_columns = PRIMARY_KEYS.get(table)
+    if not key_columns or not set(key_columns) <= set(df.columns):
+        return df, {"table": table, "key": None, "rows_in": len(df), "rows_out": len(df)}
+
+    hashes, complete = hash_keys(df, key_columns)
+    within = duplicate_mask(hashes, complete)
+
+    across = np.zeros(len(df), dtype=bool)
+    if index is not None and partition_date is not None:
+        across = index.contains(hashes, before=partition_date) & complete & ~within
+
+    drop = within | across if against_history else within
+    result = df[~drop]
+
+    if index is not None and partition_date is not None:
+        index.add(partition_date, hashes[~drop & complete])
+
+    stats = {
+        "table": table,
+        "key": ", ".join(key_columns),
+        "rows_in": len(df),
+        "rows_out": len(result),
+        "duplicates_within_partition": int(within.sum()),
+        "duplicates_across_partitions": int(across.sum()),
+        "removed": int(drop.sum()),
+        "missing_keys": int((~complete).sum())
+    }
+    logger.info(
+        f"Deduplicated {table} on {stats['key']}: {stats['duplicates_within_partition']} within partition, "
+        f"{stats['duplicates_across_partitions']} seen in earlier partitions, {stats['removed']} removed"
+    )
+    return result, stats
+
+
+if __name__ == "__main__":
+    for table in PRIMARY_KEYS:
+        index = KeyIndex(table)
+        print(f"{table}: indexed partitions {json.dumps(index.partitions())}")
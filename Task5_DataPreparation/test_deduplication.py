@@ -0,0 +1,88 @@
+"""
+Test deduplication: repeated keys inside a partition are dropped (last one kept), keys of
+earlier partitions are found through the on-disk index, with or without the Bloom filter, and
+partitions indexed concurrently all reach the Bloom filter
+"""
+
+import sys
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import Task5_DataPreparation.deduplication as deduplication
+from Task5_DataPreparation.deduplication import deduplicate, KeyIndex, BloomFilter, hash_keys
+
+def test_deduplication():
+    day1 = pd.DataFrame({
+        "invoice_id": ["INV1", "INV2", "INV3"],
+        "amount_due": [50.0, 120.0, 80.0]
+    })
+    # Re-sent INV2 (corrected amount), INV3 again from day 1, one row without a key
+    day2 = pd.DataFrame({
+        "invoice_id": ["INV2", "INV4", "INV2", "INV3", None, None],
+        "amount_due": [120.0, 60.0, 125.0, 80.0, 10.0, 10.0]
+    })
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for use_bloom in (False, True):
+            index = KeyIndex("billing", root=os.path.join(tmp, f"bloom-{use_bloom}"), use_bloom=use_bloom)
+            deduplicate(day1, "billing", "2025-08-23", index=index)
+
+            kept, stats = deduplicate(day2, "billing", "2025-08-24", index=index)
+            assert kept["invoice_id"].tolist()[:3] == ["INV4", "INV2", "INV3"] and kept["invoice_id"].isna().sum() == 2
+            assert kept["amount_due"].tolist()[1] == 125.0
+            assert stats["duplicates_within_partition"] == 1
+            assert stats["duplicates_across_partitions"] == 2
+            assert stats["missing_keys"] == 2
+
+            incremental, stats = deduplicate(day2, "billing", "2025-08-24", index=index, against_history=True)
+            assert incremental["invoice_id"].tolist()[0] == "INV4" and len(incremental) == 3
+            assert stats["removed"] == 3
+
+            # Re-running an older partition only looks at partitions before it
+            _, stats = deduplicate(day1, "billing", "2025-08-23", index=index)
+            assert stats["duplicates_across_partitions"] == 0
+            assert index.partitions() == ["2025-08-23", "2025-08-24"]
+
+        # Tables without a primary key pass through untouched
+        subscriptions = pd.DataFrame({"customer_id": ["CUST001", "CUST001"]})
+        unchanged, stats = deduplicate(subscriptions, "subscriptions")
+        assert len(unchanged) == 2 and stats["key"] is None
+
+        # Partitions indexed in parallel (as in a backfill): no Bloom filter update is lost
+        index = KeyIndex("crm", root=os.path.join(tmp, "parallel"), use_bloom=True)
+        days = {f"2025-08-{day:02d}": np.arange(day * 1000, day * 1000 + 500, dtype=np.uint64) for day in range(1, 13)}
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            list(pool.map(lambda item: index.add(*item), days.items()))
+        assert index.partitions() == sorted(days)
+        bloom = index._load_bloom()
+        assert all(bloom.might_contain(hashes).all() for hashes in days.values())
+
+    # Bloom filter has no false negatives and few false positives
+    keys = pd.DataFrame({"ticket_id": [f"TKT{i}" for i in range(20_000)]})
+    hashes, _ = hash_keys(keys, ["ticket_id"])
+    bloom = BloomFilter.empty(10_000)
+    bloom.add(hashes[:10_000])
+    assert bloom.might_contain(hashes[:10_000]).all()
+    assert bloom.might_contain(hashes[10_000:]).mean() < 0.03
+
+    # Chunked adds and lookups set and test the same bits as one pass
+    original_chunk = deduplication.BLOOM_CHUNK
+    deduplication.BLOOM_CHUNK = 999
+    try:
+        chunked = BloomFilter.empty(10_000)
+        chunked.add(hashes[:10_000])
+        assert (chunked.bits == bloom.bits).all()
+        assert (chunked.might_contain(hashes) == bloom.might_contain(hashes)).all()
+    finally:
+        deduplication.BLOOM_CHUNK = original_chunk
+
+    print("✅ Deduplication test passed")
+
+if __name__ == "__main__":
+    test_deduplication()
@@ -0,0 +1,314 @@
+"""
+Task 6: Data Transformation
+Customer-level churn features computed from the clean master dataset (Task 5 output)
+Features are declared once below; the engine evaluates all of them in a single pass
+"""
+
+import os
+import sys
+import json
+import glob
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+
+from utils.logger import get_logger
+from utils.metrics import track_stage, file_size
+from Task6_DataTransformation.window_aggregations import build_window_aggregates
+
+# Initialize logger
+logger = get_logger("data_transformation", log_file=os.path.join(project_root, "logs", "data_transformation.log"))
+
+ENTITY_KEY = "customer_id"
+LABEL_COLUMN = "is_churned"
+DATE_COLUMNS = ["invoice_date", "payment_date", "subscription_start", "last_ticket_date"]
+REQUEST_TYPES = ["disconnect", "complaint", "upgrade", "inquiry", "billing_issue"]
+
+
+class FeatureDefinition:
+    """
+    Declarative customer-level feature: a vectorized row expression reduced per customer.
+
+    Args:
+        name: Output column name
+        inputs: Source columns of the clean dataset the expression needs
+        expression: Optional callable (chunk, as_of) -> Series; defaults to the single input column
+        aggregation: How rows are reduced per customer: sum, count, mean, max or min
+        default: Value used when an input column is absent from the source (None = required)
+        description: Human readable description for reports and the feature store
+    """
+
+    def __init__(self, name, inputs, expression=None, aggregation="sum", default=None, description=""):
+        if aggregation not in PARTIAL_AGGREGATIONS:
+            raise ValueError(f"Unsupported aggregation '{aggregation}' for feature {name}")
+        self.name = name
+        self.inputs = list(inputs)
+        self.expression = expression
+        self.aggregation = aggregation
+        self.default = default
+        self.description = description
+
+    def evaluate(self, chunk, as_of):
+        missing = [col for col in self.inputs if col not in chunk.columns]
+        if missing:
+            if self.default is None:
+                raise KeyError(f"Feature {self.name} requires missing columns: {missing}")
+            return pd.Series(self.default, index=chunk.index, dtype="float64")
+        if self.expression is None:
+            return chunk[self.inputs[0]]
+        return self.expression(chunk, as_of)
+
+
+class DerivedFeature:
+    """Feature computed from other (already aggregated) customer-level features"""
+
+    def __init__(self, name, depends_on, expression, description=""):
+        self.name = name
+        self.depends_on = list(depends_on)
+        self.expression = expression
+        self.description = description
+
+
+# Partial aggregates computed per chunk, and how partials are combined across chunks
+PARTIAL_AGGREGATIONS = {
+    "sum": [("", "sum")],
+    "count": [("", "count")],
+    "max": [("", "max")],
+    "min": [("", "min")],
+    "mean": [("__sum", "sum"), ("__count", "count")]
+}
+COMBINE_AGGREGATIONS = {"sum": "sum", "count": "sum", "max": "max", "min": "min"}
+
+
+def _days_between(later, earlier):
+    return (later - earlier).dt.days.astype("float64")
+
+
+FEATURE_DEFINITIONS = [
+    FeatureDefinition("invoice_count", ["invoice_id"], aggregation="count",
+                      description="Number of invoices"),
+    FeatureDefinition("amount_due_total", ["amount_due"], aggregation="sum",
+                      description="Total amount invoiced"),
+    FeatureDefinition("amount_paid_total", ["amount_paid"], aggregation="sum",
+                      description="Total amount paid"),
+    FeatureDefinition("days_to_pay_mean", ["payment_date", "invoice_date"],
+                      lambda df, as_of: _days_between(df["payment_date"], df["invoice_date"]),
+                      aggregation="mean", description="Average days between invoice and payment"),
+    FeatureDefinition("days_to_pay_max", ["payment_date", "invoice_date"],
+                      lambda df, as_of: _days_between(df["payment_date"], df["invoice_date"]),
+                      aggregation="max", description="Longest days between invoice and payment"),
+    FeatureDefinition("unpaid_invoice_count", ["payment_date"],
+                      lambda df, as_of: df["payment_date"].isna().astype("int64"),
+                      aggregation="sum", description="Invoices without a payment date"),
+    FeatureDefinition("monthly_fee", ["monthly_fee"], aggregation="max",
+                      description="Current monthly subscription fee"),
+    FeatureDefinition("tenure_days", ["subscription_start"],
+                      lambda df, as_of: _days_between(pd.Series(as_of, index=df.index), df["subscription_start"]),
+                      aggregation="max", description="Days since subscription start"),
+    FeatureDefinition("total_tickets", ["total_tickets"], aggregation="max",
+                      description="Total CRM tickets raised"),
+    FeatureDefinition("days_since_last_ticket", ["last_ticket_date"],
+                      lambda df, as_of: _days_between(pd.Series(as_of, index=df.index), df["last_ticket_date"].dt.normalize()),
+                      aggregation="min", description="Days since the most recent CRM ticket"),
+] + [
+    FeatureDefinition(f"tickets_{request_type}", [f"tickets_{request_type}"], aggregation="max", default=0,
+                      description=f"CRM tickets of type '{request_type}'")
+    for request_type in REQUEST_TYPES
+] + [
+    FeatureDefinition(LABEL_COLUMN, [LABEL_COLUMN], aggregation="max",
+                      description="Churn label (1=Churned, 0=Retained)"),
+]
+
+DERIVED_FEATURES = [
+    DerivedFeature("payment_ratio", ["amount_paid_total", "amount_due_total"],
+                   lambda f: f["amount_paid_total"] / f["amount_due_total"].replace(0, np.nan),
+                   description="Share of invoiced amount that was paid"),
+    DerivedFeature("outstanding_amount", ["amount_due_total", "amount_paid_total"],
+                   lambda f: f["amount_due_total"] - f["amount_paid_total"],
+                   description="Invoiced amount not yet paid"),
+]
+
+
+def required_columns(definitions):
+    """Union of source columns needed by the feature definitions"""
+    columns = [ENTITY_KEY]
+    for definition in definitions:
+        for col in definition.inputs:
+            if col not in columns:
+                columns.append(col)
+    return columns
+
+
+class FeatureEngine:
+    """Evaluates declarative feature definitions over the clean dataset in one streaming pass"""
+
+    def __init__(self, definitions=None, derived=None, chunksize=500_000):
+        self.definitions = FEATURE_DEFINITIONS if definitions is None else definitions
+        self.derived = DERIVED_FEATURES if derived is None else derived
+        self.chunksize = chunksize
+        self.rows_read = 0
+
+    def _partial_aggregate(self, chunk, as_of):
+        """Evaluate every row expression on a chunk, then reduce per customer with one groupby"""
+        values = {ENTITY_KEY: chunk[ENTITY_KEY]}
+        for definition in self.definitions:
+            values[definition.name] = definition.evaluate(chunk, as_of)
+        frame = pd.DataFrame(values)
+
+        named_aggregations = {}
+        for definition in self.definitions:
+            for suffix, func in PARTIAL_AGGREGATIONS[definition.aggregation]:
+                named_aggregations[definition.name + suffix] = (definition.name, func)
+        return frame.groupby(ENTITY_KEY, sort=False).agg(**named_aggregations)
+
+    def _combine(self, partials):
+        """Merge per-chunk partial aggregates and finalize means"""
+        combined = pd.concat(partials)
+        if len(partials) > 1:
+            combine_funcs = {}
+            for definition in self.definitions:
+                if definition.aggregation == "mean":
+                    combine_funcs[definition.name + "__sum"] = "sum"
+                    combine_funcs[definition.name + "__count"] = "sum"
+                else:
+                    combine_funcs[definition.name] = COMBINE_AGGREGATIONS[definition.aggregation]
+            combined = combined.groupby(level=0, sort=False).agg(combine_funcs)
+
+        features = pd.DataFrame(index=combined.index)
+        for definition in self.definitions:
+            if definition.aggregation == "mean":
+                features[definition.name] = combined[definition.name + "__sum"] / combined[definition.name + "__count"].replace(0, np.nan)
+            else:
+                features[definition.name] = combined[definition.name]
+
+        for derived in self.derived:
+            features[derived.name] = derived.expression(features)
+        return features
+
+    def compute(self, clean_file, as_of):
+        """
+        Compute customer-level features from a clean dataset file
+
+        Args:
+            clean_file: Path to cleaned_churn_dataset.csv
+            as_of: Reference date for recency/tenure features
+
+        Returns:
+            DataFrame indexed by customer_id with one column per feature
+        """
+        as_of = pd.Timestamp(as_of)
+        header = pd.read_csv(clean_file, nrows=0).columns
+        usecols = [col for col in required_columns(self.definitions) if col in header]
+        date_columns = [col for col in DATE_COLUMNS if col in usecols]
+
+        partials = []
+        self.rows_read = 0
+        # Only the columns the features need are parsed, in row chunks to bound memory
+        for chunk in pd.read_csv(clean_file, usecols=usecols, chunksize=self.chunksize):
+            for col in date_columns:
+                chunk[col] = pd.to_datetime(chunk[col], errors="coerce")
+            partials.append(self._partial_aggregate(chunk, as_of))
+            self.rows_read += len(chunk)
+
+        if not partials:
+            return pd.DataFrame(columns=[d.name for d in self.definitions] + [d.name for d in self.derived])
+        return self._combine(partials)
+
+    def describe(self):
+        """Feature metadata for reports and the feature store"""
+        return [
+            {"name": d.name, "inputs": d.inputs, "aggregation": d.aggregation, "description": d.description}
+            for d in self.definitions
+        ] + [
+            {"name": d.name, "inputs": d.depends_on, "aggregation": "derived", "description": d.description}
+            for d in self.derived
+        ]
+
+
+def find_clean_partition(partition_date=None, data_root=None):
+    """Return (partition_date, clean file path) for a given or the latest clean partition"""
+    clean_root = os.path.join(data_root or os.path.join(project_root, "data"), "clean", "churn_dataset")
+    if partition_date is None:
+        partitions = sorted(d.replace("dt=", "") for d in os.listdir(clean_root) if d.startswith("dt="))
+        if not partitions:
+            raise FileNotFoundError(f"No clean partitions found in {clean_root}")
+        partition_date = partitions[-1]
+
+    csv_files = glob.glob(os.path.join(clean_root, f"dt={partition_date}", "*.csv"))
+    if not csv_files:
+        raise FileNotFoundError(f"No clean dataset found for partition dt={partition_date}")
+    return partition_date, csv_files[0]
+
+
+def save_features(features, partition_date, data_root=None):
+    """Write the feature partition and its feature definitions"""
+    out_dir = os.path.join(data_root or os.path.join(project_root, "data"), "features", "churn_features", f"dt={partition_date}")
+    os.makedirs(out_dir, exist_ok=True)
+    out_file = os.path.join(out_dir, "churn_features.csv")
+    features.to_csv(out_file, index=True, index_label=ENTITY_KEY)
+    return out_file
+
+
+def build_features(partition_date=None, data_root=None, engine=None, include_windows=True):
+    """
+    Main transformation function: clean dataset partition -> feature partition
+
+    Args:
+        partition_date: Clean partition to transform (default: latest)
+        data_root: Data directory (default: <project>/data)
+        engine: FeatureEngine to use (default: FEATURE_DEFINITIONS)
+        include_windows: Also update the rolling window state and join its features
+    """
+    logger.info("Starting feature engineering...")
+    engine = engine or FeatureEngine()
+
+    try:
+        with track_stage("transformation", partition_date=partition_date) as m:
+            partition_date, clean_file = find_clean_partition(partition_date, data_root)
+            logger.info(f"Computing {len(engine.definitions) + len(engine.derived)} features from {clean_file}")
+
+            features = engine.compute(clean_file, as_of=partition_date)
+            feature_definitions = engine.describe()
+
+            if include_windows:
+                window_results = build_window_aggregates(partition_date, data_root=data_root)
+                window_features = window_results['windows']
+                features = features.join(window_features, how="left")
+                features[window_features.columns] = features[window_features.columns].fillna(0.0)
+                feature_definitions += window_results['feature_definitions']
+
+            output_file = save_features(features, partition_date, data_root)
+
+            with open(os.path.join(os.path.dirname(output_file), "feature_definitions.json"), "w", encoding="utf-8") as f:
+                json.dump(feature_definitions, f, indent=2)
+
+            m.rows_in = engine.rows_read
+            m.rows_out = len(features)
+            m.bytes_read = file_size(clean_file)
+            m.bytes_written = file_size(output_file)
+
+        logger.info(f"Features saved: {output_file} ({features.shape[0]} customers x {features.shape[1]} features)")
+
+        return {
+            "status": "success",
+            "partition_date": partition_date,
+            "output_file": output_file,
+            "customers": len(features),
+            "feature_count": features.shape[1],
+            "feature_definitions": feature_definitions,
+            "feature_summary": features.describe().T.reset_index().rename(columns={"index": "feature"}),
+            "transformation_timestamp": datetime.now().isoformat()
+        }
+
+    except Exception as e:
+        logger.error(f"Feature engineering failed: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    result = build_features()
+    print(f"Features built: {result['customers']} customers x {result['feature_count']} features -> {result['output_file']}")
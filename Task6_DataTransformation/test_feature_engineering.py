@@ -0,0 +1,153 @@
+"""
+Test the feature engine: chunked evaluation must match a single pass,
+and incremental rolling windows must match a full rebuild
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Task6_DataTransformation.feature_engineering import FeatureEngine
+from Task6_DataTransformation.window_aggregations import WindowAggregator
+
+def make_clean_dataset(path):
+    """Small clean dataset with two invoices for CUST001"""
+    pd.DataFrame({
+        "invoice_id": ["INV1", "INV2", "INV3"],
+        "customer_id": ["CUST001", "CUST002", "CUST001"],
+        "amount_due": [50.0, 120.0, 50.0],
+        "amount_paid": [50.0, 0.0, 25.0],
+        "invoice_date": ["2025-07-01", "2025-08-01", "2025-08-01"],
+        "payment_date": ["2025-07-03", None, "2025-08-11"],
+        "monthly_fee": [50.0, 120.0, 50.0],
+        "subscription_start": ["2025-01-01", "2024-08-24", "2025-01-01"],
+        "total_tickets": [2, 0, 2],
+        "last_ticket_date": ["2025-08-20 10:00:00", None, "2025-08-20 10:00:00"],
+        "tickets_disconnect": [1, 0, 1],
+        "tickets_complaint": [1, 0, 1],
+        "is_churned": [1, 0, 1]
+    }).to_csv(path)
+
+def test_feature_engine():
+    """Features are correct and identical whether the file is read in one chunk or many"""
+    with tempfile.TemporaryDirectory() as tmp:
+        clean_file = os.path.join(tmp, "cleaned_churn_dataset.csv")
+        make_clean_dataset(clean_file)
+
+        single_pass = FeatureEngine().compute(clean_file, as_of="2025-08-24")
+        chunked = FeatureEngine(chunksize=1).compute(clean_file, as_of="2025-08-24")
+
+        pd.testing.assert_frame_equal(single_pass.sort_index(), chunked.sort_index(), check_like=True)
+
+        # An explicitly empty list means no derived features, not the defaults
+        base_only = FeatureEngine(derived=[]).compute(clean_file, as_of="2025-08-24")
+        assert "payment_ratio" in single_pass.columns and "payment_ratio" not in base_only.columns
+
+        cust1 = single_pass.loc["CUST001"]
+        assert cust1["invoice_count"] == 2
+        assert cust1["payment_ratio"] == 0.75
+        assert cust1["days_to_pay_mean"] == 6.0
+        assert cust1["tenure_days"] == 235
+        assert cust1["days_since_last_ticket"] == 4
+        assert cust1["tickets_upgrade"] == 0  # column absent from source -> default
+
+        cust2 = single_pass.loc["CUST002"]
+        assert cust2["unpaid_invoice_count"] == 1
+        assert cust2["outstanding_amount"] == 120.0
+        assert cust2["tenure_days"] == 365
+
+    print("✅ Feature engine test passed")
+
+def make_raw_partitions(data_root):
+    """Daily billing/crm snapshots where each day repeats earlier events and adds new ones"""
+    billing = pd.DataFrame({
+        "invoice_id": ["INV1", "INV2", "INV3", "INV4"],
+        "customer_id": ["CUST001", "CUST002", "CUST001", "CUST002"],
+        "amount_due": [50.0, 120.0, 50.0, 80.0],
+        "amount_paid": [50.0, 0.0, 0.0, 0.0],
+        "invoice_date": ["2025-05-20", "2025-07-01", "2025-08-22", "2025-08-24"],
+        "payment_date": ["2025-05-25", None, None, None]
+    })
+    crm = pd.DataFrame({
+        "ticket_id": ["TKT1", "TKT2", "TKT3"],
+        "customer_id": ["CUST001", "CUST001", "CUST002"],
+        "created_at": ["2025-08-01 09:00:00", "2025-08-20 10:00:00", "2025-08-23 11:00:00"],
+        "request_type": ["complaint", "disconnect", "inquiry"]
+    })
+    for day in ["2025-08-22", "2025-08-23", "2025-08-24"]:
+        for table, df, time_column in [("billing", billing, "invoice_date"), ("crm", crm, "created_at")]:
+            out_dir = os.path.join(data_root, "raw", table, f"dt={day}")
+            os.makedirs(out_dir)
+            df[df[time_column] <= day + " 23:59:59"].to_csv(os.path.join(out_dir, f"{table}.csv"), index=False)
+
+def test_window_aggregations():
+    """Day-by-day incremental updates give the same windows as one full sweep"""
+    with tempfile.TemporaryDirectory() as tmp:
+        make_raw_partitions(tmp)
+
+        for day in ["2025-08-22", "2025-08-23", "2025-08-24"]:
+            incremental, mode = WindowAggregator(data_root=tmp).update(day)
+        assert mode == "incremental"
+
+        # Without state the aggregator replays all partitions in one sweep
+        shutil.rmtree(os.path.join(tmp, "features", "window_state"))
+        full, mode = WindowAggregator(data_root=tmp).update("2025-08-24")
+        assert mode == "full"
+
+        pd.testing.assert_frame_equal(incremental.sort_index(), full.sort_index())
+
+        cust1 = full.loc["CUST001"]
+        assert cust1["unpaid_invoices_30d"] == 1
+        assert cust1["invoiced_amount_90d"] == 50.0  # INV1 is older than 90 days
+        assert cust1["tickets_7d"] == 1
+        assert cust1["tickets_30d"] == 2
+        assert cust1["disconnect_tickets_7d"] == 1
+
+        cust2 = full.loc["CUST002"]
+        assert cust2["unpaid_amount_30d"] == 80.0
+        assert cust2["unpaid_amount_60d"] == 200.0
+
+    print("✅ Window aggregation test passed")
+
+def test_window_status_change():
+    """An invoice paid after an earlier snapshot counts as paid, in full and incremental mode"""
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshots = {"2025-08-22": (0.0, None), "2025-08-23": (50.0, "2025-08-23")}
+        for day, (amount_paid, payment_date) in snapshots.items():
+            out_dir = os.path.join(tmp, "raw", "billing", f"dt={day}")
+            os.makedirs(out_dir)
+            pd.DataFrame({
+                "invoice_id": ["INV1"],
+                "customer_id": ["CUST001"],
+                "amount_due": [50.0],
+                "amount_paid": [amount_paid],
+                "invoice_date": ["2025-08-20"],
+                "payment_date": [payment_date]
+            }).to_csv(os.path.join(out_dir, "billing.csv"), index=False)
+
+        before, _ = WindowAggregator(data_root=tmp).update("2025-08-22")
+        assert before.loc["CUST001", "unpaid_invoices_30d"] == 1
+        incremental, mode = WindowAggregator(data_root=tmp).update("2025-08-23")
+        assert mode == "incremental"
+
+        shutil.rmtree(os.path.join(tmp, "features", "window_state"))
+        full, mode = WindowAggregator(data_root=tmp).update("2025-08-23")
+        assert mode == "full"
+
+        for windows in (incremental, full):
+            cust1 = windows.loc["CUST001"]
+            assert cust1["unpaid_invoices_30d"] == 0
+            assert cust1["unpaid_amount_30d"] == 0.0
+            assert cust1["invoiced_amount_30d"] == 50.0  # counted once, not once per snapshot
+
+    print("✅ Window status change test passed")
+
+if __name__ == "__main__":
+    test_feature_engine()
+    test_window_aggregations()
+    test_window_status_change()
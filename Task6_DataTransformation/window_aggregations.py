@@ -0,0 +1,300 @@
+"""
+Task 6: Data Transformation - Rolling Time-Window Aggregations
+Multi-window rolling counts and sums per customer over billing and CRM history
+
+Raw dt= partitions are full daily snapshots, so the same invoice or ticket appears in
+every partition and its latest copy wins (an invoice unpaid yesterday may be paid today).
+The per-event metric values of the longest window are kept on disk, keyed by the event's
+primary key: each run reads only the new partition, replaces the events whose keys it
+contains, adds new ones and expires events older than the longest window instead of
+rescanning history. Daily per-customer buckets are then summed from the retained events.
+"""
+
+import os
+import sys
+import json
+import glob
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+
+from utils.logger import get_logger
+from utils.metrics import track_stage, file_size
+
+logger = get_logger("data_transformation", log_file=os.path.join(project_root, "logs", "data_transformation.log"))
+
+ENTITY_KEY = "customer_id"
+# Identifies an event in the window state across sources
+EVENT_COLUMNS = ["source", "event_key"]
+# Bumped when the state layout changes, so older state is rebuilt from history
+STATE_VERSION = 2
+
+
+class WindowMetric:
+    """
+    Declarative rolling metric: a per-event value summed over trailing windows.
+
+    Args:
+        name: Metric name (output columns are <name>_<window>d)
+        source: Raw table the events come from (billing, crm, ...)
+        key: Event primary key used to drop events repeated across partitions
+        time_column: Event timestamp column that places the event in a daily bucket
+        inputs: Columns the value expression needs
+        value: Callable (events) -> numeric Series; 1 per event when None (a count)
+        windows: Trailing window lengths in days
+    """
+
+    def __init__(self, name, source, key, time_column, inputs=(), value=None, windows=(30,)):
+        self.name = name
+        self.source = source
+        self.key = key
+        self.time_column = time_column
+        self.inputs = list(inputs)
+        self.value = value
+        self.windows = list(windows)
+
+    def evaluate(self, events):
+        if self.value is None:
+            return pd.Series(1, index=events.index, dtype="float64")
+        return self.value(events).astype("float64")
+
+    def output_columns(self):
+        return [f"{self.name}_{window}d" for window in self.windows]
+
+
+WINDOW_METRICS = [
+    WindowMetric("unpaid_invoices", "billing", "invoice_id", "invoice_date", ["payment_date"],
+                 lambda df: df["payment_date"].isna(), windows=(30, 60, 90)),
+    WindowMetric("unpaid_amount", "billing", "invoice_id", "invoice_date", ["amount_due", "amount_paid", "payment_date"],
+                 lambda df: (df["amount_due"] - df["amount_paid"]).where(df["payment_date"].isna(), 0.0), windows=(30, 60, 90)),
+    WindowMetric("invoiced_amount", "billing", "invoice_id", "invoice_date", ["amount_due"],
+                 lambda df: df["amount_due"], windows=(30, 60, 90)),
+    WindowMetric("tickets", "crm", "ticket_id", "created_at", windows=(7, 30)),
+    WindowMetric("disconnect_tickets", "crm", "ticket_id", "created_at", ["request_type"],
+                 lambda df: df["request_type"].str.lower() == "disconnect", windows=(7, 30)),
+]
+
+
+class WindowAggregator:
+    """Keeps the events of the longest window and evaluates trailing windows over their daily buckets"""
+
+    def __init__(self, metrics=None, data_root=None):
+        self.metrics = metrics or WINDOW_METRICS
+        self.data_root = data_root or os.path.join(project_root, "data")
+        self.state_dir = os.path.join(self.data_root, "features", "window_state")
+        self.max_window = max(window for metric in self.metrics for window in metric.windows)
+        self.bucket_columns = [metric.name for metric in self.metrics]
+        self.events_read = 0
+
+    # ---------- state ----------
+
+    def load_state(self):
+        """Return (retained events, last processed day) or (None, None) when no state exists"""
+        state_file = os.path.join(self.state_dir, "state.json")
+        events_file = os.path.join(self.state_dir, "window_events.csv")
+        if not (os.path.exists(state_file) and os.path.exists(events_file)):
+            return None, None
+        with open(state_file, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("version") != STATE_VERSION or state.get("metrics") != self.bucket_columns:
+            logger.info("Window metric definitions or state layout changed - rebuilding window state from history")
+            return None, None
+        events = pd.read_csv(events_file, parse_dates=["day"], dtype={"event_key": str, ENTITY_KEY: str})
+        return events, pd.Timestamp(state["last_day"])
+
+    def save_state(self, events, last_day):
+        os.makedirs(self.state_dir, exist_ok=True)
+        events.to_csv(os.path.join(self.state_dir, "window_events.csv"), index=False)
+        with open(os.path.join(self.state_dir, "state.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "version": STATE_VERSION,
+                "last_day": last_day.date().isoformat(),
+                "max_window_days": self.max_window,
+                "metrics": self.bucket_columns,
+                "events": len(events),
+                "updated_at": datetime.now().isoformat()
+            }, f, indent=2)
+
+    # ---------- events ----------
+
+    def _partition_files(self, source, up_to):
+        """Raw partition files of a source with dt <= up_to, oldest first"""
+        files = []
+        for path in glob.glob(os.path.join(self.data_root, "raw", source, "dt=*", "*.csv")):
+            partition = os.path.basename(os.path.dirname(path)).replace("dt=", "")
+            if partition <= up_to:
+                files.append((partition, path))
+        return [path for _, path in sorted(files)]
+
+    def load_events(self, partition_files, end_day):
+        """
+        Per-event metric values of the events in partition_files with event day <= end_day.
+        Partitions are read oldest first and the latest copy of each event is kept.
+
+        Returns:
+            (events, keys): events with EVENT_COLUMNS, customer, day and one column per metric;
+            keys holds every (source, event_key) read, including events outside the range,
+            so the caller can replace stale copies of them
+        """
+        event_frames, key_frames = [], []
+        for source in sorted({metric.source for metric in self.metrics}):
+            metrics = [metric for metric in self.metrics if metric.source == source]
+            files = partition_files.get(source, [])
+            if not files:
+                continue
+
+            key, time_column = metrics[0].key, metrics[0].time_column
+            usecols = [ENTITY_KEY, key, time_column] + [col for m in metrics for col in m.inputs]
+            usecols = list(dict.fromkeys(usecols))
+            raw = pd.concat([pd.read_csv(path, usecols=usecols) for path in files], ignore_index=True)
+            # Snapshots repeat events; the newest partition holds the current state of each one
+            raw = raw.drop_duplicates(subset=[key], keep="last")
+            self.events_read += len(raw)
+            key_frames.append(pd.DataFrame({"source": source, "event_key": raw[key].astype(str)}))
+
+            day = pd.to_datetime(raw[time_column], errors="coerce").dt.normalize()
+            raw = raw[day <= end_day]
+            events = pd.DataFrame({
+                "source": source,
+                "event_key": raw[key].astype(str),
+                ENTITY_KEY: raw[ENTITY_KEY].astype(str),
+                "day": day[day <= end_day]
+            })
+            for metric in metrics:
+                events[metric.name] = metric.evaluate(raw)
+            event_frames.append(events)
+
+        columns = EVENT_COLUMNS + [ENTITY_KEY, "day"] + self.bucket_columns
+        keys = pd.concat(key_frames, ignore_index=True) if key_frames else pd.DataFrame(columns=EVENT_COLUMNS)
+        if not event_frames:
+            return pd.DataFrame(columns=columns), keys
+        # Metrics of another source stay at zero
+        return pd.concat(event_frames, ignore_index=True).reindex(columns=columns, fill_value=0.0), keys
+
+    def daily_buckets(self, events):
+        """Sum retained events into daily per-customer buckets"""
+        if events.empty:
+            return pd.DataFrame(columns=[ENTITY_KEY, "day"] + self.bucket_columns)
+        return events.groupby([ENTITY_KEY, "day"], sort=False)[self.bucket_columns].sum().reset_index()
+
+    # ---------- windows ----------
+
+    def evaluate_windows(self, buckets, as_of):
+        """
+        One sorted sweep over the buckets: sort by customer, mask each metric by
+        window age, and reduce every window column at the customer boundaries.
+        """
+        output_columns = [col for metric in self.metrics for col in metric.output_columns()]
+        if buckets.empty:
+            return pd.DataFrame(columns=output_columns).rename_axis(ENTITY_KEY)
+
+        buckets = buckets.sort_values(ENTITY_KEY, kind="stable")
+        customers = buckets[ENTITY_KEY].to_numpy()
+        boundaries = np.flatnonzero(np.r_[True, customers[1:] != customers[:-1]])
+        age_days = (as_of - buckets["day"]).dt.days.to_numpy()
+
+        windows = {}
+        for metric in self.metrics:
+            values = np.nan_to_num(buckets[metric.name].to_numpy(dtype="float64"))
+            for window, column in zip(metric.windows, metric.output_columns()):
+                windows[column] = np.add.reduceat(np.where(age_days < window, values, 0.0), boundaries)
+
+        return pd.DataFrame(windows, index=pd.Index(customers[boundaries], name=ENTITY_KEY))[output_columns]
+
+    def describe(self):
+        """Window feature metadata, in the same shape as FeatureEngine.describe()"""
+        return [
+            {
+                "name": f"{metric.name}_{window}d",
+                "inputs": [metric.time_column] + metric.inputs,
+                "aggregation": f"rolling_{window}d",
+                "description": f"{metric.name.replace('_', ' ').capitalize()} over the last {window} days ({metric.source})"
+            }
+            for metric in self.metrics for window in metric.windows
+        ]
+
+    def update(self, as_of):
+        """
+        Advance the window state to as_of and return the window features.
+        Without state, history is replayed once from every raw partition <= as_of.
+        """
+        as_of_day = pd.Timestamp(as_of).normalize()
+        events, last_day = self.load_state()
+
+        if events is not None and last_day > as_of_day:
+            logger.info(f"Window state is at {last_day.date()}, later than {as_of_day.date()} - rebuilding from history")
+            events, last_day = None, None
+
+        partition_key = as_of_day.date().isoformat()
+        sources = {metric.source for metric in self.metrics}
+        if events is None:
+            # Full build: all history up to as_of in one pass
+            partition_files = {source: self._partition_files(source, partition_key) for source in sources}
+            mode = "full"
+        else:
+            # Incremental: only the new partition
+            partition_files = {
+                source: [path for path in self._partition_files(source, partition_key) if f"dt={partition_key}" in path]
+                for source in sources
+            }
+            mode = "incremental"
+
+        new_events, keys = self.load_events(partition_files, as_of_day)
+        if events is None:
+            events = new_events
+        else:
+            # Events present in the new partition replace their earlier copies (e.g. an invoice
+            # paid since), so the buckets of their days are recomputed from the current values
+            stale = pd.MultiIndex.from_frame(events[EVENT_COLUMNS]).isin(pd.MultiIndex.from_frame(keys))
+            events = pd.concat([events[~stale], new_events], ignore_index=True)
+
+        # Expire events that have fallen out of the longest window
+        events = events[events["day"] > as_of_day - pd.Timedelta(days=self.max_window)]
+        self.save_state(events, as_of_day)
+
+        logger.info(f"Window state updated ({mode}): {len(new_events)} events read, {len(events)} retained")
+        return self.evaluate_windows(self.daily_buckets(events), as_of_day), mode
+
+
+def build_window_aggregates(partition_date, data_root=None, aggregator=None):
+    """Main function: update rolling window state and write window features for a partition"""
+    logger.info(f"Starting rolling window aggregation for {partition_date}...")
+    aggregator = aggregator or WindowAggregator(data_root=data_root)
+
+    try:
+        with track_stage("transformation.windows", partition_date=partition_date) as m:
+            windows, mode = aggregator.update(partition_date)
+
+            out_dir = os.path.join(aggregator.data_root, "features", "window_aggregates", f"dt={partition_date}")
+            os.makedirs(out_dir, exist_ok=True)
+            output_file = os.path.join(out_dir, "window_aggregates.csv")
+            windows.to_csv(output_file, index=True)
+
+            m.rows_in = aggregator.events_read
+            m.rows_out = len(windows)
+            m.bytes_written = file_size(output_file)
+
+        logger.info(f"Window aggregates saved: {output_file} ({len(windows)} customers, {windows.shape[1]} columns)")
+        return {
+            "status": "success",
+            "mode": mode,
+            "partition_date": partition_date,
+            "output_file": output_file,
+            "customers": len(windows),
+            "columns": list(windows.columns),
+            "windows": windows,
+            "feature_definitions": aggregator.describe()
+        }
+
+    except Exception as e:
+        logger.error(f"Window aggregation failed: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    result = build_window_aggregates(datetime.today().date().isoformat())
+    print(f"Window aggregates ({result['mode']}): {result['customers']} customers -> {result['output_file']}")
@@ -0,0 +1,430 @@
+"""
+Task 7: Feature Store
+Local feature store with an offline store for training and an online store for scoring
+
+- Offline store: columnar (Parquet) files partitioned by dt, one folder per feature view
+- Online store: embedded SQLite key-value table per feature view keyed by customer_id,
+  holding the latest materialized feature vector for low-latency lookups
+- Registry: feature view metadata (features, descriptions, materialized partitions)
+"""
+
+import os
+import sys
+import json
+import glob
+import sqlite3
+import threading
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+
+from utils.logger import get_logger
+from utils.metrics import track_stage, file_size
+from Task8_DataVersioning.dataset_diff import diff_files
+
+logger = get_logger("feature_store", log_file=os.path.join(project_root, "logs", "feature_store.log"))
+
+ENTITY_KEY = "customer_id"
+TIMESTAMP_COLUMN = "event_timestamp"
+DEFAULT_FEATURE_VIEW = "churn_features"
+
+try:
+    import pyarrow  # noqa: F401 - Parquet engine for the offline store
+    OFFLINE_FORMAT = "parquet"
+except ImportError:
+    OFFLINE_FORMAT = "csv"
+
+
+def _quote(identifier):
+    """Quote a column/table name for SQLite"""
+    return '"' + str(identifier).replace('"', '""') + '"'
+
+
+class FeatureStore:
+    """
+    Offline + online feature store rooted at data/feature_store
+
+    Usage:
+        store = FeatureStore()
+        store.materialize(features_df, "2025-08-24")
+        online = store.get_features(["CUST001", "CUST002"])
+        training = store.get_features_as_of(["CUST001"], "2025-08-23")
+    """
+
+    def __init__(self, root=None):
+        self.root = root or os.path.join(project_root, "data", "feature_store")
+        self.offline_root = os.path.join(self.root, "offline")
+        self.online_db = os.path.join(self.root, "online", "features.db")
+        self.registry_file = os.path.join(self.root, "registry.json")
+        self._local = threading.local()
+
+    # ---------- registry ----------
+
+    def load_registry(self):
+        if not os.path.exists(self.registry_file):
+            return {}
+        with open(self.registry_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_registry(self, registry):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_file = self.registry_file + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(registry, f, indent=2, sort_keys=True)
+        os.replace(tmp_file, self.registry_file)
+
+    def list_features(self, feature_view=DEFAULT_FEATURE_VIEW):
+        """Registered feature metadata of a feature view"""
+        return self.load_registry().get(feature_view, {}).get("features", [])
+
+    # ---------- online store ----------
+
+    def _connection(self):
+        """One SQLite connection per thread, reused across lookups"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.online_db), exist_ok=True)
+            conn = sqlite3.connect(self.online_db)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA cache_size=-65536")
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _ensure_online_table(self, conn, feature_view):
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS feature_schemas ("
+            "feature_view TEXT NOT NULL, schema_id INTEGER NOT NULL, columns TEXT NOT NULL, "
+            "PRIMARY KEY (feature_view, schema_id))"
+        )
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {_quote(feature_view)} ("
+            f"{_quote(ENTITY_KEY)} TEXT PRIMARY KEY, {_quote(TIMESTAMP_COLUMN)} TEXT NOT NULL, "
+            f"schema_id INTEGER NOT NULL, features BLOB NOT NULL) WITHOUT ROWID"
+        )
+
+    def _schema_id(self, conn, feature_view, columns):
+        """Id of the feature layout (column order) of a value blob, registering new layouts"""
+        layout = json.dumps(columns)
+        rows = conn.execute(
+            "SELECT schema_id, columns FROM feature_schemas WHERE feature_view = ?", (feature_view,)
+        ).fetchall()
+        for schema_id, existing in rows:
+            if existing == layout:
+                return schema_id
+        schema_id = max((row[0] for row in rows), default=0) + 1
+        conn.execute("INSERT INTO feature_schemas VALUES (?, ?, ?)", (feature_view, schema_id, layout))
+        return schema_id
+
+    def _schemas(self, conn, feature_view):
+        return {
+            schema_id: json.loads(columns) for schema_id, columns in conn.execute(
+                "SELECT schema_id, columns FROM feature_schemas WHERE feature_view = ?", (feature_view,)
+            )
+        }
+
+    def _write_online(self, features, partition_date, feature_view):
+        """
+        Upsert the partition into the online key-value table in one transaction.
+        Each value is the customer's feature vector packed as float64 bytes.
+        Rows only replace values of the same or an older partition, so backfilling
+        old dates is safe.
+        """
+        non_numeric = [col for col in features.columns if not pd.api.types.is_numeric_dtype(features[col])]
+        if non_numeric:
+            raise ValueError(f"Online store holds numeric features only, got: {non_numeric}")
+
+        conn = self._connection()
+        table = _quote(feature_view)
+        vectors = features.to_numpy(dtype="float64")
+        with conn:
+            self._ensure_online_table(conn, feature_view)
+            schema_id = self._schema_id(conn, feature_view, list(features.columns))
+            conn.executemany(
+                f"INSERT INTO {table} VALUES (?, ?, ?, ?) "
+                f"ON CONFLICT({_quote(ENTITY_KEY)}) DO UPDATE SET "
+                f"{_quote(TIMESTAMP_COLUMN)} = excluded.{_quote(TIMESTAMP_COLUMN)}, "
+                f"schema_id = excluded.schema_id, features = excluded.features "
+                f"WHERE excluded.{_quote(TIMESTAMP_COLUMN)} >= {table}.{_quote(TIMESTAMP_COLUMN)}",
+                zip(features.index, [partition_date] * len(features), [schema_id] * len(features),
+                    (vector.tobytes() for vector in vectors))
+            )
+
+    def get_features(self, customer_ids, feature_names=None, feature_view=DEFAULT_FEATURE_VIEW):
+        """
+        Online lookup of the latest feature values for many customers at once
+
+        Args:
+            customer_ids: Iterable of customer ids
+            feature_names: Optional subset of features (default: all)
+            feature_view: Feature view to read
+
+        Returns:
+            DataFrame indexed by customer_id in request order (unknown customers are NaN rows)
+        """
+        customer_ids = [str(customer_id) for customer_id in customer_ids]
+        columns, values, timestamps = self.get_feature_vectors(customer_ids, feature_names, feature_view)
+        frame = pd.DataFrame(values, columns=columns, index=pd.Index(customer_ids, name=ENTITY_KEY))
+        frame.insert(0, TIMESTAMP_COLUMN, timestamps)
+        return frame
+
+    def get_feature_vectors(self, customer_ids, feature_names=None, feature_view=DEFAULT_FEATURE_VIEW):
+        """
+        Online lookup returning plain arrays, for latency-sensitive callers (no DataFrame is built)
+
+        Returns:
+            (feature columns, float64 matrix in request order with NaN rows for unknown customers,
+            list of event timestamps with None for unknown customers)
+        """
+        customer_ids = [str(customer_id) for customer_id in customer_ids]
+        conn = self._connection()
+        schemas = self._schemas(conn, feature_view) if self._has_table(conn, "feature_schemas") else {}
+        if not schemas:
+            raise KeyError(f"Feature view '{feature_view}' has not been materialized to the online store")
+
+        columns = list(feature_names) if feature_names else schemas[max(schemas)]
+        known = {col for layout in schemas.values() for col in layout}
+        unknown = [col for col in columns if col not in known]
+        if unknown:
+            raise KeyError(f"Unknown features for view '{feature_view}': {unknown}")
+
+        # The whole id list is bound as one JSON parameter: a single primary-key join
+        # instead of one query (or a parameter limit) per customer
+        rows = conn.execute(
+            f"SELECT {_quote(ENTITY_KEY)}, {_quote(TIMESTAMP_COLUMN)}, schema_id, features FROM {_quote(feature_view)} "
+            f"WHERE {_quote(ENTITY_KEY)} IN (SELECT value FROM json_each(?))",
+            (json.dumps(customer_ids),)
+        ).fetchall()
+
+        # Decode all vectors of one layout with a single frombuffer instead of per value
+        found = np.full((len(rows), len(columns)), np.nan)
+        for schema_id in {row[2] for row in rows}:
+            positions = [i for i, row in enumerate(rows) if row[2] == schema_id]
+            layout = schemas[schema_id]
+            values = np.frombuffer(b"".join(rows[i][3] for i in positions), dtype="float64").reshape(len(positions), len(layout))
+            target = [j for j, col in enumerate(columns) if col in layout]
+            source = [layout.index(columns[j]) for j in target]
+            found[np.ix_(positions, target)] = values[:, source]
+
+        row_of = {row[0]: i for i, row in enumerate(rows)}
+        requested = np.fromiter((row_of.get(customer_id, -1) for customer_id in customer_ids), dtype=np.int64, count=len(customer_ids))
+        hit = requested >= 0
+        matrix = np.full((len(customer_ids), len(columns)), np.nan)
+        matrix[hit] = found[requested[hit]]
+        timestamps = [rows[i][1] if i >= 0 else None for i in requested]
+        return columns, matrix, timestamps
+
+    def list_online_entities(self, feature_view=DEFAULT_FEATURE_VIEW):
+        """All customer ids held in the online store of a feature view"""
+        conn = self._connection()
+        if not self._has_table(conn, feature_view):
+            return []
+        return [row[0] for row in conn.execute(f"SELECT {_quote(ENTITY_KEY)} FROM {_quote(feature_view)}")]
+
+    def _has_table(self, conn, table):
+        return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone() is not None
+
+    # ---------- offline store ----------
+
+    def _offline_dir(self, feature_view):
+        return os.path.join(self.offline_root, feature_view)
+
+    def list_partitions(self, feature_view=DEFAULT_FEATURE_VIEW):
+        """Materialized dt= partitions of a feature view, oldest first"""
+        return sorted(
+            os.path.basename(path).replace("dt=", "")
+            for path in glob.glob(os.path.join(self._offline_dir(feature_view), "dt=*"))
+        )
+
+    def _write_offline(self, features, partition_date, feature_view):
+        out_dir = os.path.join(self._offline_dir(feature_view), f"dt={partition_date}")
+        os.makedirs(out_dir, exist_ok=True)
+        frame = features.reset_index()
+        frame.insert(1, TIMESTAMP_COLUMN, pd.Timestamp(partition_date))
+
+        out_file = os.path.join(out_dir, f"features.{OFFLINE_FORMAT}")
+        tmp_file = out_file + ".tmp"
+        if OFFLINE_FORMAT == "parquet":
+            frame.to_parquet(tmp_file, index=False)
+        else:
+            frame.to_csv(tmp_file, index=False)
+        os.replace(tmp_file, out_file)
+        return out_file
+
+    def read_partition(self, partition_date, columns=None, feature_view=DEFAULT_FEATURE_VIEW):
+        """Read one offline partition, optionally only some columns"""
+        files = glob.glob(os.path.join(self._offline_dir(feature_view), f"dt={partition_date}", "features.*"))
+        if not files:
+            raise FileNotFoundError(f"No offline partition dt={partition_date} for feature view '{feature_view}'")
+        if columns is not None:
+            columns = list(dict.fromkeys([ENTITY_KEY, TIMESTAMP_COLUMN] + list(columns)))
+        if files[0].endswith(".parquet"):
+            frame = pd.read_parquet(files[0], columns=columns)
+        else:
+            frame = pd.read_csv(files[0], usecols=columns, parse_dates=[TIMESTAMP_COLUMN])
+        frame[ENTITY_KEY] = frame[ENTITY_KEY].astype(str)
+        return frame
+
+    def read_offline(self, start_date=None, end_date=None, columns=None, feature_view=DEFAULT_FEATURE_VIEW):
+        """Time-stamped feature snapshots of all partitions in [start_date, end_date]"""
+        partitions = [
+            p for p in self.list_partitions(feature_view)
+            if (start_date is None or p >= str(start_date)) and (end_date is None or p <= str(end_date))
+        ]
+        frames = [self.read_partition(p, columns, feature_view) for p in partitions]
+        if not frames:
+            return pd.DataFrame(columns=[ENTITY_KEY, TIMESTAMP_COLUMN] + list(columns or []))
+        return pd.concat(frames, ignore_index=True)
+
+    def get_features_as_of(self, customer_ids, as_of, feature_names=None, feature_view=DEFAULT_FEATURE_VIEW):
+        """
+        Point-in-time lookup: for each customer, the features of the latest partition
+        on or before as_of (never values materialized after it)
+        """
+        remaining = {str(customer_id) for customer_id in customer_ids}
+        as_of = pd.Timestamp(as_of).date().isoformat()
+        found = []
+        # Newest partition first; stop as soon as every customer has a snapshot
+        for partition_date in reversed([p for p in self.list_partitions(feature_view) if p <= as_of]):
+            frame = self.read_partition(partition_date, feature_names, feature_view)
+            frame = frame[frame[ENTITY_KEY].isin(remaining)]
+            if not frame.empty:
+                found.append(frame)
+                remaining -= set(frame[ENTITY_KEY])
+            if not remaining:
+                break
+
+        ids = pd.Index([str(customer_id) for customer_id in customer_ids], name=ENTITY_KEY)
+        if not found:
+            return pd.DataFrame(index=ids, columns=[TIMESTAMP_COLUMN] + list(feature_names or []))
+        return pd.concat(found, ignore_index=True).set_index(ENTITY_KEY).reindex(ids)
+
+    # ---------- materialization ----------
+
+    def materialize(self, features, partition_date, feature_definitions=None, feature_view=DEFAULT_FEATURE_VIEW,
+                    online_entities=None):
+        """
+        Batch-materialize a feature partition to the offline and online stores
+
+        Args:
+            features: DataFrame indexed by customer_id, one column per feature
+            partition_date: dt of the features (used as their event timestamp)
+            feature_definitions: Optional feature metadata (name, description, ...) for the registry
+            feature_view: Feature view name
+            online_entities: Optional customer ids whose features changed since the last
+                materialization; only those rows are written to the online store
+
+        Returns:
+            Dictionary with materialization summary
+        """
+        partition_date = pd.Timestamp(partition_date).date().isoformat()
+        features = features.copy()
+        features.index = features.index.astype(str).rename(ENTITY_KEY)
+
+        offline_file = self._write_offline(features, partition_date, feature_view)
+        online_features = features if online_entities is None else features[features.index.isin(online_entities)]
+        self._write_online(online_features, partition_date, feature_view)
+
+        registry = self.load_registry()
+        view = registry.setdefault(feature_view, {"entity": ENTITY_KEY, "partitions": []})
+        known = {f["name"]: f for f in view.get("features", [])}
+        for definition in feature_definitions or []:
+            known[definition["name"]] = definition
+        for col in features.columns:
+            known.setdefault(col, {"name": col, "description": ""})
+            known[col]["dtype"] = str(features[col].dtype)
+        view["features"] = [known[name] for name in sorted(known)]
+        view["partitions"] = sorted(set(view["partitions"]) | {partition_date})
+        view["online_as_of"] = max(view["partitions"])
+        view["updated_at"] = datetime.now().isoformat()
+        self._save_registry(registry)
+
+        return {
+            "feature_view": feature_view,
+            "partition_date": partition_date,
+            "entities": len(features),
+            "features": features.shape[1],
+            "offline_file": offline_file,
+            "offline_bytes": file_size(offline_file),
+            "online_db": self.online_db,
+            "online_rows_written": len(online_features)
+        }
+
+
+def materialize_features(partition_date=None, features_root=None, store=None, incremental=True):
+    """
+    Main function: materialize a transformation output partition into the feature store
+
+    With incremental=True and the online store holding the previous partition, the
+    partition is diffed against the previous one and only customers whose features
+    changed are written to the online store (the offline snapshot is always complete).
+    """
+    logger.info("Starting feature store materialization...")
+    store = store or FeatureStore()
+    features_root = features_root or os.path.join(project_root, "data", "features", "churn_features")
+
+    try:
+        with track_stage("feature_store", partition_date=partition_date) as m:
+            partitions = sorted(d.replace("dt=", "") for d in os.listdir(features_root) if d.startswith("dt="))
+            if partition_date is None:
+                if not partitions:
+                    raise FileNotFoundError(f"No feature partitions found in {features_root}")
+                partition_date = partitions[-1]
+
+            partition_dir = os.path.join(features_root, f"dt={partition_date}")
+            features_file = os.path.join(partition_dir, "churn_features.csv")
+            features = pd.read_csv(features_file, index_col=ENTITY_KEY)
+
+            online_entities = None
+            previous = [p for p in partitions if p < partition_date]
+            view = store.load_registry().get(DEFAULT_FEATURE_VIEW, {})
+            if incremental and previous and view.get("online_as_of") == previous[-1]:
+                previous_file = os.path.join(features_root, f"dt={previous[-1]}", "churn_features.csv")
+                diff = diff_files(previous_file, features_file, key=ENTITY_KEY)
+                if not diff["columns_added"] and not diff["columns_removed"]:
+                    online_entities = diff["changed_customers"]
+                    logger.info(
+                        f"Incremental online update vs dt={previous[-1]}: {diff['counts']['added']} added, "
+                        f"{diff['counts']['modified']} modified customers"
+                    )
+
+            definitions_file = os.path.join(partition_dir, "feature_definitions.json")
+            definitions = None
+            if os.path.exists(definitions_file):
+                with open(definitions_file, "r", encoding="utf-8") as f:
+                    definitions = json.load(f)
+
+            result = store.materialize(features, partition_date, feature_definitions=definitions,
+                                       online_entities=online_entities)
+            result["incremental"] = online_entities is not None
+
+            m.rows_in = m.rows_out = len(features)
+            m.bytes_read = file_size(features_file)
+            m.bytes_written = result["offline_bytes"]
+
+        logger.info(
+            f"Materialized {result['entities']} customers x {result['features']} features "
+            f"for dt={partition_date} (offline: {result['offline_file']}, "
+            f"online: {result['online_rows_written']} rows to {result['online_db']})"
+        )
+        result["status"] = "success"
+        return result
+
+    except Exception as e:
+        logger.error(f"Feature store materialization failed: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    result = materialize_features()
+    print(f"Materialized {result['entities']} customers x {result['features']} features for dt={result['partition_date']}")
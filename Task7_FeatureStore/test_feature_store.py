@@ -0,0 +1,53 @@
+"""
+Test the feature store: online lookups serve the newest partition,
+point-in-time lookups never return values from after the requested date
+"""
+
+import sys
+import os
+import tempfile
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Task7_FeatureStore.feature_store import FeatureStore
+
+def make_features(tenure, tickets):
+    return pd.DataFrame({
+        "tenure_days": tenure,
+        "total_tickets": tickets
+    }, index=pd.Index(["CUST001", "CUST002"], name="customer_id"))
+
+def test_feature_store():
+    """Materialize three partitions (one backfilled out of order) and read them back"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = FeatureStore(root=tmp)
+        store.materialize(make_features([10, 20], [0, 1]), "2025-08-22")
+        store.materialize(make_features([12, 22], [3, 1]), "2025-08-24")
+        # Backfilling an older partition must not overwrite newer online values
+        store.materialize(make_features([11, 21], [2, 1]), "2025-08-23")
+
+        online = store.get_features(["CUST002", "CUST999", "CUST001"])
+        assert list(online.index) == ["CUST002", "CUST999", "CUST001"]
+        assert online.loc["CUST001", "total_tickets"] == 3
+        assert online.loc["CUST002", "event_timestamp"] == "2025-08-24"
+        assert online.loc["CUST999"].isna().all()
+
+        subset = store.get_features(["CUST001"], feature_names=["tenure_days"])
+        assert list(subset.columns) == ["event_timestamp", "tenure_days"]
+
+        as_of = store.get_features_as_of(["CUST001", "CUST002"], "2025-08-23")
+        assert as_of.loc["CUST001", "tenure_days"] == 11
+        assert as_of.loc["CUST002", "event_timestamp"] == pd.Timestamp("2025-08-23")
+
+        assert store.list_partitions() == ["2025-08-22", "2025-08-23", "2025-08-24"]
+        registry = store.load_registry()["churn_features"]
+        assert registry["online_as_of"] == "2025-08-24"
+        assert {f["name"] for f in registry["features"]} == {"tenure_days", "total_tickets"}
+        store.close()
+
+    print("✅ Feature store test passed")
+
+if __name__ == "__main__":
+    test_feature_store()
@@ -0,0 +1,278 @@
+"""
+Task 8: Data Versioning - Row-Level Dataset Diff
+Compares two partitions (or two versions) of a table keyed by ticket_id / invoice_id / customer_id
+
+Pass 1 streams both files in chunks and keeps only a 64-bit hash of each key and of each
+row (computed vectorized with pandas' hash_pandas_object), sorted by key hash. Keys present on one
+side only are added/removed; keys whose row hash differs are modified.
+Pass 2 streams the files again and pulls out just the changed rows, compares them column by
+column, and builds the change summary. Neither file is ever fully loaded.
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+
+from utils.logger import get_logger
+from utils.metrics import track_stage
+
+logger = get_logger("data_versioning", log_file=os.path.join(project_root, "logs", "data_versioning.log"))
+
+# Key candidates, most specific first
+DEFAULT_KEYS = ["ticket_id", "invoice_id", "customer_id"]
+ENTITY_KEY = "customer_id"
+CHUNKSIZE = 500_000
+
+
+def infer_key(columns):
+    """Most specific known key column present in a table"""
+    for key in DEFAULT_KEYS:
+        if key in columns:
+            return key
+    raise KeyError(f"No key column ({', '.join(DEFAULT_KEYS)}) found in {list(columns)}")
+
+
+def _compared_columns(path):
+    # Unnamed columns are written row indexes: they shift with every insert, so never compare them
+    return [col for col in pd.read_csv(path, nrows=0).columns if not col.startswith("Unnamed:")]
+
+
+def _read_chunks(path, columns, chunksize):
+    # Values are compared as text exactly as stored, so no type inference per chunk
+    return pd.read_csv(path, usecols=columns, dtype=object, keep_default_na=False, chunksize=chunksize)
+
+
+def _key_hashes(path, key, columns, chunksize):
+    """
+    Pass 1: (key hashes, row hashes, row numbers) sorted by key hash.
+    Keys are hashed to 64 bits so sorting and joining run on integers, not strings;
+    repeated keys get their occurrence mixed into the hash so every row is unique.
+    """
+    keys, hashes = [], []
+    for chunk in _read_chunks(path, [key] + [c for c in columns if c != key], chunksize):
+        keys.append(pd.util.hash_array(chunk[key].to_numpy(dtype=object), categorize=False))
+        hashes.append(pd.util.hash_pandas_object(chunk[columns], index=False, categorize=False).to_numpy())
+
+    keys = np.concatenate(keys) if keys else np.array([], dtype=np.uint64)
+    hashes = np.concatenate(hashes) if hashes else np.array([], dtype=np.uint64)
+    rows = np.arange(len(keys))
+
+    occurrence = pd.Series(keys).groupby(keys, sort=False).cumcount().to_numpy().astype(np.uint64)
+    if occurrence.any():
+        keys = keys + occurrence * np.uint64(0x9E3779B97F4A7C15)
+
+    order = np.argsort(keys, kind="stable")
+    return keys[order], hashes[order], rows[order]
+
+
+def _select_rows(path, columns, row_numbers, chunksize):
+    """Pass 2: rows at the given file positions, indexed by position"""
+    wanted = np.unique(np.asarray(row_numbers, dtype=np.int64))
+    frames, offset = [], 0
+    for chunk in _read_chunks(path, columns, chunksize):
+        lo, hi = np.searchsorted(wanted, [offset, offset + len(chunk)])
+        if hi > lo:
+            frames.append(chunk.iloc[wanted[lo:hi] - offset])
+        offset += len(chunk)
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(frames)[columns]
+
+
+def diff_files(old_file, new_file, key=None, chunksize=CHUNKSIZE):
+    """
+    Row-level diff of two CSV files keyed by a business key
+
+    Args:
+        old_file: Previous partition/version of the table
+        new_file: Current partition/version of the table
+        key: Key column (default: ticket_id, invoice_id or customer_id, whichever exists)
+        chunksize: Rows per streamed chunk
+
+    Returns:
+        Dictionary with added/removed rows, modified cells (long format: key, column, old, new),
+        a per-column change summary and counts
+    """
+    old_columns, new_columns = _compared_columns(old_file), _compared_columns(new_file)
+    key = key or infer_key(new_columns)
+    columns = [col for col in new_columns if col in old_columns]
+
+    old_keys, old_hashes, old_rows = _key_hashes(old_file, key, columns, chunksize)
+    new_keys, new_hashes, new_rows = _key_hashes(new_file, key, columns, chunksize)
+
+    # Sorted join on key hashes: position of every new key among the old keys
+    position = np.searchsorted(old_keys, new_keys)
+    position_in_range = np.minimum(position, max(len(old_keys) - 1, 0))
+    matched = (position < len(old_keys)) & (old_keys[position_in_range] == new_keys) if len(old_keys) else np.zeros(len(new_keys), bool)
+
+    added_rows = new_rows[~matched]
+    matched_old = position_in_range[matched]
+    removed_mask = np.ones(len(old_keys), dtype=bool)
+    removed_mask[matched_old] = False
+    removed_rows = old_rows[removed_mask]
+
+    changed = old_hashes[matched_old] != new_hashes[matched]
+    modified_new_rows = new_rows[matched][changed]
+    modified_old_rows = old_rows[matched_old][changed]
+
+    # One more pass per file fetches every changed row; then align modified pairs by position
+    all_columns = [key] + [col for col in columns if col != key]
+    old_selected = _select_rows(old_file, [key] + [c for c in old_columns if c != key],
+                                np.concatenate([removed_rows, modified_old_rows]), chunksize)
+    new_selected = _select_rows(new_file, [key] + [c for c in new_columns if c != key],
+                                np.concatenate([added_rows, modified_new_rows]), chunksize)
+    added = new_selected.loc[np.sort(added_rows)]
+    removed = old_selected.loc[np.sort(removed_rows)]
+
+    pair_order = np.argsort(modified_new_rows, kind="stable")
+    old_changed = old_selected.loc[modified_old_rows[pair_order], all_columns].reset_index(drop=True)
+    new_changed = new_selected.loc[modified_new_rows[pair_order], all_columns].reset_index(drop=True)
+
+    cell_changes, column_summary = [], {}
+    for col in all_columns[1:]:
+        differs = old_changed[col].to_numpy() != new_changed[col].to_numpy()
+        column_summary[col] = int(differs.sum())
+        if differs.any():
+            cell_changes.append(pd.DataFrame({
+                key: new_changed.loc[differs, key].to_numpy(),
+                "column": col,
+                "old_value": old_changed.loc[differs, col].to_numpy(),
+                "new_value": new_changed.loc[differs, col].to_numpy()
+            }))
+    modified = pd.concat(cell_changes, ignore_index=True) if cell_changes else pd.DataFrame(columns=[key, "column", "old_value", "new_value"])
+
+    return {
+        "key": key,
+        "old_file": old_file,
+        "new_file": new_file,
+        "counts": {
+            "old_rows": int(len(old_keys)),
+            "new_rows": int(len(new_keys)),
+            "added": int(len(added_rows)),
+            "removed": int(len(removed_rows)),
+            "modified": int(changed.sum()),
+            "unchanged": int(matched.sum() - changed.sum())
+        },
+        "columns_added": [col for col in new_columns if col not in old_columns],
+        "columns_removed": [col for col in old_columns if col not in new_columns],
+        "column_summary": {col: count for col, count in column_summary.items() if count},
+        "added": added,
+        "removed": removed,
+        "modified": modified,
+        "changed_customers": _changed_entities([added, removed, old_changed, new_changed], ENTITY_KEY)
+    }
+
+
+def _changed_entities(frames, entity):
+    """
+    Entities touched by added, removed or modified rows: the input for incremental
+    downstream stages that only need to reprocess those entities
+    """
+    entities = set()
+    for frame in frames:
+        if entity in frame.columns:
+            entities.update(frame[entity])
+    return sorted(entities)
+
+
+def diff_versions(versioning, old_version_id, new_version_id, file_name, key=None):
+    """Row-level diff of one file between two versions of the block store"""
+    old_entry = versioning.load_manifest(old_version_id)["files"].get(file_name)
+    new_entry = versioning.load_manifest(new_version_id)["files"].get(file_name)
+    if old_entry is None or new_entry is None:
+        raise KeyError(f"{file_name} is not part of both versions")
+
+    tmp_dir = tempfile.mkdtemp(prefix="diff-")
+    try:
+        versioning.checkout(old_version_id, os.path.join(tmp_dir, "old"), files=[file_name])
+        versioning.checkout(new_version_id, os.path.join(tmp_dir, "new"), files=[file_name])
+        path = file_name.split("/")
+        diff = diff_files(os.path.join(tmp_dir, "old", *path), os.path.join(tmp_dir, "new", *path), key=key)
+        return diff
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def write_diff(diff, output_dir):
+    """Persist a diff: added.csv, removed.csv, modified.csv and summary.json"""
+    os.makedirs(output_dir, exist_ok=True)
+    diff["added"].to_csv(os.path.join(output_dir, "added.csv"), index=False)
+    diff["removed"].to_csv(os.path.join(output_dir, "removed.csv"), index=False)
+    diff["modified"].to_csv(os.path.join(output_dir, "modified.csv"), index=False)
+    summary = summarize_diff(diff)
+    with open(os.path.join(output_dir, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+
+def summarize_diff(diff):
+    return {
+        "key": diff["key"],
+        "old_file": diff["old_file"],
+        "new_file": diff["new_file"],
+        "counts": diff["counts"],
+        "columns_added": diff["columns_added"],
+        "columns_removed": diff["columns_removed"],
+        "column_summary": diff["column_summary"],
+        "changed_customers": len(diff["changed_customers"]),
+        "created_at": datetime.now().isoformat()
+    }
+
+
+def diff_partitions(table, old_date, new_date, data_root=None, key=None):
+    """
+    Main function: diff two dt= partitions of a raw table or of the clean dataset
+
+    Args:
+        table: billing, subscriptions, crm or churn_dataset (clean zone)
+        old_date, new_date: Partition dates to compare
+    """
+    data_root = data_root or os.path.join(project_root, "data")
+    zone = os.path.join(data_root, "clean", "churn_dataset") if table == "churn_dataset" else os.path.join(data_root, "raw", table)
+    file_name = "cleaned_churn_dataset.csv" if table == "churn_dataset" else f"{table}.csv"
+    old_file = os.path.join(zone, f"dt={old_date}", file_name)
+    new_file = os.path.join(zone, f"dt={new_date}", file_name)
+    logger.info(f"Diffing {table} dt={old_date} -> dt={new_date}...")
+
+    try:
+        with track_stage("versioning.diff", table=table) as m:
+            diff = diff_files(old_file, new_file, key=key)
+            output_dir = os.path.join(data_root, "diffs", table, f"{old_date}__{new_date}")
+            summary = write_diff(diff, output_dir)
+            m.rows_in = diff["counts"]["old_rows"] + diff["counts"]["new_rows"]
+            m.rows_out = diff["counts"]["added"] + diff["counts"]["removed"] + diff["counts"]["modified"]
+
+        counts = diff["counts"]
+        logger.info(
+            f"{table} dt={old_date} -> dt={new_date}: +{counts['added']} -{counts['removed']} "
+            f"~{counts['modified']} rows (changed columns: {summary['column_summary'] or 'none'})"
+        )
+        summary.update({"status": "success", "output_dir": output_dir})
+        return summary
+
+    except Exception as e:
+        logger.error(f"Dataset diff failed: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Row-level diff between two dt= partitions")
+    parser.add_argument("table", help="billing, subscriptions, crm or churn_dataset")
+    parser.add_argument("old_date", help="Previous partition date (YYYY-MM-DD)")
+    parser.add_argument("new_date", help="Current partition date (YYYY-MM-DD)")
+    parser.add_argument("--key", help="Key column (default: inferred)")
+    args = parser.parse_args()
+
+    result = diff_partitions(args.table, args.old_date, args.new_date, key=args.key)
+    print(f"Diff {args.table}: {result['counts']} -> {result['output_dir']}")
@@ -0,0 +1,52 @@
+"""
+Test the row-level diff: added, removed and modified rows with per-column changes
+"""
+
+import sys
+import os
+import tempfile
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Task8_DataVersioning.dataset_diff import diff_files
+
+def test_dataset_diff():
+    """Reordered rows are unchanged; only real edits are reported"""
+    old = pd.DataFrame({
+        "invoice_id": ["INV1", "INV2", "INV3", "INV4"],
+        "customer_id": ["CUST001", "CUST002", "CUST003", "CUST004"],
+        "amount_due": [50.0, 120.0, 80.0, 60.0],
+        "payment_status": ["Paid", "Pending", "Paid", "Paid"]
+    })
+    new = pd.DataFrame({
+        "invoice_id": ["INV5", "INV3", "INV2", "INV1"],
+        "customer_id": ["CUST005", "CUST003", "CUST002", "CUST001"],
+        "amount_due": [75.0, 80.0, 120.0, 55.0],
+        "payment_status": ["Paid", "Paid", "Paid", "Overdue"]
+    })
+
+    with tempfile.TemporaryDirectory() as tmp:
+        old_file, new_file = os.path.join(tmp, "old.csv"), os.path.join(tmp, "new.csv")
+        # The clean dataset is written with its row index; it must not count as a change
+        old.to_csv(old_file)
+        new.to_csv(new_file)
+
+        diff = diff_files(old_file, new_file, chunksize=2)
+
+    assert diff["key"] == "invoice_id"
+    assert diff["counts"] == {"old_rows": 4, "new_rows": 4, "added": 1, "removed": 1, "modified": 2, "unchanged": 1}
+    assert diff["added"]["invoice_id"].tolist() == ["INV5"]
+    assert diff["removed"]["invoice_id"].tolist() == ["INV4"]
+    assert diff["column_summary"] == {"amount_due": 1, "payment_status": 2}
+
+    changes = diff["modified"].set_index(["invoice_id", "column"])
+    assert changes.loc[("INV1", "amount_due"), "new_value"] == "55.0"
+    assert changes.loc[("INV2", "payment_status"), "old_value"] == "Pending"
+    assert diff["changed_customers"] == ["CUST001", "CUST002", "CUST004", "CUST005"]
+
+    print("✅ Dataset diff test passed")
+
+if __name__ == "__main__":
+    test_dataset_diff()
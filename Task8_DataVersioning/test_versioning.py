@@ -0,0 +1,93 @@
+"""
+Test content-addressed versioning: a small change stores only the changed blocks,
+and every version checks out byte for byte
+"""
+
+import sys
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Task8_DataVersioning.versioning import DatasetVersioning
+
+def write_snapshot(directory, billing):
+    os.makedirs(directory)
+    billing.to_csv(os.path.join(directory, "billing.csv"), index=False)
+
+def read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+def test_versioning():
+    """Two daily snapshots share most blocks and both restore exactly"""
+    n = 20000
+    billing = pd.DataFrame({
+        "invoice_id": [f"INV{i:06d}" for i in range(n)],
+        "customer_id": [f"CUST{i % 500:04d}" for i in range(n)],
+        "amount_due": np.round(np.random.default_rng(7).uniform(10, 200, n), 2)
+    })
+    changed = billing.copy()
+    changed.loc[5000, "amount_due"] = 999.99
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_snapshot(os.path.join(tmp, "day1"), billing)
+        write_snapshot(os.path.join(tmp, "day2"), changed)
+        versioning = DatasetVersioning(root=os.path.join(tmp, "store"), target_block_bytes=16 * 1024)
+
+        v1 = versioning.commit("raw", os.path.join(tmp, "day1"), tag="dt=2025-08-23")
+        v2 = versioning.commit("raw", os.path.join(tmp, "day2"), tag="dt=2025-08-24")
+        assert v1["version_id"] != v2["version_id"]
+        assert v1["block_count"] > 10
+        assert v2["new_bytes_stored"] < v1["new_bytes_stored"] / 5
+
+        again = versioning.commit("raw", os.path.join(tmp, "day2"), tag="dt=2025-08-24")
+        assert again["unchanged"] and again["new_bytes_stored"] == 0
+        assert versioning.resolve("raw", tag="dt=2025-08-23") == v1["version_id"]
+
+        # Same content under a new tag: the version is reused and reported with the new tag
+        retagged = versioning.commit("raw", os.path.join(tmp, "day2"), tag="dt=2025-08-25")
+        assert retagged["unchanged"] and retagged["version_id"] == v2["version_id"]
+        assert retagged["tag"] == "dt=2025-08-25"
+        assert versioning.resolve("raw", tag="dt=2025-08-25") == v2["version_id"]
+
+        for manifest, source in [(v1, "day1"), (v2, "day2")]:
+            out_dir = os.path.join(tmp, "checkout", manifest["version_id"])
+            result = versioning.checkout(manifest["version_id"], out_dir)
+            assert result["files_written"] == ["billing.csv"]
+            assert read_bytes(os.path.join(out_dir, "billing.csv")) == read_bytes(os.path.join(tmp, source, "billing.csv"))
+            assert versioning.checkout(manifest["version_id"], out_dir)["files_skipped"] == ["billing.csv"]
+
+    print("✅ Versioning test passed")
+
+def test_length_changing_edits():
+    """Edits that shorten rows keep the cut points, and so the blocks, of the untouched rows"""
+    n = 20000
+    billing = pd.DataFrame({
+        "invoice_id": [f"INV{i:06d}" for i in range(n)],
+        "amount_due": np.round(np.random.default_rng(3).uniform(10, 200, n), 2),
+        "payment_status": "Pending"
+    })
+    paid = billing.copy()
+    paid.loc[paid.index[-n // 20::2], "payment_status"] = "Paid"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_snapshot(os.path.join(tmp, "day1"), billing)
+        write_snapshot(os.path.join(tmp, "day2"), paid)
+        versioning = DatasetVersioning(root=os.path.join(tmp, "store"), target_block_bytes=16 * 1024)
+
+        v1 = versioning.commit("raw", os.path.join(tmp, "day1"))
+        v2 = versioning.commit("raw", os.path.join(tmp, "day2"))
+        before = set(v1["files"]["billing.csv"]["blocks"])
+        after = v2["files"]["billing.csv"]["blocks"]
+        assert len(after) > 20
+        assert sum(block in before for block in after) >= 0.8 * len(after)
+
+    print("✅ Length-changing edits test passed")
+
+if __name__ == "__main__":
+    test_versioning()
+    test_length_changing_edits()
@@ -0,0 +1,238 @@
+"""
+Task 9: Model Building - Batch Scoring
+Scores every customer of a feature store partition with the trained churn model
+
+Features are streamed from the offline store in record batches (only the model's columns
+are read), each batch is scored with a single vectorized predict_proba call on a thread pool,
+and every batch is written as its own Parquet part of data/scores/dt=.../. The number of
+batches in flight is bounded, so memory stays at a few batches regardless of customer count.
+
+predict_proba of the gradient boosting model runs its own OpenMP threads, so each scoring
+thread is limited to cores / workers of them: the pool never runs more threads than cores.
+Parts are written to a temporary directory that replaces the partition once all are done,
+so readers never see a partial or empty partition.
+"""
+
+import os
+import sys
+import json
+import glob
+import time
+import shutil
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from threadpoolctl import ThreadpoolController
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+
+from utils.logger import get_logger
+from utils.metrics import track_stage, file_size
+from Task7_FeatureStore.feature_store import FeatureStore, ENTITY_KEY, TIMESTAMP_COLUMN, DEFAULT_FEATURE_VIEW
+from Task9_ModelBuilding.model_registry import ModelRegistry
+
+logger = get_logger("model_building", log_file=os.path.join(project_root, "logs", "model_building.log"))
+
+SCORE_COLUMN = "churn_score"
+BATCH_ROWS = 250_000
+
+
+def iter_feature_batches(store, partition_date, columns, batch_rows=BATCH_ROWS, feature_view=DEFAULT_FEATURE_VIEW):
+    """
+    Yield DataFrames of at most batch_rows rows from one offline partition,
+    reading only customer_id, event_timestamp and the requested feature columns
+    """
+    files = glob.glob(os.path.join(store.offline_root, feature_view, f"dt={partition_date}", "features.*"))
+    if not files:
+        raise FileNotFoundError(f"No offline partition dt={partition_date} for feature view '{feature_view}'")
+    columns = list(dict.fromkeys([ENTITY_KEY, TIMESTAMP_COLUMN] + list(columns)))
+
+    if files[0].endswith(".parquet"):
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(files[0])
+        for batch in parquet_file.iter_batches(batch_size=batch_rows, columns=columns):
+            yield batch.to_pandas()
+    else:
+        for chunk in pd.read_csv(files[0], usecols=columns, chunksize=batch_rows):
+            yield chunk
+
+
+class BatchScorer:
+    """
+    Streams a feature partition through a fitted model
+
+    Args:
+        model: Fitted classifier with predict_proba
+        feature_columns: Feature order the model was trained on
+        model_version: Identifier written next to every score
+        max_workers: Scoring threads (predict releases the GIL inside the tree traversal);
+            the cores are split between them, each predict using cores / max_workers OpenMP threads
+        batch_rows: Rows per streamed batch / output part
+    """
+
+    def __init__(self, model, feature_columns, model_version, max_workers=None, batch_rows=BATCH_ROWS):
+        self.model = model
+        self.feature_columns = list(feature_columns)
+        self.model_version = model_version
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.batch_rows = batch_rows
+        self.openmp_threads = max(1, (os.cpu_count() or 1) // self.max_workers)
+        self._threadpools = ThreadpoolController()
+
+    def score_batch(self, batch):
+        """Vectorized scores of one feature batch"""
+        X = batch.reindex(columns=self.feature_columns).astype(np.float64)
+        return pd.DataFrame({
+            ENTITY_KEY: batch[ENTITY_KEY].astype(str).to_numpy(),
+            TIMESTAMP_COLUMN: batch[TIMESTAMP_COLUMN].to_numpy(),
+            SCORE_COLUMN: self.model.predict_proba(X)[:, 1].astype(np.float32),
+            "model_version": self.model_version
+        })
+
+    def _score_and_write(self, batch, part_file):
+        # The OpenMP thread count is per calling thread, so each worker sets its own
+        with self._threadpools.limit(limits=self.openmp_threads, user_api="openmp"):
+            scores = self.score_batch(batch)
+        scores.to_parquet(part_file, index=False)
+        return len(scores), file_size(part_file)
+
+    def score(self, batches, output_dir, manifest=None):
+        """
+        Score all batches into output_dir/part-*.parquet plus output_dir/manifest.json
+        (written next to output_dir and swapped in when every part is done)
+
+        Args:
+            manifest: Extra fields recorded in manifest.json next to the scoring summary
+
+        Returns:
+            Dictionary with row/part counts and throughput
+        """
+        output_dir = os.path.normpath(output_dir)
+        staging_dir = f"{output_dir}.tmp-{os.getpid()}"
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        os.makedirs(staging_dir)
+
+        summary = {"rows": 0, "parts": [], "bytes_written": 0}
+        started = time.perf_counter()
+
+        def collect(future):
+            rows, size = future.result()
+            summary["rows"] += rows
+            summary["bytes_written"] += size
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                in_flight = []
+                for part_number, batch in enumerate(batches):
+                    part_file = os.path.join(staging_dir, f"part-{part_number:05d}.parquet")
+                    in_flight.append(pool.submit(self._score_and_write, batch, part_file))
+                    summary["parts"].append(os.path.basename(part_file))
+                    # Bound the batches held in memory to two per worker
+                    if len(in_flight) >= 2 * self.max_workers:
+                        collect(in_flight.pop(0))
+                for future in in_flight:
+                    collect(future)
+
+            seconds = time.perf_counter() - started
+            summary.update({
+                "seconds": round(seconds, 3),
+                "rows_per_second": int(summary["rows"] / seconds) if seconds > 0 else None,
+                "workers": self.max_workers,
+                "openmp_threads": self.openmp_threads,
+                "batch_rows": self.batch_rows
+            })
+            with open(os.path.join(staging_dir, "manifest.json"), "w", encoding="utf-8") as f:
+                json.dump(dict(summary, **(manifest or {})), f, indent=2)
+            self._swap_in(staging_dir, output_dir)
+        except Exception:
+            # The previous scores stay in place
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise
+        return summary
+
+    @staticmethod
+    def _swap_in(staging_dir, output_dir):
+        """Replace output_dir with the finished staging directory (two renames, no partial state)"""
+        previous_dir = f"{output_dir}.old-{os.getpid()}"
+        if os.path.exists(output_dir):
+            os.replace(output_dir, previous_dir)
+        os.replace(staging_dir, output_dir)
+        shutil.rmtree(previous_dir, ignore_errors=True)
+
+
+def score_partition(partition_date, data_root=None, model_version=None, registry=None, store=None,
+                    max_workers=None, batch_rows=BATCH_ROWS):
+    """
+    Main function: score a feature store partition with a registered churn model
+    (default: latest version; model_version also accepts an alias such as "production")
+
+    Returns:
+        Dictionary with status ("success", or "skipped" when no model has been trained yet),
+        output location and throughput metrics
+    """
+    logger.info(f"Starting batch scoring for {partition_date}...")
+    data_root = data_root or os.path.join(project_root, "data")
+    registry = registry or ModelRegistry(root=os.path.join(data_root, "models"))
+    if model_version is None and not registry.list_versions():
+        logger.warning("No trained churn model found - skipping batch scoring")
+        return {"status": "skipped", "reason": "no trained model", "partition_date": partition_date}
+
+    store = store or FeatureStore(root=os.path.join(data_root, "feature_store"))
+
+    try:
+        with track_stage("model_building.batch_scoring", partition_date=partition_date) as m:
+            model, metadata = registry.load(model_version)
+            feature_columns = metadata["feature_columns"]
+            scorer = BatchScorer(model, feature_columns, metadata["version"],
+                                 max_workers=max_workers, batch_rows=batch_rows)
+            output_dir = os.path.join(data_root, "scores", f"dt={partition_date}")
+            batches = iter_feature_batches(store, partition_date, feature_columns, batch_rows)
+            run_details = {
+                "partition_date": partition_date,
+                "model_dir": metadata["model_dir"],
+                "model_version": scorer.model_version,
+                "created_at": datetime.now().isoformat()
+            }
+            summary = scorer.score(batches, output_dir, manifest=run_details)
+            summary.update(run_details)
+            m.rows_in = m.rows_out = summary["rows"]
+            m.bytes_written = summary["bytes_written"]
+
+        logger.info(
+            f"Scored {summary['rows']} customers in {summary['seconds']}s "
+            f"({summary['rows_per_second']} rows/s, {len(summary['parts'])} parts, {summary['workers']} workers) -> {output_dir}"
+        )
+        summary.update({"status": "success", "output_dir": output_dir})
+        return summary
+
+    except Exception as e:
+        logger.error(f"Batch scoring failed: {str(e)}")
+        raise
+
+
+def load_scores(partition_date, data_root=None, columns=None):
+    """Read the scores of a dt= partition"""
+    data_root = data_root or os.path.join(project_root, "data")
+    output_dir = os.path.join(data_root, "scores", f"dt={partition_date}")
+    with open(os.path.join(output_dir, "manifest.json"), "r", encoding="utf-8") as f:
+        parts = json.load(f)["parts"]
+    frames = [pd.read_parquet(os.path.join(output_dir, part), columns=columns) for part in parts]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Score a feature store partition with the churn model")
+    parser.add_argument("partition_date", nargs="?", default=datetime.today().date().isoformat())
+    parser.add_argument("--model-version", help="Registered version or alias (default: latest)")
+    parser.add_argument("--workers", type=int, help="Scoring threads (default: one per core, each predict single-threaded)")
+    parser.add_argument("--batch-rows", type=int, default=BATCH_ROWS)
+    args = parser.parse_args()
+
+    result = score_partition(args.partition_date, model_version=args.model_version,
+                             max_workers=args.workers, batch_rows=args.batch_rows)
+    print(f"Batch scoring {result['status']}: {result.get('rows_per_second', result.get('reason'))} rows/s")
@@ -0,0 +1,257 @@
+"""
+Task 9: Model Building - Model Registry
+Versioned store of trained models with their metrics and the data versions they were trained on
+
+Gradient-boosted models are not pickled whole: the node arrays of all trees are concatenated
+into a few .npy files and the estimator is pickled without its trees. Loading maps those files
+(np.load mmap_mode="r") and rebuilds the trees as views into the mapping, so a worker starts
+in milliseconds instead of unpickling every tree, and all workers on a machine share the same
+page-cache pages instead of holding private copies. Other estimators fall back to joblib.
+
+The tree layout is scikit-learn's private TreePredictor, so the scikit-learn version is stored in
+model.json and a tree-array model is only loaded by the same version (retrain otherwise).
+"""
+
+import os
+import sys
+import copy
+import json
+import hashlib
+import joblib
+import numpy as np
+import sklearn
+from datetime import datetime
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+
+from utils.logger import get_logger
+
+logger = get_logger("model_building", log_file=os.path.join(project_root, "logs", "model_building.log"))
+
+DEFAULT_MODEL_NAME = "churn_model"
+LATEST = "latest"
+
+# Arrays of every TreePredictor, stored concatenated: file name -> predictor attribute
+TREE_ARRAYS = {
+    "nodes.npy": "nodes",
+    "binned_left_cat_bitsets.npy": "binned_left_cat_bitsets",
+    "raw_left_cat_bitsets.npy": "raw_left_cat_bitsets"
+}
+
+
+class ModelVersionError(Exception):
+    """Raised when a stored model cannot be loaded by the installed scikit-learn"""
+    pass
+
+
+def _atomic_write_json(path, payload):
+    tmp_file = path + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, default=str)
+    os.replace(tmp_file, path)
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _has_tree_arrays(model):
+    """HistGradientBoosting estimators keep their fitted trees as TreePredictor node arrays"""
+    predictors = getattr(model, "_predictors", None)
+    return bool(predictors) and all(hasattr(p, "nodes") for iteration in predictors for p in iteration)
+
+
+def dump_model(model, model_dir):
+    """
+    Write a model to model_dir in its memory-mappable layout
+
+    Returns:
+        Storage format name ("tree-arrays" or "joblib")
+    """
+    if not _has_tree_arrays(model):
+        joblib.dump(model, os.path.join(model_dir, "model.joblib"))
+        return "joblib"
+
+    predictors = [p for iteration in model._predictors for p in iteration]
+    trees_dir = os.path.join(model_dir, "trees")
+    os.makedirs(trees_dir, exist_ok=True)
+    for file_name, attribute in TREE_ARRAYS.items():
+        np.save(os.path.join(trees_dir, file_name), np.concatenate([getattr(p, attribute) for p in predictors]))
+    np.save(os.path.join(trees_dir, "tree_sizes.npy"),
+            np.array([[len(getattr(p, attribute)) for attribute in TREE_ARRAYS.values()] for p in predictors], dtype=np.int64))
+
+    skeleton = copy.copy(model)
+    skeleton._predictors = [[None] * len(iteration) for iteration in model._predictors]
+    joblib.dump(skeleton, os.path.join(model_dir, "model.joblib"))
+    return "tree-arrays"
+
+
+def load_model_files(model_dir, model_format, mmap=True):
+    """Inverse of dump_model; with mmap=True tree arrays are read-only views of mapped files"""
+    model = joblib.load(os.path.join(model_dir, "model.joblib"))
+    if model_format == "joblib":
+        return model
+
+    from sklearn.ensemble._hist_gradient_boosting.predictor import TreePredictor
+
+    trees_dir = os.path.join(model_dir, "trees")
+    arrays = [np.load(os.path.join(trees_dir, file_name), mmap_mode="r" if mmap else None) for file_name in TREE_ARRAYS]
+    sizes = np.load(os.path.join(trees_dir, "tree_sizes.npy"))
+    ends = np.cumsum(sizes, axis=0)
+    starts = ends - sizes
+
+    predictors, tree = [], 0
+    for iteration in model._predictors:
+        predictors.append([])
+        for _ in iteration:
+            predictors[-1].append(TreePredictor(*(array[starts[tree, k]:ends[tree, k]] for k, array in enumerate(arrays))))
+            tree += 1
+    model._predictors = predictors
+    return model
+
+
+class ModelRegistry:
+    """
+    Model versions under data/models/<name>/ (v0001, v0002, ...) plus an index with aliases
+
+    Usage:
+        registry = ModelRegistry()
+        entry = registry.register(model, feature_columns, metrics, data_versions={"clean": "827a..."})
+        model, metadata = registry.load()            # latest version, memory-mapped
+        registry.set_alias("production", entry["version"])
+    """
+
+    def __init__(self, root=None, name=DEFAULT_MODEL_NAME):
+        self.root = root or os.path.join(project_root, "data", "models")
+        self.name = name
+        self.model_root = os.path.join(self.root, name)
+        self.index_file = os.path.join(self.model_root, "registry.json")
+
+    def load_index(self):
+        if not os.path.exists(self.index_file):
+            return {"name": self.name, "versions": [], "aliases": {}}
+        with open(self.index_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def list_versions(self):
+        """Registered versions (summary entries), oldest first"""
+        return self.load_index()["versions"]
+
+    def _new_version_dir(self):
+        os.makedirs(self.model_root, exist_ok=True)
+        number = len(self.list_versions()) + 1
+        while True:
+            version = f"v{number:04d}"
+            try:
+                os.makedirs(os.path.join(self.model_root, version))
+                return version
+            except FileExistsError:
+                number += 1
+
+    def register(self, model, feature_columns, metrics=None, training_set=None, data_versions=None):
+        """
+        Store a trained model as a new version and make it the latest
+
+        Args:
+            model: Fitted estimator
+            feature_columns: Feature order the model expects
+            metrics: Training/evaluation results to keep with the version
+            training_set: Training set directory the model was fitted on
+            data_versions: Dataset versions behind the training set ({"raw": id, "clean": id})
+
+        Returns:
+            The version's metadata
+        """
+        version = self._new_version_dir()
+        model_dir = os.path.join(self.model_root, version)
+        model_format = dump_model(model, model_dir)
+
+        files = {}
+        for folder, _, file_names in os.walk(model_dir):
+            for file_name in file_names:
+                path = os.path.join(folder, file_name)
+                files[os.path.relpath(path, model_dir).replace(os.sep, "/")] = {
+                    "bytes": os.path.getsize(path), "sha256": _file_sha256(path)
+                }
+
+        metadata = {
+            "name": self.name,
+            "version": version,
+            "created_at": datetime.now().isoformat(),
+            "format": model_format,
+            "estimator": type(model).__name__,
+            "sklearn_version": sklearn.__version__,
+            "feature_columns": list(feature_columns),
+            "training_set": training_set,
+            "data_versions": data_versions or {},
+            "metrics": metrics or {},
+            "files": files
+        }
+        _atomic_write_json(os.path.join(model_dir, "model.json"), metadata)
+
+        index = self.load_index()
+        index["versions"].append({
+            "version": version,
+            "created_at": metadata["created_at"],
+            "estimator": metadata["estimator"],
+            "data_versions": metadata["data_versions"],
+            "test_roc_auc": (metrics or {}).get("test_metrics", {}).get("roc_auc")
+        })
+        index["aliases"][LATEST] = version
+        _atomic_write_json(self.index_file, index)
+
+        logger.info(f"Registered {self.name} {version} ({model_format}, {sum(f['bytes'] for f in files.values())} bytes)")
+        return dict(metadata, model_dir=model_dir)
+
+    def resolve(self, version=None):
+        """Version id of a version or alias (default: latest); KeyError when unknown"""
+        index = self.load_index()
+        version = version or LATEST
+        version = index["aliases"].get(version, version)
+        if version not in {entry["version"] for entry in index["versions"]}:
+            raise KeyError(f"No version '{version}' of model '{self.name}'")
+        return version
+
+    def set_alias(self, alias, version):
+        """Point an alias (e.g. "production") at a version"""
+        index = self.load_index()
+        index["aliases"][alias] = self.resolve(version)
+        _atomic_write_json(self.index_file, index)
+
+    def get_metadata(self, version=None):
+        version = self.resolve(version)
+        model_dir = os.path.join(self.model_root, version)
+        with open(os.path.join(model_dir, "model.json"), "r", encoding="utf-8") as f:
+            return dict(json.load(f), model_dir=model_dir)
+
+    def load(self, version=None, mmap=True):
+        """
+        Load a version (default: latest)
+
+        Returns:
+            (model, metadata)
+        """
+        metadata = self.get_metadata(version)
+        stored = metadata.get("sklearn_version")
+        if stored != sklearn.__version__:
+            if metadata["format"] == "tree-arrays":
+                # The node arrays are only valid for the TreePredictor of the version that wrote them
+                raise ModelVersionError(
+                    f"{self.name} {metadata['version']} was stored by scikit-learn {stored or 'unknown'}, "
+                    f"installed is {sklearn.__version__}: retrain the model or install the matching version"
+                )
+            logger.warning(f"Loading {self.name} {metadata['version']} pickled by scikit-learn {stored or 'unknown'} "
+                           f"with {sklearn.__version__}")
+        return load_model_files(metadata["model_dir"], metadata["format"], mmap=mmap), metadata
+
+
+if __name__ == "__main__":
+    registry = ModelRegistry()
+    for entry in registry.list_versions():
+        print(f"{entry['version']}  {entry['created_at']}  test ROC-AUC={entry['test_roc_auc']}  data={entry['data_versions']}")
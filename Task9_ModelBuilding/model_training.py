@@ -0,0 +1,217 @@
+"""
+Task 9: Model Building - Churn Model Training
+Parallel cross-validated hyperparameter search for the is_churned label
+
+Candidates are HistGradientBoosting configurations evaluated with successive halving:
+every round trains all surviving configurations on a growing sample, keeps the best third
+and drops the rest, so bad configurations never get a full-size fit. Cross-validation fits
+run across a joblib process pool (one worker per core by default; each worker's native
+threads are capped so workers do not oversubscribe the CPU).
+"""
+
+import os
+import sys
+import json
+import time
+import numpy as np
+import pandas as pd
+from scipy.stats import loguniform, randint, uniform
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401 - enables HalvingRandomSearchCV
+from sklearn.model_selection import HalvingRandomSearchCV, StratifiedKFold, train_test_split
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.metrics import roc_auc_score, accuracy_score, precision_score, recall_score, f1_score, log_loss
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+
+from utils.logger import get_logger
+from utils.metrics import track_stage
+from Task9_ModelBuilding.training_set import load_training_set, LABEL_COLUMN
+from Task9_ModelBuilding.model_registry import ModelRegistry
+
+logger = get_logger("model_building", log_file=os.path.join(project_root, "logs", "model_building.log"))
+
+MIN_CLASS_ROWS = 5
+
+# Search space; successive halving samples n_candidates configurations from it
+PARAM_DISTRIBUTIONS = {
+    "learning_rate": loguniform(0.01, 0.3),
+    "max_leaf_nodes": randint(8, 64),
+    "min_samples_leaf": randint(5, 100),
+    "l2_regularization": loguniform(1e-4, 10.0),
+    "max_features": uniform(0.5, 0.5)
+}
+
+
+def load_training_data(training_dir):
+    """Feature matrix and label from a point-in-time training set (labels without features are dropped)"""
+    with open(os.path.join(training_dir, "manifest.json"), "r", encoding="utf-8") as f:
+        feature_columns = json.load(f)["feature_columns"]
+    training = load_training_set(training_dir)
+    training = training[training["event_timestamp"].notna()]
+    X = training[feature_columns].astype("float64")
+    y = training[LABEL_COLUMN].astype("int64")
+    return X, y
+
+
+def evaluate_model(model, X, y):
+    """Holdout metrics of a fitted classifier"""
+    probabilities = model.predict_proba(X)[:, 1]
+    predictions = (probabilities >= 0.5).astype(int)
+    return {
+        "roc_auc": round(float(roc_auc_score(y, probabilities)), 4) if y.nunique() > 1 else None,
+        "accuracy": round(float(accuracy_score(y, predictions)), 4),
+        "precision": round(float(precision_score(y, predictions, zero_division=0)), 4),
+        "recall": round(float(recall_score(y, predictions, zero_division=0)), 4),
+        "f1": round(float(f1_score(y, predictions, zero_division=0)), 4),
+        "log_loss": round(float(log_loss(y, probabilities, labels=[0, 1])), 4),
+        "test_rows": int(len(y)),
+        "test_churn_rate": round(float(y.mean()), 4)
+    }
+
+
+class ChurnModelTrainer:
+    """
+    Hyperparameter search + final evaluation for the churn classifier
+
+    Args:
+        n_candidates: Configurations sampled for the first halving round
+        n_jobs: Worker processes for cross-validation fits (-1 = all cores)
+        cv_folds: Maximum stratified folds (reduced when the minority class is small)
+        test_size: Holdout share used for the reported metrics
+        random_state: Seed for sampling, splits and models
+    """
+
+    def __init__(self, n_candidates=32, n_jobs=-1, cv_folds=5, test_size=0.2, random_state=42):
+        self.n_candidates = n_candidates
+        self.n_jobs = n_jobs
+        self.cv_folds = cv_folds
+        self.test_size = test_size
+        self.random_state = random_state
+
+    def train(self, X, y):
+        """
+        Search, refit the best configuration on the training split and evaluate on the holdout
+
+        Returns:
+            (fitted model, results dictionary)
+        """
+        minority = int(y.value_counts().min()) if y.nunique() > 1 else 0
+        if minority < MIN_CLASS_ROWS:
+            raise ValueError(
+                f"Need at least {MIN_CLASS_ROWS} rows of each class to train, got {y.value_counts().to_dict()}"
+            )
+
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=self.test_size, stratify=y, random_state=self.random_state
+        )
+        folds = max(2, min(self.cv_folds, int(y_train.value_counts().min())))
+        # Smallest halving round still needs a few rows of each class in every fold
+        min_resources = min(len(y_train), max(100, 20 * folds))
+
+        search = HalvingRandomSearchCV(
+            # Early stopping on a validation split kicks in for samples above 10k rows
+            HistGradientBoostingClassifier(max_iter=200, early_stopping="auto", random_state=self.random_state),
+            PARAM_DISTRIBUTIONS,
+            n_candidates=self.n_candidates,
+            factor=3,
+            resource="n_samples",
+            min_resources=min_resources,
+            cv=StratifiedKFold(n_splits=folds, shuffle=True, random_state=self.random_state),
+            scoring="roc_auc",
+            n_jobs=self.n_jobs,
+            refit=True,
+            random_state=self.random_state
+        )
+
+        started = time.perf_counter()
+        search.fit(X_train, y_train)
+        search_seconds = time.perf_counter() - started
+
+        model = search.best_estimator_
+        cv_results = pd.DataFrame(search.cv_results_)
+        rounds = [
+            {"iteration": int(i), "candidates": int(n), "samples": int(r)}
+            for i, n, r in zip(range(search.n_iterations_), search.n_candidates_, search.n_resources_)
+        ]
+        leaderboard = (
+            cv_results[cv_results["iter"] == cv_results["iter"].max()]
+            .sort_values("mean_test_score", ascending=False)
+            .head(10)
+        )
+
+        results = {
+            "best_params": {k: (float(v) if isinstance(v, (float, np.floating)) else int(v)) for k, v in search.best_params_.items()},
+            "cv_roc_auc": round(float(search.best_score_), 4),
+            "cv_folds": folds,
+            "evaluations": int(len(cv_results)),
+            "halving_rounds": rounds,
+            "search_seconds": round(search_seconds, 2),
+            "n_jobs": self.n_jobs if self.n_jobs > 0 else os.cpu_count(),
+            "train_rows": int(len(y_train)),
+            "test_metrics": evaluate_model(model, X_test, y_test),
+            "leaderboard": [
+                {"params": row["params"], "mean_cv_roc_auc": round(float(row["mean_test_score"]), 4)}
+                for _, row in leaderboard.iterrows()
+            ]
+        }
+        return model, results
+
+
+def train_churn_model(training_dir, data_root=None, trainer=None, registry=None, data_versions=None):
+    """
+    Main function: train the churn model on a point-in-time training set and register it
+
+    Args:
+        training_dir: Training set directory
+        data_versions: Dataset versions the training set was built from, kept with the model
+
+    Returns:
+        Dictionary with status ("success", or "skipped" when the training set cannot
+        support a model yet), registered model version and metrics
+    """
+    logger.info(f"Starting churn model training from {training_dir}...")
+    data_root = data_root or os.path.join(project_root, "data")
+    trainer = trainer or ChurnModelTrainer()
+    registry = registry or ModelRegistry(root=os.path.join(data_root, "models"))
+
+    try:
+        with track_stage("model_building.training") as m:
+            X, y = load_training_data(training_dir)
+            m.rows_in = len(X)
+            class_counts = y.value_counts().to_dict()
+
+            if y.nunique() < 2 or min(class_counts.values()) < MIN_CLASS_ROWS:
+                logger.warning(f"Not enough labelled rows to train (class counts: {class_counts}) - skipping training")
+                return {"status": "skipped", "reason": f"class counts {class_counts}", "rows": len(X)}
+
+            model, results = trainer.train(X, y)
+            entry = registry.register(model, list(X.columns), results, training_set=training_dir, data_versions=data_versions)
+            m.rows_out = results["train_rows"]
+
+        logger.info(
+            f"Churn model trained: CV ROC-AUC {results['cv_roc_auc']}, test ROC-AUC {results['test_metrics']['roc_auc']} "
+            f"({results['evaluations']} evaluations over {len(results['halving_rounds'])} halving rounds "
+            f"in {results['search_seconds']}s on {results['n_jobs']} workers) -> {registry.name} {entry['version']}"
+        )
+        results.update({"status": "success", "model_version": entry["version"], "model_dir": entry["model_dir"],
+                        "feature_columns": list(X.columns), "training_set": training_dir, "data_versions": data_versions or {}})
+        return results
+
+    except Exception as e:
+        logger.error(f"Churn model training failed: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Train the churn model on a point-in-time training set")
+    parser.add_argument("training_dir", help="Training set directory (data/training/churn_training_set/dt=...)")
+    parser.add_argument("--candidates", type=int, default=32, help="Configurations in the first halving round")
+    parser.add_argument("--jobs", type=int, default=-1, help="Worker processes (-1 = all cores)")
+    args = parser.parse_args()
+
+    result = train_churn_model(args.training_dir, trainer=ChurnModelTrainer(n_candidates=args.candidates, n_jobs=args.jobs))
+    print(f"Training {result['status']}: {result.get('test_metrics', result.get('reason'))}")
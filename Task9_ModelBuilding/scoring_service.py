@@ -0,0 +1,329 @@
+"""
+Task 9: Model Building - Online Scoring Service
+Churn score of single customers on demand, with the model and features kept warm in memory
+
+Requests from any number of threads are queued and picked up by one batcher thread, which
+waits at most max_wait_ms for more requests (up to max_batch_size), fetches all their feature
+vectors with one online-store query and scores them with one predict_proba call. Under load
+the per-request cost is amortized over the batch; a lone request only pays the short wait.
+
+The service runs in-process (ScoringService.score) or behind a local TCP socket speaking
+JSON lines (serve / ScoringClient), e.g.:
+    {"customer_id": "CUST001"}  ->  {"customer_id": "CUST001", "churn_score": 0.83, ...}
+    {"command": "stats"}        ->  {"requests": 1200, "p50_ms": 1.9, "p99_ms": 4.1, ...}
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import socket
+import warnings
+import threading
+import socketserver
+import numpy as np
+from collections import deque
+from concurrent.futures import Future
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+
+from utils.logger import get_logger
+from Task7_FeatureStore.feature_store import FeatureStore, ENTITY_KEY, TIMESTAMP_COLUMN, DEFAULT_FEATURE_VIEW
+from Task9_ModelBuilding.batch_scoring import SCORE_COLUMN
+from Task9_ModelBuilding.model_registry import ModelRegistry
+
+logger = get_logger("model_building", log_file=os.path.join(project_root, "logs", "model_building.log"))
+
+DEFAULT_PORT = 8765
+
+
+def _predict(model, X):
+    """
+    Churn probabilities of a plain array. The column order was checked against the model's
+    feature names at load time; building a named DataFrame per call would double the latency.
+    """
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="X does not have valid feature names", category=UserWarning)
+        return model.predict_proba(X)[:, 1]
+
+
+class ScoringService:
+    """
+    Micro-batching churn scorer over the online feature store
+
+    Args:
+        model_version: Registered model version or alias (default: latest)
+        data_root: Data directory holding models and the feature store
+        registry: ModelRegistry to load the model from
+        store: FeatureStore to read online features from
+        max_batch_size: Most requests scored together
+        max_wait_ms: Longest time the first request of a batch waits for company
+        preload_features: Hold the whole online feature view in memory instead of querying
+            SQLite per batch (memory: customers x features x 8 bytes)
+        latency_window: Most recent request latencies kept for percentiles
+
+    Usage:
+        with ScoringService() as service:
+            service.score("CUST001")
+            service.latency_stats()
+    """
+
+    def __init__(self, model_version=None, data_root=None, registry=None, store=None, max_batch_size=64, max_wait_ms=1.0,
+                 preload_features=False, latency_window=10_000, feature_view=DEFAULT_FEATURE_VIEW):
+        self.data_root = data_root or os.path.join(project_root, "data")
+        self.model_version = model_version
+        self.registry = registry or ModelRegistry(root=os.path.join(self.data_root, "models"))
+        self.store = store or FeatureStore(root=os.path.join(self.data_root, "feature_store"))
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.preload_features = preload_features
+        self.feature_view = feature_view
+
+        self._requests = queue.Queue()
+        self._latencies = deque(maxlen=latency_window)
+        self._batch_sizes = deque(maxlen=latency_window)
+        self._stats_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._worker = None
+        self._model = None
+
+    # ---------- lifecycle ----------
+
+    def load(self):
+        """
+        Load (or reload) the model and, if enabled, the online features; then warm up.
+        The model's tree arrays are memory-mapped, so reloads and extra processes are cheap.
+        """
+        model, metadata = self.registry.load(self.model_version)
+        feature_columns, version = metadata["feature_columns"], metadata["version"]
+        fitted_columns = list(getattr(model, "feature_names_in_", feature_columns))
+        if fitted_columns != feature_columns:
+            raise ValueError(f"Model {version} was fitted on {fitted_columns}, its metadata lists {feature_columns}")
+
+        preloaded = None
+        if self.preload_features:
+            preloaded = self._load_online_view(feature_columns)
+
+        # First predict allocates the tree traversal buffers; do it before serving
+        _predict(model, np.zeros((1, len(feature_columns))))
+
+        # Swap everything at once so an in-flight batch never mixes model and features
+        self._model = (model, feature_columns, version, preloaded)
+        logger.info(
+            f"Scoring service loaded model {version} ({len(feature_columns)} features"
+            f"{f', {len(preloaded[0])} customers preloaded' if preloaded else ''})"
+        )
+
+    def _load_online_view(self, feature_columns):
+        """All online feature vectors as (id -> row, matrix, event timestamps)"""
+        customer_ids = self.store.list_online_entities(self.feature_view)
+        _, matrix, timestamps = self.store.get_feature_vectors(customer_ids, feature_columns, self.feature_view)
+        return (
+            {customer_id: position for position, customer_id in enumerate(customer_ids)},
+            matrix,
+            np.array(timestamps, dtype=object)
+        )
+
+    def start(self):
+        if self._model is None:
+            self.load()
+        self._stop.clear()
+        self._worker = threading.Thread(target=self._run, name="scoring-batcher", daemon=True)
+        self._worker.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join()
+            self._worker = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    # ---------- requests ----------
+
+    def submit(self, customer_id):
+        """Queue one request; the Future resolves to the score dictionary"""
+        future = Future()
+        self._requests.put((str(customer_id), future, time.perf_counter()))
+        return future
+
+    def score(self, customer_id, timeout=1.0):
+        """
+        Churn score of one customer
+
+        Returns:
+            Dictionary with customer_id, churn_score (None for customers without online
+            features), event_timestamp of the features used and model_version
+        """
+        return self.submit(customer_id).result(timeout=timeout)
+
+    def _next_batch(self):
+        try:
+            batch = [self._requests.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._requests.get(timeout=remaining) if remaining > 0 else self._requests.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stop.is_set() or not self._requests.empty():
+            batch = self._next_batch()
+            if not batch:
+                continue
+            try:
+                results = self.score_batch([customer_id for customer_id, _, _ in batch])
+                done = time.perf_counter()
+                for (_, future, queued_at), result in zip(batch, results):
+                    future.set_result(result)
+                with self._stats_lock:
+                    self._latencies.extend(done - queued_at for _, _, queued_at in batch)
+                    self._batch_sizes.append(len(batch))
+            except Exception as e:
+                logger.error(f"Scoring batch of {len(batch)} failed: {str(e)}")
+                for _, future, _ in batch:
+                    future.set_exception(e)
+
+    def score_batch(self, customer_ids):
+        """Score many customers directly (one lookup, one predict), bypassing the queue"""
+        model, feature_columns, model_version, preloaded = self._model
+        if preloaded is not None:
+            index, matrix, timestamps = preloaded
+            positions = np.array([index.get(customer_id, -1) for customer_id in customer_ids])
+            found = positions >= 0
+            X = np.full((len(customer_ids), len(feature_columns)), np.nan)
+            X[found] = matrix[positions[found]]
+            event_timestamps = np.full(len(customer_ids), None, dtype=object)
+            event_timestamps[found] = timestamps[positions[found]]
+        else:
+            _, X, event_timestamps = self.store.get_feature_vectors(customer_ids, feature_columns, self.feature_view)
+            found = [event_timestamp is not None for event_timestamp in event_timestamps]
+
+        scores = _predict(model, X)
+        return [
+            {
+                ENTITY_KEY: customer_id,
+                SCORE_COLUMN: round(float(score), 6) if is_found else None,
+                TIMESTAMP_COLUMN: str(event_timestamp) if is_found else None,
+                "model_version": model_version
+            }
+            for customer_id, score, is_found, event_timestamp in zip(customer_ids, scores, found, event_timestamps)
+        ]
+
+    # ---------- metrics ----------
+
+    def latency_stats(self):
+        """Request latency percentiles (queueing + lookup + predict) and batching efficiency"""
+        with self._stats_lock:
+            latencies = np.array(self._latencies) * 1000
+            batch_sizes = np.array(self._batch_sizes)
+        if not len(latencies):
+            return {"requests": 0}
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        return {
+            "requests": int(len(latencies)),
+            "p50_ms": round(float(p50), 3),
+            "p95_ms": round(float(p95), 3),
+            "p99_ms": round(float(p99), 3),
+            "max_ms": round(float(latencies.max()), 3),
+            "batches": int(len(batch_sizes)),
+            "mean_batch_size": round(float(batch_sizes.mean()), 2)
+        }
+
+
+# ---------- local socket transport ----------
+
+class _ScoringHandler(socketserver.StreamRequestHandler):
+    """One JSON request per line, one JSON response per line, for as long as the client stays connected"""
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                if request.get("command") == "stats":
+                    response = self.server.service.latency_stats()
+                else:
+                    response = self.server.service.score(request[ENTITY_KEY])
+            except Exception as e:
+                response = {"error": str(e)}
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+class _ScoringServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def serve(service, host="127.0.0.1", port=DEFAULT_PORT):
+    """
+    Start a local JSON-lines socket server in a background thread
+
+    Returns:
+        The server (server.server_address holds the bound port; call server.shutdown() to stop)
+    """
+    server = _ScoringServer((host, port), _ScoringHandler)
+    server.service = service
+    threading.Thread(target=server.serve_forever, name="scoring-server", daemon=True).start()
+    logger.info(f"Scoring service listening on {server.server_address[0]}:{server.server_address[1]}")
+    return server
+
+
+class ScoringClient:
+    """Persistent connection to a scoring socket server"""
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT):
+        self.sock = socket.create_connection((host, port))
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile("rb")
+
+    def _call(self, request):
+        self.sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        return json.loads(self.reader.readline())
+
+    def score(self, customer_id):
+        return self._call({ENTITY_KEY: customer_id})
+
+    def stats(self):
+        return self._call({"command": "stats"})
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve churn scores over a local socket")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--model-version", help="Registered version or alias (default: latest)")
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=1.0)
+    parser.add_argument("--preload-features", action="store_true", help="Hold all online features in memory")
+    args = parser.parse_args()
+
+    service = ScoringService(model_version=args.model_version, max_batch_size=args.max_batch_size,
+                             max_wait_ms=args.max_wait_ms, preload_features=args.preload_features).start()
+    server = serve(service, args.host, args.port)
+    print(f"Scoring service on {args.host}:{server.server_address[1]} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(60)
+            print(f"Latency: {service.latency_stats()}")
+    except KeyboardInterrupt:
+        server.shutdown()
+        service.stop()
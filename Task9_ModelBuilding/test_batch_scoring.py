@@ -0,0 +1,68 @@
+"""
+Test batch scoring: streamed, multi-threaded scores match a single in-memory predict
+"""
+
+import sys
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingClassifier
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Task7_FeatureStore.feature_store import FeatureStore
+from Task9_ModelBuilding.model_registry import ModelRegistry
+from Task9_ModelBuilding.batch_scoring import score_partition, load_scores
+
+def test_batch_scoring():
+    rng = np.random.default_rng(1)
+    n = 1000
+    features = pd.DataFrame({
+        "unpaid_invoice_count": rng.poisson(1.0, n).astype(float),
+        "tenure_days": rng.uniform(30, 2000, n),
+        "is_churned": rng.integers(0, 2, n)
+    }, index=pd.Index([f"CUST{i:05d}" for i in range(n)], name="customer_id"))
+    feature_columns = ["unpaid_invoice_count", "tenure_days"]
+    model = HistGradientBoostingClassifier(max_iter=20).fit(features[feature_columns], features["is_churned"])
+
+    metrics_file = os.environ.get("DMML_METRICS_FILE")
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DMML_METRICS_FILE"] = os.path.join(tmp, "metrics.jsonl")
+        try:
+            assert score_partition("2025-08-24", data_root=tmp)["status"] == "skipped"
+
+            store = FeatureStore(root=os.path.join(tmp, "feature_store"))
+            store.materialize(features, "2025-08-24")
+            store.close()
+            ModelRegistry(root=os.path.join(tmp, "models")).register(model, feature_columns)
+
+            result = score_partition("2025-08-24", data_root=tmp, max_workers=3, batch_rows=128)
+            assert result["status"] == "success"
+            assert result["rows"] == n
+            assert len(result["parts"]) == 8
+            assert result["model_version"] == "v0001"
+
+            scores = load_scores("2025-08-24", data_root=tmp).set_index("customer_id")
+            expected = model.predict_proba(features[feature_columns])[:, 1]
+            assert list(scores.index) == list(features.index)
+            assert np.allclose(scores["churn_score"].to_numpy(), expected, atol=1e-6)
+
+            # Re-scoring swaps a complete partition in: no stale parts or staging directories remain
+            rescored = score_partition("2025-08-24", data_root=tmp, max_workers=1, batch_rows=600)
+            assert rescored["openmp_threads"] == (os.cpu_count() or 1)
+            assert sorted(os.listdir(os.path.join(tmp, "scores"))) == ["dt=2025-08-24"]
+            assert sorted(os.listdir(os.path.join(tmp, "scores", "dt=2025-08-24"))) == \
+                ["manifest.json", "part-00000.parquet", "part-00001.parquet"]
+            assert len(load_scores("2025-08-24", data_root=tmp)) == n
+        finally:
+            if metrics_file is None:
+                os.environ.pop("DMML_METRICS_FILE", None)
+            else:
+                os.environ["DMML_METRICS_FILE"] = metrics_file
+
+    print("✅ Batch scoring test passed")
+
+if __name__ == "__main__":
+    test_batch_scoring()
@@ -0,0 +1,86 @@
+"""
+Test the model registry: versions keep metrics and data versions, gradient-boosted models
+load with memory-mapped trees and predict exactly like the original, and tree arrays written by
+another scikit-learn version are refused
+"""
+
+import sys
+import os
+import json
+import tempfile
+import numpy as np
+import sklearn
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.linear_model import LogisticRegression
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Task9_ModelBuilding.model_registry import ModelRegistry, ModelVersionError
+
+def test_model_registry():
+    rng = np.random.default_rng(3)
+    X = pd.DataFrame({
+        "unpaid_invoice_count": rng.poisson(1.0, 400).astype(float),
+        "tenure_days": np.where(rng.random(400) < 0.2, np.nan, rng.uniform(30, 2000, 400)),
+        "plan": rng.integers(0, 4, 400)
+    })
+    y = (X["unpaid_invoice_count"] + rng.random(400) > 1.5).astype(int)
+    boosted = HistGradientBoostingClassifier(max_iter=30, categorical_features=[2]).fit(X, y)
+    linear = LogisticRegression().fit(X.fillna(0), y)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = ModelRegistry(root=tmp)
+        first = registry.register(boosted, list(X.columns), {"test_metrics": {"roc_auc": 0.9}},
+                                  data_versions={"clean": "abc123"})
+        second = registry.register(linear, list(X.columns))
+        assert (first["version"], second["version"]) == ("v0001", "v0002")
+        assert first["format"] == "tree-arrays" and second["format"] == "joblib"
+        assert [entry["version"] for entry in registry.list_versions()] == ["v0001", "v0002"]
+        assert registry.list_versions()[0]["test_roc_auc"] == 0.9
+
+        # Latest is the newest version until an alias is moved
+        assert registry.resolve() == "v0002"
+        registry.set_alias("production", "v0001")
+        model, metadata = registry.load("production")
+        assert metadata["data_versions"] == {"clean": "abc123"}
+        assert metadata["feature_columns"] == list(X.columns)
+        assert metadata["sklearn_version"] == sklearn.__version__
+
+        # Trees are read-only views of one mapped file per array, predictions are unchanged
+        nodes = model._predictors[0][0].nodes
+        assert isinstance(nodes.base, np.memmap) or isinstance(nodes, np.memmap)
+        assert not nodes.flags.writeable
+        np.testing.assert_array_equal(model.predict_proba(X), boosted.predict_proba(X))
+
+        eager, _ = registry.load("v0001", mmap=False)
+        np.testing.assert_array_equal(eager.predict_proba(X), boosted.predict_proba(X))
+
+        linear_loaded, _ = registry.load()
+        np.testing.assert_array_equal(linear_loaded.predict_proba(X.fillna(0)), linear.predict_proba(X.fillna(0)))
+
+        try:
+            registry.load("v0009")
+            assert False, "unknown version must raise"
+        except KeyError:
+            pass
+
+        # Tree arrays from another scikit-learn version are refused; pickled models still load
+        for version in ("v0001", "v0002"):
+            metadata_file = os.path.join(tmp, "churn_model", version, "model.json")
+            with open(metadata_file) as f:
+                stored = json.load(f)
+            with open(metadata_file, "w") as f:
+                json.dump(dict(stored, sklearn_version="0.0.1"), f)
+        try:
+            registry.load("v0001")
+            assert False, "tree arrays of another scikit-learn version must raise"
+        except ModelVersionError as e:
+            assert "0.0.1" in str(e)
+        registry.load("v0002")
+
+    print("✅ Model registry test passed")
+
+if __name__ == "__main__":
+    test_model_registry()
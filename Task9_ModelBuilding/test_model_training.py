@@ -0,0 +1,43 @@
+"""
+Test churn model training: successive halving prunes candidates and the best model learns the signal
+"""
+
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Task9_ModelBuilding.model_training import ChurnModelTrainer
+
+def make_features(n=600, seed=0):
+    """Churn driven by unpaid invoices and disconnect tickets, with missing values"""
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({
+        "unpaid_invoice_count": rng.poisson(1.0, n).astype(float),
+        "tickets_disconnect": rng.poisson(0.3, n).astype(float),
+        "tenure_days": rng.uniform(30, 2000, n),
+        "days_since_last_ticket": np.where(rng.random(n) < 0.3, np.nan, rng.uniform(0, 300, n))
+    })
+    logit = 1.2 * X["unpaid_invoice_count"] + 2.0 * X["tickets_disconnect"] - X["tenure_days"] / 800 - 1.0
+    y = pd.Series((rng.random(n) < 1 / (1 + np.exp(-logit))).astype(int))
+    return X, y
+
+def test_model_training():
+    X, y = make_features()
+    model, results = ChurnModelTrainer(n_candidates=9, n_jobs=2, cv_folds=3).train(X, y)
+
+    rounds = results["halving_rounds"]
+    assert len(rounds) >= 2
+    assert rounds[0]["candidates"] > rounds[-1]["candidates"]
+    assert rounds[0]["samples"] < rounds[-1]["samples"]
+    assert results["test_metrics"]["roc_auc"] > 0.75
+    assert set(results["best_params"]) == {"learning_rate", "max_leaf_nodes", "min_samples_leaf", "l2_regularization", "max_features"}
+    assert model.predict_proba(X.head(5)).shape == (5, 2)
+
+    print("✅ Model training test passed")
+
+if __name__ == "__main__":
+    test_model_training()
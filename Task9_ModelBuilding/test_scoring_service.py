@@ -0,0 +1,71 @@
+"""
+Test the online scoring service: concurrent requests are micro-batched, scores match the
+model, unknown customers get no score, and the socket transport round-trips
+"""
+
+import sys
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from sklearn.ensemble import HistGradientBoostingClassifier
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Task7_FeatureStore.feature_store import FeatureStore
+from Task9_ModelBuilding.model_registry import ModelRegistry
+from Task9_ModelBuilding.scoring_service import ScoringService, ScoringClient, serve
+
+def test_scoring_service():
+    rng = np.random.default_rng(2)
+    n = 500
+    features = pd.DataFrame({
+        "unpaid_invoice_count": rng.poisson(1.0, n).astype(float),
+        "tenure_days": rng.uniform(30, 2000, n),
+        "is_churned": rng.integers(0, 2, n)
+    }, index=pd.Index([f"CUST{i:04d}" for i in range(n)], name="customer_id"))
+    feature_columns = ["unpaid_invoice_count", "tenure_days"]
+    model = HistGradientBoostingClassifier(max_iter=20).fit(features[feature_columns], features["is_churned"])
+    expected = pd.Series(model.predict_proba(features[feature_columns])[:, 1], index=features.index)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = FeatureStore(root=os.path.join(tmp, "feature_store"))
+        store.materialize(features, "2025-08-24")
+        ModelRegistry(root=os.path.join(tmp, "models")).register(model, feature_columns)
+
+        for preload in (False, True):
+            with ScoringService(data_root=tmp, max_wait_ms=5, preload_features=preload) as service:
+                with ThreadPoolExecutor(max_workers=16) as pool:
+                    results = list(pool.map(service.score, features.index))
+                for result in results:
+                    assert abs(result["churn_score"] - expected[result["customer_id"]]) < 1e-5
+                    assert result["model_version"] == "v0001"
+
+                unknown = service.score("CUST9999")
+                assert unknown["churn_score"] is None and unknown["event_timestamp"] is None
+
+                stats = service.latency_stats()
+                assert stats["requests"] == n + 1
+                assert stats["batches"] < stats["requests"]
+                assert stats["p50_ms"] <= stats["p99_ms"]
+
+        with ScoringService(data_root=tmp) as service:
+            server = serve(service, port=0)
+            client = ScoringClient(port=server.server_address[1])
+            try:
+                result = client.score("CUST0007")
+                assert abs(result["churn_score"] - expected["CUST0007"]) < 1e-5
+                assert client.stats()["requests"] == 1
+                assert "error" in client._call({"unexpected": 1})
+            finally:
+                client.close()
+                server.shutdown()
+                server.server_close()
+        store.close()
+
+    print("✅ Scoring service test passed")
+
+if __name__ == "__main__":
+    test_scoring_service()
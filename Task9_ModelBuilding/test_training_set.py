@@ -0,0 +1,69 @@
+"""
+Test the point-in-time training-set builder: every label gets the latest snapshot
+available before it, and partitioned processing matches the in-memory join
+"""
+
+import sys
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Task7_FeatureStore.feature_store import FeatureStore
+from Task9_ModelBuilding.training_set import TrainingSetBuilder, load_training_set
+
+def make_store(root, customers):
+    """Three daily snapshots where tenure_days encodes the snapshot day"""
+    store = FeatureStore(root=root)
+    for day in [1, 2, 3]:
+        features = pd.DataFrame({
+            "tenure_days": [100 * day + i for i in range(len(customers))],
+            "is_churned": 0
+        }, index=pd.Index(customers, name="customer_id"))
+        store.materialize(features, f"2025-08-0{day}")
+    store.close()
+    return store
+
+def test_training_set():
+    """Labels join the snapshot of the last full day before the label timestamp"""
+    customers = [f"CUST{i:03d}" for i in range(40)]
+    labels = pd.DataFrame({
+        "customer_id": customers,
+        "label_timestamp": pd.to_datetime(["2025-08-01 12:00", "2025-08-02 09:00", "2025-08-03 00:00", "2025-08-05 00:00"] * 10),
+        "is_churned": [1, 0] * 20
+    })
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = make_store(os.path.join(tmp, "feature_store"), customers)
+
+        single = TrainingSetBuilder(store=store, n_partitions=1).build(labels, os.path.join(tmp, "single"))
+        partitioned = TrainingSetBuilder(store=store, n_partitions=4).build(labels, os.path.join(tmp, "partitioned"))
+        assert partitioned["customer_partitions"] == 4
+        assert single["rows"] == partitioned["rows"] == 40
+        assert single["positives"] == 20
+        assert "is_churned" not in single["feature_columns"]
+
+        key = ["customer_id", "label_timestamp"]
+        single_df = load_training_set(os.path.join(tmp, "single")).sort_values(key).reset_index(drop=True)
+        partitioned_df = load_training_set(os.path.join(tmp, "partitioned")).sort_values(key).reset_index(drop=True)
+        pd.testing.assert_frame_equal(single_df, partitioned_df)
+
+        # Snapshot of day D is usable from D+1 00:00: labels on 08-01 have none,
+        # 08-02 09:00 gets day 1, 08-03 00:00 gets day 2, 08-05 gets day 3
+        expected_day = {0: np.nan, 1: 1, 2: 2, 3: 3}
+        for row in single_df.itertuples():
+            position = int(row.customer_id[4:])
+            day = expected_day[position % 4]
+            if np.isnan(day):
+                assert pd.isna(row.tenure_days)
+            else:
+                assert row.tenure_days == 100 * day + position
+        assert single["labels_without_features"] == 10
+
+    print("✅ Training set test passed")
+
+if __name__ == "__main__":
+    test_training_set()
@@ -0,0 +1,243 @@
+"""
+Task 9: Model Building - Point-in-Time Training Sets
+Joins churn label events to the feature snapshot that was available when each label was observed
+
+Label events come from DataPreparation.create_churn_label_events (churn is observed at the
+CRM created_at of the closed disconnect ticket). Feature snapshots are the dt= partitions of
+the offline feature store; the snapshot of dt=D covers all data of day D, so it only becomes
+usable at the end of that day. Each label gets the latest snapshot usable at its timestamp
+through a sorted as-of join per customer_id - never a later one, so no label leakage.
+
+For large inputs both sides are hash-partitioned by customer_id and joined one partition at
+a time, so memory is bounded by a partition and no cross join is ever formed.
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+
+from utils.logger import get_logger
+from utils.metrics import track_stage
+from Task5_DataPreparation.data_preparation import DataPreparation
+from Task7_FeatureStore.feature_store import FeatureStore, ENTITY_KEY, TIMESTAMP_COLUMN, DEFAULT_FEATURE_VIEW
+
+logger = get_logger("model_building", log_file=os.path.join(project_root, "logs", "model_building.log"))
+
+LABEL_COLUMN = "is_churned"
+LABEL_TIMESTAMP = "label_timestamp"
+AVAILABLE_AT = "feature_available_at"
+SNAPSHOT_LAG = pd.Timedelta(days=1)
+
+
+def customer_partition(customer_ids, n_partitions):
+    """Stable hash partition number of each customer id"""
+    hashes = pd.util.hash_array(np.asarray(customer_ids, dtype=object))
+    return (hashes % np.uint64(n_partitions)).astype("int64")
+
+
+def load_label_events(partition_date, data_root=None):
+    """
+    Label events for a dt= partition: churned customers at their churn ticket time,
+    every other customer of the partition as retained at the end of the partition day
+    """
+    prep = DataPreparation(data_root=data_root)
+    data = prep.load_partition_data(partition_date)
+    crm_clean = prep.clean_crm_data(data['crm'])
+
+    customers = pd.concat([
+        data[table]['customer_id'] for table in ('billing', 'subscriptions') if table in data
+    ], ignore_index=True)
+    observation_time = pd.Timestamp(partition_date) + SNAPSHOT_LAG
+    return prep.create_churn_label_events(crm_clean, customers=customers, observation_time=observation_time)
+
+
+def point_in_time_join(labels, snapshots, feature_columns):
+    """
+    As-of join of label events to feature snapshots (one customer partition in memory)
+
+    Args:
+        labels: DataFrame with customer_id, label_timestamp, is_churned
+        snapshots: DataFrame with customer_id, event_timestamp and the feature columns
+        feature_columns: Feature columns to carry over
+
+    Returns:
+        One row per label with the features of the latest snapshot available at label time
+        (NaN when none was), plus the snapshot's event_timestamp
+    """
+    labels = labels.copy()
+    labels[ENTITY_KEY] = labels[ENTITY_KEY].astype(str)
+    labels[LABEL_TIMESTAMP] = pd.to_datetime(labels[LABEL_TIMESTAMP])
+
+    snapshots = snapshots[[ENTITY_KEY, TIMESTAMP_COLUMN] + list(feature_columns)].copy()
+    snapshots[ENTITY_KEY] = snapshots[ENTITY_KEY].astype(str)
+    snapshots[AVAILABLE_AT] = pd.to_datetime(snapshots[TIMESTAMP_COLUMN]) + SNAPSHOT_LAG
+
+    # merge_asof needs both sides sorted on the time key; "by" restricts matches to
+    # the same customer, so each label joins at most one snapshot
+    joined = pd.merge_asof(
+        labels.sort_values(LABEL_TIMESTAMP, kind="stable"),
+        snapshots.sort_values(AVAILABLE_AT, kind="stable"),
+        left_on=LABEL_TIMESTAMP,
+        right_on=AVAILABLE_AT,
+        by=ENTITY_KEY,
+        direction="backward",
+        allow_exact_matches=True
+    )
+    return joined.drop(columns=[AVAILABLE_AT])
+
+
+class TrainingSetBuilder:
+    """
+    Builds point-in-time correct training sets from label events and the offline feature store
+
+    Args:
+        store: FeatureStore holding the feature snapshots
+        feature_view: Feature view to read
+        n_partitions: Customer hash partitions (None = pick from the label count)
+        rows_per_partition: Target labels per partition when n_partitions is None
+    """
+
+    def __init__(self, store=None, feature_view=DEFAULT_FEATURE_VIEW, n_partitions=None, rows_per_partition=1_000_000):
+        self.store = store or FeatureStore()
+        self.feature_view = feature_view
+        self.n_partitions = n_partitions
+        self.rows_per_partition = rows_per_partition
+
+    def feature_columns(self):
+        """Registered features except the label itself"""
+        return [f["name"] for f in self.store.list_features(self.feature_view) if f["name"] != LABEL_COLUMN]
+
+    def _snapshot_partitions(self, labels):
+        """Offline partitions that can be usable for at least one label"""
+        latest_label = pd.to_datetime(labels[LABEL_TIMESTAMP]).max()
+        return [
+            p for p in self.store.list_partitions(self.feature_view)
+            if pd.Timestamp(p) + SNAPSHOT_LAG <= latest_label
+        ]
+
+    def _spill_snapshots(self, partitions, feature_columns, n_partitions, spill_dir):
+        """Read each snapshot once and split it into per-customer-partition files"""
+        for partition_date in partitions:
+            snapshot = self.store.read_partition(partition_date, feature_columns, self.feature_view)
+            buckets = customer_partition(snapshot[ENTITY_KEY], n_partitions)
+            for bucket, part in snapshot.groupby(buckets, sort=False):
+                part.to_pickle(os.path.join(spill_dir, f"bucket={bucket}-dt={partition_date}.pkl"))
+
+    def _read_bucket(self, spill_dir, bucket, partitions, feature_columns):
+        frames = [
+            pd.read_pickle(path) for path in (
+                os.path.join(spill_dir, f"bucket={bucket}-dt={p}.pkl") for p in partitions
+            ) if os.path.exists(path)
+        ]
+        if not frames:
+            return pd.DataFrame(columns=[ENTITY_KEY, TIMESTAMP_COLUMN] + feature_columns)
+        return pd.concat(frames, ignore_index=True)
+
+    def build(self, labels, output_dir):
+        """
+        Join label events to their point-in-time features and write the training set
+
+        Args:
+            labels: Label events (customer_id, label_timestamp, is_churned)
+            output_dir: Directory receiving part-*.parquet files and a manifest
+
+        Returns:
+            Dictionary with the training set summary
+        """
+        feature_columns = self.feature_columns()
+        labels = labels.dropna(subset=[LABEL_TIMESTAMP])
+        partitions = self._snapshot_partitions(labels) if len(labels) else []
+        n_partitions = self.n_partitions or max(1, -(-len(labels) // self.rows_per_partition))
+
+        if os.path.isdir(output_dir):
+            shutil.rmtree(output_dir)
+        os.makedirs(output_dir)
+
+        summary = {"rows": 0, "positives": 0, "labels_without_features": 0, "parts": []}
+
+        def write_part(joined, part_number):
+            part_file = os.path.join(output_dir, f"part-{part_number:05d}.parquet")
+            joined.to_parquet(part_file, index=False)
+            summary["rows"] += len(joined)
+            summary["positives"] += int(joined[LABEL_COLUMN].sum())
+            summary["labels_without_features"] += int(joined[TIMESTAMP_COLUMN].isna().sum())
+            summary["parts"].append(os.path.basename(part_file))
+
+        if n_partitions == 1:
+            snapshots = pd.DataFrame(columns=[ENTITY_KEY, TIMESTAMP_COLUMN] + feature_columns)
+            if partitions:
+                snapshots = self.store.read_offline(end_date=partitions[-1], columns=feature_columns,
+                                                    feature_view=self.feature_view)
+            write_part(point_in_time_join(labels, snapshots, feature_columns), 0)
+        else:
+            label_buckets = customer_partition(labels[ENTITY_KEY].astype(str), n_partitions)
+            spill_dir = tempfile.mkdtemp(prefix="pit-join-", dir=os.path.dirname(output_dir))
+            try:
+                self._spill_snapshots(partitions, feature_columns, n_partitions, spill_dir)
+                for bucket in range(n_partitions):
+                    bucket_labels = labels[label_buckets == bucket]
+                    if bucket_labels.empty:
+                        continue
+                    snapshots = self._read_bucket(spill_dir, bucket, partitions, feature_columns)
+                    write_part(point_in_time_join(bucket_labels, snapshots, feature_columns), bucket)
+            finally:
+                shutil.rmtree(spill_dir, ignore_errors=True)
+
+        summary.update({
+            "feature_view": self.feature_view,
+            "feature_columns": feature_columns,
+            "snapshot_partitions": partitions,
+            "customer_partitions": n_partitions,
+            "created_at": datetime.now().isoformat()
+        })
+        with open(os.path.join(output_dir, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        return summary
+
+
+def load_training_set(training_dir, columns=None):
+    """Read a training set written by TrainingSetBuilder.build"""
+    with open(os.path.join(training_dir, "manifest.json"), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    frames = [pd.read_parquet(os.path.join(training_dir, part), columns=columns) for part in manifest["parts"]]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+
+
+def build_training_set(partition_date, data_root=None, builder=None):
+    """Main function: label events of a partition -> point-in-time training set"""
+    logger.info(f"Building point-in-time training set for {partition_date}...")
+    data_root = data_root or os.path.join(project_root, "data")
+    builder = builder or TrainingSetBuilder(store=FeatureStore(root=os.path.join(data_root, "feature_store")))
+
+    try:
+        with track_stage("model_building.training_set", partition_date=partition_date) as m:
+            labels = load_label_events(partition_date, data_root=data_root)
+            output_dir = os.path.join(data_root, "training", "churn_training_set", f"dt={partition_date}")
+            summary = builder.build(labels, output_dir)
+            m.rows_in = len(labels)
+            m.rows_out = summary["rows"]
+
+        logger.info(
+            f"Training set saved: {output_dir} ({summary['rows']} labels, {summary['positives']} churned, "
+            f"{summary['labels_without_features']} without a prior feature snapshot)"
+        )
+        summary.update({"status": "success", "partition_date": partition_date, "output_dir": output_dir})
+        return summary
+
+    except Exception as e:
+        logger.error(f"Training set build failed: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    result = build_training_set(datetime.today().date().isoformat())
+    print(f"Training set: {result['rows']} rows ({result['positives']} churned) -> {result['output_dir']}")
@@ -0,0 +1,174 @@
+"""
+Pipeline Benchmark Harness
+Runs ingestion -> storage -> validation -> preparation on synthetic data at several scales
+and records throughput and memory so results can be compared across commits
+"""
+
+import os
+import sys
+import json
+import shutil
+import platform
+import subprocess
+import tempfile
+from datetime import datetime
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+
+from benchmarks.synthetic_data import SCALES, parse_scale, generate_dataset
+
+benchmarks_dir = os.path.dirname(os.path.abspath(__file__))
+workdir = os.path.join(benchmarks_dir, "workdir")
+results_dir = os.path.join(benchmarks_dir, "results")
+
+STAGES = ["ingestion", "storage", "validation", "preparation"]
+
+
+def get_git_commit():
+    """Short commit hash of the working tree being benchmarked"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=project_root,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def prepare_source_data(scale, seed):
+    """Generate (or reuse) the synthetic sources for a scale"""
+    source_dir = os.path.join(workdir, f"{scale}-seed{seed}")
+    manifest_file = os.path.join(source_dir, "manifest.json")
+    if os.path.exists(manifest_file):
+        with open(manifest_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return generate_dataset(source_dir, parse_scale(scale), seed=seed)
+
+
+def run_single_scale(scale, seed):
+    """
+    Run all stages once for a scale inside this process and return per-stage metrics.
+    Called in a fresh subprocess per scale so peak RSS is not polluted by earlier scales.
+    """
+    manifest = prepare_source_data(scale, seed)
+    data_root = tempfile.mkdtemp(prefix=f"dmml-bench-{scale}-")
+    metrics_file = os.path.join(data_root, "metrics.jsonl")
+    os.environ["DMML_METRICS_FILE"] = metrics_file
+
+    # Imported after DMML_METRICS_FILE is set so benchmark metrics stay out of logs/metrics.jsonl
+    from utils.metrics import set_run_id, get_collected_metrics
+    from Task2_DataIngestion.ingestion import ingest_all_data
+    from Task3_RawDataStorage.data_storage import store_multiple_tables
+    from Task4_DataValidation.data_validation import validate_all_data
+    from Task5_DataPreparation.data_preparation import prepare_clean_dataset
+
+    run_id = set_run_id(f"bench-{scale}")
+    partition_date = manifest["as_of"]
+    try:
+        ingested = ingest_all_data(db_file=manifest["db_file"], crm_file=manifest["crm_file"])
+        store_multiple_tables(ingested["data"], partition_date=partition_date, data_root=data_root)
+        del ingested
+        validate_all_data(partition_date, data_root=data_root)
+        prepare_clean_dataset(partition_date=partition_date, data_root=data_root)
+    finally:
+        shutil.rmtree(data_root, ignore_errors=True)
+
+    stages = {}
+    for record in get_collected_metrics(run_id):
+        if record["stage"] not in STAGES:
+            continue
+        rows = record["rows_in"] or record["rows_out"] or 0
+        stages[record["stage"]] = {
+            "wall_seconds": record["wall_seconds"],
+            "cpu_seconds": record["cpu_seconds"],
+            # Each scale runs in a fresh process, so the process high-water mark is the scale's peak so far
+            "peak_rss_mb": record["process_peak_rss_mb"],
+            "rss_growth_mb": record["rss_growth_mb"],
+            "rows": rows,
+            "rows_per_second": round(rows / record["wall_seconds"], 1) if record["wall_seconds"] else None,
+            "bytes_read": record["bytes_read"],
+            "bytes_written": record["bytes_written"]
+        }
+
+    return {
+        "scale": scale,
+        "customers": manifest["customers"],
+        "source_records": manifest["records"],
+        "stages": stages
+    }
+
+
+def run_benchmarks(scales, seed=42):
+    """Run every scale in its own subprocess and store the combined results"""
+    results = {
+        "commit": get_git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "seed": seed,
+        "scales": {}
+    }
+
+    for scale in scales:
+        print(f"Benchmarking scale {scale}...")
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--single", scale, "--seed", str(seed)],
+            capture_output=True, text=True
+        )
+        if completed.returncode != 0:
+            results["scales"][scale] = {"error": completed.stderr.strip().splitlines()[-1:]}
+            print(f"  failed: {results['scales'][scale]['error']}")
+            continue
+        # The last stdout line is the JSON result; modules may print before it
+        results["scales"][scale] = json.loads(completed.stdout.strip().splitlines()[-1])
+        for stage, stats in results["scales"][scale]["stages"].items():
+            print(f"  {stage:<12} {stats['wall_seconds']:>9.3f}s  {stats['rows_per_second'] or 0:>12,.0f} rows/s  {stats['peak_rss_mb']} MB")
+
+    os.makedirs(results_dir, exist_ok=True)
+    out_file = os.path.join(results_dir, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{results['commit']}.json")
+    with open(out_file, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved: {out_file}")
+    return out_file
+
+
+def compare_results(baseline_file, candidate_file):
+    """Print the per-stage wall time and memory ratio between two result files"""
+    with open(baseline_file, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(candidate_file, "r", encoding="utf-8") as f:
+        candidate = json.load(f)
+
+    print(f"Baseline {baseline['commit']} vs candidate {candidate['commit']}")
+    for scale, cand in candidate["scales"].items():
+        base = baseline["scales"].get(scale)
+        if not base or "stages" not in base or "stages" not in cand:
+            continue
+        print(f"[{scale}]")
+        for stage in STAGES:
+            if stage in base["stages"] and stage in cand["stages"]:
+                b, c = base["stages"][stage], cand["stages"][stage]
+                speedup = b["wall_seconds"] / c["wall_seconds"] if c["wall_seconds"] else float("inf")
+                print(f"  {stage:<12} {b['wall_seconds']:>9.3f}s -> {c['wall_seconds']:>9.3f}s  "
+                      f"({speedup:.2f}x)  RSS {b['peak_rss_mb']} -> {c['peak_rss_mb']} MB")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the data pipeline on synthetic data")
+    parser.add_argument("scales", nargs="*", default=["10k", "100k"], help=f"Scales to run ({list(SCALES)} or customer counts)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--single", help=argparse.SUPPRESS)
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CANDIDATE"), help="Compare two result files")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_results(*args.compare)
+    elif args.single:
+        print(json.dumps(run_single_scale(args.single, args.seed)))
+    else:
+        run_benchmarks(args.scales, seed=args.seed)
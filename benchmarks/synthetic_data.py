@@ -0,0 +1,211 @@
+"""
+Synthetic Telecom Data Generator
+Generates billing/subscriptions (SQLite, telecom.db schema) and CRM tickets (crm.csv schema)
+at configurable scale for benchmarking the pipeline
+"""
+
+import os
+import sys
+import json
+import sqlite3
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+
+from utils.logger import get_logger
+
+logger = get_logger("synthetic_data", log_file=os.path.join(project_root, "logs", "benchmarks.log"))
+
+# Named scales (number of customers)
+SCALES = {
+    "10k": 10_000,
+    "100k": 100_000,
+    "1m": 1_000_000,
+    "10m": 10_000_000,
+    "100m": 100_000_000
+}
+
+# Same DDL as Task2_DataIngestion/sources/telecom.db
+BILLING_DDL = """CREATE TABLE billing (    invoice_id TEXT,    customer_id TEXT,    amount_due REAL,    amount_paid REAL,    payment_method TEXT,    product_id TEXT,    invoice_date DATE,    payment_date DATE,    payment_status TEXT)"""
+SUBSCRIPTIONS_DDL = """CREATE TABLE subscriptions (    customer_id TEXT,    plan_type TEXT,    monthly_fee REAL,    status TEXT,    product_id TEXT,    subscription_start DATE)"""
+
+CRM_COLUMNS = ["ticket_id", "customer_id", "product_id", "created_at", "request_type",
+               "disconnect_reason", "request_reason", "status"]
+
+PRODUCTS = np.array(["TV001", "BB001", "PH001"])
+CRM_PRODUCTS = np.array(["PROD_TV", "PROD_BROADBAND", "PROD_PHONE"])
+PLAN_TYPES = np.array(["Month-to-month", "One year", "Two year"])
+PLAN_FEES = np.array([55.0, 120.0, 210.0])
+PAYMENT_METHODS = np.array(["Credit Card", "Mailed Check", "Bank Transfer", "Electronic Check"])
+REQUEST_TYPES = np.array(["disconnect", "complaint", "upgrade", "inquiry"])
+REQUEST_TYPE_WEIGHTS = np.array([0.25, 0.45, 0.15, 0.15])
+DISCONNECT_REASONS = np.array(["competitor_offer", "pricing_issues", "service_quality", "relocation"])
+REQUEST_REASONS = np.array(["service_issues", "billing_dispute", "network_issues", "content_quality",
+                            "technical_support", "service_upgrade", "plan_change", "billing_inquiry"])
+TICKET_STATUSES = np.array(["open", "closed", "pending", "resolved"])
+
+
+def parse_scale(scale):
+    """Accept a named scale ("10k", "1m", ...) or a plain customer count"""
+    if str(scale).lower() in SCALES:
+        return SCALES[str(scale).lower()]
+    return int(scale)
+
+
+def _format_ids(prefix, numbers, width):
+    """Vectorized zero-padded identifiers, e.g. CUST0000001"""
+    return np.char.add(prefix, np.char.zfill(numbers.astype(str), width))
+
+
+def _random_dates(rng, start, end, size):
+    """Uniform random dates between start and end as ISO strings"""
+    start_day = np.datetime64(start, "D")
+    span = (np.datetime64(end, "D") - start_day).astype(int)
+    return (start_day + rng.integers(0, span + 1, size=size)).astype(str)
+
+
+def generate_customer_chunk(rng, first_customer, n_customers, id_width, as_of):
+    """Generate billing and subscriptions rows for a contiguous block of customers"""
+    customer_numbers = np.arange(first_customer, first_customer + n_customers)
+    customer_ids = _format_ids("CUST", customer_numbers, id_width)
+
+    plan_idx = rng.choice(len(PLAN_TYPES), size=n_customers, p=[0.55, 0.30, 0.15])
+    product_idx = rng.integers(0, len(PRODUCTS), size=n_customers)
+    monthly_fee = PLAN_FEES[plan_idx]
+
+    subscriptions = pd.DataFrame({
+        "customer_id": customer_ids,
+        "plan_type": PLAN_TYPES[plan_idx],
+        "monthly_fee": monthly_fee,
+        "status": np.where(rng.random(n_customers) < 0.12, "Churned", "Active"),
+        "product_id": PRODUCTS[product_idx],
+        "subscription_start": _random_dates(rng, "2018-01-01", as_of, n_customers)
+    })
+
+    # One invoice per customer for the billing month, ~80% paid in full
+    paid_mask = rng.random(n_customers) < 0.8
+    invoice_date = np.full(n_customers, as_of[:8] + "01")
+    payment_lag = rng.integers(0, 30, size=n_customers)
+    payment_date = (np.datetime64(as_of[:8] + "01", "D") + payment_lag).astype(str)
+
+    billing = pd.DataFrame({
+        "invoice_id": _format_ids("INV", customer_numbers, id_width),
+        "customer_id": customer_ids,
+        "amount_due": monthly_fee,
+        "amount_paid": np.where(paid_mask, monthly_fee, 0.0),
+        "payment_method": PAYMENT_METHODS[rng.integers(0, len(PAYMENT_METHODS), size=n_customers)],
+        "product_id": PRODUCTS[product_idx],
+        "invoice_date": invoice_date,
+        "payment_date": np.where(paid_mask, payment_date, None),
+        "payment_status": np.where(paid_mask, "Paid", "Pending")
+    })
+
+    return billing, subscriptions, customer_ids
+
+
+def generate_ticket_chunk(rng, customer_ids, first_ticket, mean_tickets, id_width, as_of):
+    """
+    Generate CRM tickets for a block of customers.
+    Tickets per customer follow a negative binomial (most customers have none,
+    a small tail of customers raise many tickets).
+    """
+    dispersion = 0.3
+    tickets_per_customer = rng.negative_binomial(dispersion, dispersion / (dispersion + mean_tickets), size=len(customer_ids))
+    n_tickets = int(tickets_per_customer.sum())
+    if n_tickets == 0:
+        return pd.DataFrame(columns=CRM_COLUMNS)
+
+    request_type = REQUEST_TYPES[rng.choice(len(REQUEST_TYPES), size=n_tickets, p=REQUEST_TYPE_WEIGHTS)]
+    is_disconnect = request_type == "disconnect"
+    seconds = rng.integers(0, 86400, size=n_tickets).astype("timedelta64[s]")
+    created_at = _random_dates(rng, "2024-01-01", as_of, n_tickets).astype("datetime64[s]") + seconds
+
+    return pd.DataFrame({
+        "ticket_id": _format_ids("TKT", np.arange(first_ticket, first_ticket + n_tickets), id_width + 1),
+        "customer_id": np.repeat(customer_ids, tickets_per_customer),
+        "product_id": CRM_PRODUCTS[rng.integers(0, len(CRM_PRODUCTS), size=n_tickets)],
+        "created_at": np.char.replace(np.datetime_as_string(created_at, unit="s"), "T", " "),
+        "request_type": request_type,
+        "disconnect_reason": np.where(is_disconnect, DISCONNECT_REASONS[rng.integers(0, len(DISCONNECT_REASONS), size=n_tickets)], None),
+        "request_reason": np.where(is_disconnect, None, REQUEST_REASONS[rng.integers(0, len(REQUEST_REASONS), size=n_tickets)]),
+        "status": TICKET_STATUSES[rng.choice(len(TICKET_STATUSES), size=n_tickets, p=[0.3, 0.5, 0.1, 0.1])]
+    })
+
+
+def generate_dataset(output_dir, n_customers, seed=42, mean_tickets=1.2, chunk_size=1_000_000, as_of="2025-08-24"):
+    """
+    Generate a synthetic telecom.db + crm.csv pair in output_dir.
+
+    Data is produced in customer chunks so memory stays bounded at any scale,
+    and the same (n_customers, seed) always yields identical files.
+
+    Returns:
+        Dictionary with file paths and row counts
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    db_file = os.path.join(output_dir, "telecom.db")
+    crm_file = os.path.join(output_dir, "crm.csv")
+    for path in (db_file, crm_file):
+        if os.path.exists(path):
+            os.remove(path)
+
+    rng = np.random.default_rng(seed)
+    id_width = max(3, len(str(n_customers)))
+
+    conn = sqlite3.connect(db_file)
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute(BILLING_DDL)
+    conn.execute(SUBSCRIPTIONS_DDL)
+
+    totals = {"billing": 0, "subscriptions": 0, "crm": 0}
+    try:
+        for first_customer in range(1, n_customers + 1, chunk_size):
+            n_chunk = min(chunk_size, n_customers - first_customer + 1)
+            billing, subscriptions, customer_ids = generate_customer_chunk(rng, first_customer, n_chunk, id_width, as_of)
+            tickets = generate_ticket_chunk(rng, customer_ids, totals["crm"] + 1, mean_tickets, id_width, as_of)
+
+            conn.executemany("INSERT INTO billing VALUES (?,?,?,?,?,?,?,?,?)", billing.itertuples(index=False, name=None))
+            conn.executemany("INSERT INTO subscriptions VALUES (?,?,?,?,?,?)", subscriptions.itertuples(index=False, name=None))
+            conn.commit()
+            tickets.to_csv(crm_file, mode="a", header=totals["crm"] == 0, index=False)
+
+            totals["billing"] += len(billing)
+            totals["subscriptions"] += len(subscriptions)
+            totals["crm"] += len(tickets)
+            logger.info(f"Generated customers {first_customer}-{first_customer + n_chunk - 1} ({totals['crm']} tickets so far)")
+    finally:
+        conn.close()
+
+    manifest = {
+        "customers": n_customers,
+        "seed": seed,
+        "mean_tickets": mean_tickets,
+        "as_of": as_of,
+        "db_file": db_file,
+        "crm_file": crm_file,
+        "records": totals
+    }
+    with open(os.path.join(output_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    logger.info(f"Synthetic dataset ready in {output_dir}: {totals}")
+    return manifest
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate synthetic telecom data")
+    parser.add_argument("scale", help=f"Number of customers or one of {list(SCALES)}")
+    parser.add_argument("--output", default=os.path.join(os.path.dirname(__file__), "workdir"), help="Output directory")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--mean-tickets", type=float, default=1.2, help="Average tickets per customer")
+    args = parser.parse_args()
+
+    n = parse_scale(args.scale)
+    result = generate_dataset(os.path.join(args.output, str(args.scale)), n, seed=args.seed, mean_tickets=args.mean_tickets)
+    print(f"Generated: {result['records']}")
@@ -0,0 +1,186 @@
+"""
+CSV reading with pluggable backends
+
+- "pyarrow": Arrow's multithreaded CSV reader (parses blocks on all cores)
+- "pandas": the pandas C parser
+
+Date columns are parsed during the read with explicit formats (DATE_FORMATS holds those of the
+source and raw-zone tables), so no separate pd.to_datetime pass and no per-value format
+inference is needed. Both backends return the same frame: pandas dtypes, NaN/NaT for the
+pandas default null markers. If Arrow cannot convert a file (e.g. a malformed date), the
+read is retried with pandas, which leaves unparseable date columns as text.
+
+The backend is chosen per call (engine=...), else by DMML_CSV_ENGINE, else pyarrow when installed.
+"""
+
+import csv
+import logging
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pyarrow is optional; fall back to the pandas parser
+    pa = pa_csv = None
+
+# Explicit formats of the date columns found in sources and the raw zone
+DATE_FORMATS = {
+    "created_at": "%Y-%m-%d %H:%M:%S",
+    "invoice_date": "%Y-%m-%d",
+    "payment_date": "%Y-%m-%d",
+    "billing_date": "%Y-%m-%d",
+    "subscription_start": "%Y-%m-%d",
+    "subscription_end": "%Y-%m-%d"
+}
+
+# Same null markers as pandas, so both backends agree on what is missing
+NULL_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"
+]
+
+# Bytes per block of the streaming Arrow reader (iter_csv); bounds the memory of chunked reads
+ARROW_BLOCK_SIZE = 1 << 24
+
+logger = logging.getLogger("csv_reader")
+
+
+def get_engine(engine=None):
+    """Resolve the backend name for a read"""
+    engine = (engine or os.environ.get("DMML_CSV_ENGINE") or ("pyarrow" if pa_csv else "pandas")).lower()
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown CSV engine '{engine}' (available: {', '.join(ENGINES)})")
+    if engine == "pyarrow" and pa_csv is None:
+        return "pandas"
+    return engine
+
+
+def read_header(path):
+    """Column names of a CSV file (first line only)"""
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), [])
+
+
+def _plan(path, usecols, date_formats):
+    """Columns to read (in file order, as pandas returns them) and formats of their date columns"""
+    header = read_header(path)
+    columns = header if usecols is None else [column for column in header if column in set(usecols)]
+    formats = DATE_FORMATS if date_formats is None else date_formats
+    return columns, {column: formats[column] for column in columns if column in formats}
+
+
+def _pandas_options(usecols, dates):
+    return {"usecols": usecols, "parse_dates": list(dates) or None, "date_format": dates or None}
+
+
+def _arrow_convert_options(columns, dates, column_types=None):
+    return pa_csv.ConvertOptions(
+        include_columns=columns,
+        null_values=NULL_VALUES,
+        strings_can_be_null=True,
+        column_types=dict(column_types or {}, **{column: pa.timestamp("us") for column in dates}),
+        timestamp_parsers=sorted(set(dates.values()))
+    )
+
+
+def _read_arrow_table(path, columns, dates):
+    return pa_csv.read_csv(path, read_options=pa_csv.ReadOptions(use_threads=True),
+                           convert_options=_arrow_convert_options(columns, dates))
+
+
+def _open_arrow_stream(path, columns, dates):
+    """Streaming Arrow reader: parses one block at a time instead of the whole file"""
+    read_options = pa_csv.ReadOptions(use_threads=True, block_size=ARROW_BLOCK_SIZE)
+    reader = pa_csv.open_csv(path, read_options=read_options, convert_options=_arrow_convert_options(columns, dates))
+    # Types are inferred from the first block only: a column empty there may hold text later
+    empty = {field.name: pa.string() for field in reader.schema if pa.types.is_null(field.type)}
+    if empty:
+        reader.close()
+        reader = pa_csv.open_csv(path, read_options=read_options,
+                                 convert_options=_arrow_convert_options(columns, dates, empty))
+    return reader
+
+
+def _iter_arrow(path, chunk_rows, columns, dates):
+    """DataFrames of chunk_rows rows converted from the streamed record batches"""
+    reader = _open_arrow_stream(path, columns, dates)
+    pending = pa.Table.from_batches([], schema=reader.schema)
+    for batch in reader:
+        pending = pa.concat_tables([pending, pa.Table.from_batches([batch])])
+        while pending.num_rows >= chunk_rows:
+            yield pending.slice(0, chunk_rows).to_pandas()
+            pending = pending.slice(chunk_rows)
+    if pending.num_rows:
+        yield pending.to_pandas()
+
+
+def _read_pandas(path, usecols, columns, dates):
+    return pd.read_csv(path, **_pandas_options(usecols, dates))
+
+
+def _read_pyarrow(path, usecols, columns, dates):
+    return _read_arrow_table(path, columns, dates).to_pandas()
+
+
+ENGINES = {
+    "pyarrow": _read_pyarrow,
+    "pandas": _read_pandas
+}
+
+
+def read_csv(path, usecols=None, date_formats=None, engine=None):
+    """
+    Read a CSV file into a DataFrame
+
+    Args:
+        path: CSV file
+        usecols: Columns to read (default: all), in file order
+        date_formats: Column -> strptime format of date columns to parse while reading
+            (default: DATE_FORMATS; {} disables date parsing)
+        engine: "pyarrow" or "pandas" (default: see get_engine)
+
+    Returns:
+        DataFrame
+    """
+    engine = get_engine(engine)
+    columns, dates = _plan(path, usecols, date_formats)
+    if engine == "pyarrow":
+        try:
+            return _read_pyarrow(path, usecols, columns, dates)
+        except pa.ArrowInvalid as e:
+            logger.warning(f"Arrow could not parse {path} ({e}); reading it with pandas")
+    return ENGINES["pandas"](path, usecols, columns, dates)
+
+
+def read_csv_head(path, rows, usecols=None, date_formats=None):
+    """
+    First rows of a CSV file, e.g. to check its schema without reading the whole file
+    (always the pandas parser: Arrow's reader has no row limit)
+    """
+    _, dates = _plan(path, usecols, date_formats)
+    return pd.read_csv(path, nrows=rows, **_pandas_options(usecols, dates))
+
+
+def iter_csv(path, chunk_rows, usecols=None, date_formats=None, engine=None):
+    """
+    Read a CSV file as DataFrames of at most chunk_rows rows, so large files can be filtered
+    or aggregated without materializing one large DataFrame. With pyarrow the file is streamed
+    block by block (ARROW_BLOCK_SIZE bytes, parsed on all cores), so memory stays bounded by a
+    few blocks plus one chunk. Column types are inferred from the first block; if a later block
+    does not fit them, the rest of the file is read with pandas.
+    """
+    engine = get_engine(engine)
+    columns, dates = _plan(path, usecols, date_formats)
+    rows_done = 0
+    if engine == "pyarrow":
+        try:
+            for chunk in _iter_arrow(path, chunk_rows, columns, dates):
+                rows_done += len(chunk)
+                yield chunk
+            return
+        except pa.ArrowInvalid as e:
+            logger.warning(f"Arrow could not parse {path} after {rows_done} rows ({e}); reading the rest with pandas")
+    yield from pd.read_csv(path, chunksize=chunk_rows, skiprows=range(1, rows_done + 1),
+                           **_pandas_options(usecols, dates))
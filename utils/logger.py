@@ -1,20 +1,216 @@
+import atexit
+import json
 import logging
+import multiprocessing
+import multiprocessing.util
 import os
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener, MemoryHandler
 
-def get_logger(name="pipeline", log_file="logs/pipeline.log"):
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+def get_logger(name="pipeline", log_file="logs/pipeline.log", async_mode=None, json_format=None):
     """
     Returns a logger instance that writes logs to logs/pipeline.log.
     Reusable across ingestion, validation, transformation, modeling.
+
+    async_mode: hand records to a background thread through a queue instead of writing
+        the file on the calling thread (default: DMML_LOG_ASYNC=1)
+    json_format: write one JSON object per line instead of plain text (default: DMML_LOG_FORMAT=json)
     """
+    if async_mode is None:
+        async_mode = is_async_logging_enabled()
+    if json_format is None:
+        json_format = os.environ.get("DMML_LOG_FORMAT", "").lower() == "json"
+
     os.makedirs(os.path.dirname(log_file), exist_ok=True)
     logger = logging.getLogger(name)
     logger.setLevel(logging.INFO)
 
     # Avoid duplicate handlers if function is called multiple times
     if not logger.handlers:
-        fh = logging.FileHandler(log_file)
-        formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-        fh.setFormatter(formatter)
-        logger.addHandler(fh)
+        if async_mode:
+            logger.addHandler(AsyncLogHandler(log_file, json_format=json_format))
+        else:
+            fh = logging.FileHandler(log_file)
+            fh.setFormatter(JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT))
+            logger.addHandler(fh)
+
+    return logger
+
+
+def is_async_logging_enabled():
+    """True when DMML_LOG_ASYNC selects queue-based logging"""
+    return os.environ.get("DMML_LOG_ASYNC", "").lower() in ("1", "true", "yes")
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats each record as a single JSON line"""
+
+    def format(self, record):
+        entry = {
+            "timestamp": self.formatTime(record),
+            "logger": record.name,
+            "level": record.levelname,
+            "message": record.getMessage(),
+            "process": record.process,
+            "thread": record.threadName
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class _RoutingHandler(logging.Handler):
+    """
+    Runs on the listener thread: dispatches queued records to one batched
+    file handler per log file (MemoryHandler buffering in front of a FileHandler).
+    """
+
+    def __init__(self, batch_size=100):
+        super().__init__()
+        self.batch_size = batch_size
+        self._targets = {}
+
+    def _target(self, log_file, json_format):
+        key = (log_file, json_format)
+        if key not in self._targets:
+            fh = logging.FileHandler(log_file)
+            fh.setFormatter(JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT))
+            # Buffer records and write them in one go; errors are written immediately
+            self._targets[key] = MemoryHandler(self.batch_size, flushLevel=logging.ERROR, target=fh)
+        return self._targets[key]
+
+    def handle(self, record):
+        # Several listeners (local + worker queue) may share this router
+        with self.lock:
+            self._target(record.log_file, record.json_format).handle(record)
+        return True
+
+    def flush(self):
+        with self.lock:
+            for target in self._targets.values():
+                target.flush()
+
+    def close(self):
+        with self.lock:
+            for target in self._targets.values():
+                target.flush()
+                target.target.close()
+                target.close()
+            self._targets.clear()
+        super().close()
+
+
+class _BatchingQueueListener(QueueListener):
+    """QueueListener that also flushes buffered records when the queue goes quiet"""
+
+    def __init__(self, log_queue, handler, flush_interval=1.0):
+        super().__init__(log_queue, handler)
+        self.flush_interval = flush_interval
+
+    def dequeue(self, block):
+        while True:
+            try:
+                return self.queue.get(block=block, timeout=self.flush_interval)
+            except queue.Empty:
+                for handler in self.handlers:
+                    handler.flush()
+
+
+class _LogListenerState:
+    """Per-process queue, routing handler and listener thread(s)"""
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.queue = queue.SimpleQueue()
+        self.router = _RoutingHandler()
+        self.listeners = [_BatchingQueueListener(self.queue, self.router)]
+        self.listeners[0].start()
+        self.worker_queue = None
+        # multiprocessing children exit via os._exit and skip atexit, so also
+        # flush through a multiprocessing finalizer
+        multiprocessing.util.Finalize(None, shutdown_logging, exitpriority=10)
+
+    def stop(self):
+        for listener in self.listeners:
+            listener.stop()
+        self.router.close()
+
+
+_state = None
+_state_lock = threading.Lock()
+_worker_queue = None
+
+
+def _get_state():
+    """Start the background listener on first use (and again in a forked child)"""
+    global _state
+    if _state is None or _state.pid != os.getpid():
+        with _state_lock:
+            if _state is None or _state.pid != os.getpid():
+                _state = _LogListenerState()
+    return _state
+
+
+def _get_log_queue():
+    # Pool workers configured with configure_worker_logging send to the parent's listener
+    if _worker_queue is not None:
+        return _worker_queue
+    return _get_state().queue
+
+
+class AsyncLogHandler(QueueHandler):
+    """
+    Non-blocking handler: formats the message on the calling thread and enqueues it;
+    the file write happens on the listener thread in batches.
+    """
+
+    def __init__(self, log_file, json_format=False):
+        super().__init__(None)
+        self.log_file = os.path.abspath(log_file)
+        self.json_format = json_format
+
+    def prepare(self, record):
+        record = super().prepare(record)
+        record.log_file = self.log_file
+        record.json_format = self.json_format
+        return record
+
+    def enqueue(self, record):
+        _get_log_queue().put_nowait(record)
+
+
+def get_worker_log_queue():
+    """
+    Returns a multiprocessing queue drained by this process's log listener.
+    Pass it to worker processes via configure_worker_logging so their records
+    are written by the parent and never interleave in the log files.
+    """
+    state = _get_state()
+    with _state_lock:
+        if state.worker_queue is None:
+            state.worker_queue = multiprocessing.Queue()
+            listener = _BatchingQueueListener(state.worker_queue, state.router)
+            listener.start()
+            state.listeners.append(listener)
+    return state.worker_queue
+
+
+def configure_worker_logging(log_queue):
+    """ProcessPoolExecutor initializer: route async log records of this worker to log_queue"""
+    global _worker_queue
+    _worker_queue = log_queue
+
+
+def shutdown_logging():
+    """Flush buffered records and stop the background listener(s)"""
+    global _state
+    with _state_lock:
+        if _state is not None and _state.pid == os.getpid():
+            _state.stop()
+        _state = None
+
 
-    return logger
\ No newline at end of file
+atexit.register(shutdown_logging)
@@ -0,0 +1,205 @@
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # resource is not available on Windows
+    resource = None
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+default_metrics_file = os.path.join(project_root, "logs", "metrics.jsonl")
+
+_lock = threading.Lock()
+_local = threading.local()
+# Records kept for in-process reporting; cleared when a new run starts and capped so a
+# long-lived process (e.g. a backfill of many partitions) does not grow without bound
+MAX_COLLECTED = 10000
+_collected = deque(maxlen=MAX_COLLECTED)
+
+
+def get_run_id():
+    """
+    Returns the id shared by all metrics of the current pipeline run.
+    Stored in the environment so worker processes inherit it.
+    """
+    run_id = os.environ.get("DMML_RUN_ID")
+    if not run_id:
+        run_id = set_run_id()
+    return run_id
+
+
+def set_run_id(run_id=None):
+    """Start a new metrics run (e.g. one per flow run) and return its id"""
+    run_id = run_id or f"run-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    os.environ["DMML_RUN_ID"] = run_id
+    with _lock:
+        _collected.clear()
+    return run_id
+
+
+def current_rss_mb():
+    """Current resident set size of this process in MB (None where /proc is not available)"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return round(pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 2)
+
+
+def peak_rss_mb():
+    """
+    Peak resident set size of this process so far in MB (None where unsupported)
+    A high-water mark: it never goes down, so it is not the memory of any one stage.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    if os.uname().sysname == "Darwin":
+        return round(peak / (1024 * 1024), 2)
+    return round(peak / 1024, 2)
+
+
+def file_size(path):
+    """Size of a file in bytes, 0 if it does not exist"""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+class StageMetrics:
+    """Measurements for one pipeline stage or sub-step"""
+
+    def __init__(self, stage, parent=None, **extra):
+        self.stage = stage
+        self.parent = parent
+        self.run_id = get_run_id()
+        self.started_at = datetime.now().isoformat()
+        self.status = "running"
+        self.wall_seconds = None
+        self.cpu_seconds = None
+        self.rss_growth_mb = None
+        self.process_peak_rss_mb = None
+        self.rows_in = None
+        self.rows_out = None
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.extra = extra
+
+    def to_dict(self):
+        return {
+            "run_id": self.run_id,
+            "stage": self.stage,
+            "parent": self.parent,
+            "status": self.status,
+            "started_at": self.started_at,
+            "wall_seconds": self.wall_seconds,
+            "cpu_seconds": self.cpu_seconds,
+            "rss_growth_mb": self.rss_growth_mb,
+            "process_peak_rss_mb": self.process_peak_rss_mb,
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+            "pid": os.getpid(),
+            **self.extra
+        }
+
+
+def get_metrics_file():
+    """Metrics destination, overridable with DMML_METRICS_FILE (e.g. for benchmarks)"""
+    return os.environ.get("DMML_METRICS_FILE", default_metrics_file)
+
+
+def _emit(record, metrics_file):
+    """Append a metrics record as one JSON line and keep it for in-process reporting"""
+    with _lock:
+        _collected.append(record)
+        os.makedirs(os.path.dirname(metrics_file), exist_ok=True)
+        with open(metrics_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+
+
+def current_stage():
+    """Name of the innermost stage open on this thread, or None"""
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if stack else None
+
+
+@contextmanager
+def track_stage(stage, metrics_file=None, parent=None, **extra):
+    """
+    Context manager that measures a stage and emits it as a JSON line.
+    parent defaults to the stage open on the current thread; pass current_stage()
+    of the submitting thread for stages that run on worker threads.
+
+    cpu_seconds is the CPU time of the thread running the stage (stages on worker threads
+    measure their own), rss_growth_mb the change of the current RSS over the stage and
+    process_peak_rss_mb the process high-water mark when the stage ended.
+
+    Usage:
+        with track_stage("ingestion.crm") as m:
+            df = pd.read_csv(path)
+            m.bytes_read = file_size(path)
+            m.rows_out = len(df)
+    """
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+
+    metrics = StageMetrics(stage, parent=parent or (stack[-1] if stack else None), **extra)
+    stack.append(stage)
+    rss_start = current_rss_mb()
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    try:
+        yield metrics
+        metrics.status = "success"
+    except Exception:
+        metrics.status = "failed"
+        raise
+    finally:
+        stack.pop()
+        metrics.wall_seconds = round(time.perf_counter() - wall_start, 4)
+        metrics.cpu_seconds = round(time.thread_time() - cpu_start, 4)
+        rss_end = current_rss_mb()
+        if rss_start is not None and rss_end is not None:
+            metrics.rss_growth_mb = round(rss_end - rss_start, 2)
+        metrics.process_peak_rss_mb = peak_rss_mb()
+        _emit(metrics.to_dict(), metrics_file or get_metrics_file())
+
+
+def get_collected_metrics(run_id=None):
+    """Metrics recorded in this process, optionally limited to one run"""
+    with _lock:
+        records = list(_collected)
+    if run_id:
+        records = [r for r in records if r["run_id"] == run_id]
+    return records
+
+
+def format_metrics_table(records):
+    """Rows for a Prefect table artifact built from metrics records"""
+    table = []
+    for record in records:
+        table.append({
+            "Stage": record["stage"],
+            "Status": record["status"],
+            "Wall (s)": record["wall_seconds"],
+            "CPU (s)": record["cpu_seconds"],
+            "RSS Growth (MB)": record["rss_growth_mb"] if record["rss_growth_mb"] is not None else "-",
+            "Process Peak RSS So Far (MB)": record["process_peak_rss_mb"] if record["process_peak_rss_mb"] is not None else "-",
+            "Rows In": record["rows_in"] if record["rows_in"] is not None else "-",
+            "Rows Out": record["rows_out"] if record["rows_out"] is not None else "-",
+            "Bytes Read": record["bytes_read"],
+            "Bytes Written": record["bytes_written"]
+        })
+    return table
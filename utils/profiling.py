@@ -0,0 +1,153 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+default_profile_dir = os.path.join(project_root, "logs", "profiles")
+
+
+def get_profiled_stages():
+    """
+    Stages selected for profiling via DMML_PROFILE, e.g.
+    DMML_PROFILE=validation,preparation or DMML_PROFILE=all
+    """
+    value = os.environ.get("DMML_PROFILE", "")
+    return {stage.strip().lower() for stage in value.split(",") if stage.strip()}
+
+
+def set_profiled_stages(stages):
+    """Select stages to profile for this process and its workers (e.g. from a flow parameter)"""
+    os.environ["DMML_PROFILE"] = ",".join(stages or [])
+
+
+def is_profiling_enabled(stage):
+    stages = get_profiled_stages()
+    return "all" in stages or stage.lower() in stages
+
+
+class ProfileResult:
+    """Output locations and hot functions of one profiled stage"""
+
+    def __init__(self, stage):
+        self.stage = stage
+        self.pstats_file = None
+        self.collapsed_file = None
+        self.samples = 0
+        self.top_functions = []
+
+    def to_table(self):
+        """Rows for a Prefect table artifact"""
+        return [
+            {
+                "Function": f["function"],
+                "Location": f["location"],
+                "Calls": f["calls"],
+                "Own Time (s)": f["own_seconds"],
+                "Cumulative (s)": f["cumulative_seconds"]
+            }
+            for f in self.top_functions
+        ]
+
+
+class StackSampler:
+    """
+    Background thread sampling the call stack of one thread at a fixed interval.
+    Produces flamegraph-compatible collapsed stacks ("root;child;leaf count").
+    """
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write_collapsed(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def top_functions(profiler, top_n=20, sort_by="cumulative"):
+    """Extract the top-N functions from a cProfile run"""
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    stats.sort_stats(sort_by)
+    rows = []
+    for func in stats.fcn_list[:top_n]:
+        filename, lineno, name = func
+        primitive_calls, total_calls, own_time, cumulative_time, _ = stats.stats[func]
+        rows.append({
+            "function": name,
+            "location": f"{os.path.basename(filename)}:{lineno}",
+            "calls": total_calls,
+            "own_seconds": round(own_time, 4),
+            "cumulative_seconds": round(cumulative_time, 4)
+        })
+    return rows
+
+
+@contextmanager
+def profile_stage(stage, enabled=None, top_n=20, output_dir=None, interval=0.005):
+    """
+    Profile a block with cProfile (pstats file) and a stack sampler (collapsed stacks).
+
+    Profiling only happens when enabled is True, or when enabled is None and the
+    stage is listed in DMML_PROFILE; otherwise this yields None and adds no overhead.
+
+    Usage:
+        with profile_stage("validation") as profile:
+            validate_all_data(date)
+        if profile:
+            print(profile.pstats_file, profile.top_functions)
+    """
+    if enabled is None:
+        enabled = is_profiling_enabled(stage)
+    if not enabled:
+        yield None
+        return
+
+    output_dir = output_dir or default_profile_dir
+    os.makedirs(output_dir, exist_ok=True)
+    result = ProfileResult(stage)
+    base_name = os.path.join(output_dir, f"{stage}-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}")
+
+    profiler = cProfile.Profile()
+    sampler = StackSampler(threading.get_ident(), interval=interval)
+    sampler.start()
+    profiler.enable()
+    try:
+        yield result
+    finally:
+        profiler.disable()
+        sampler.stop()
+
+        result.pstats_file = base_name + ".pstats"
+        result.collapsed_file = base_name + ".collapsed"
+        profiler.dump_stats(result.pstats_file)
+        sampler.write_collapsed(result.collapsed_file)
+        result.samples = sum(sampler.stacks.values())
+        result.top_functions = top_functions(profiler, top_n=top_n)
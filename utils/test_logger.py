@@ -0,0 +1,70 @@
+"""
+Test asynchronous logging: records are written by the background listener, records of
+ProcessPoolExecutor workers reach the parent's log file, and shutdown flushes everything and
+stops the listener threads
+"""
+
+import sys
+import os
+import json
+import logging
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import utils.logger as log_module
+from utils.logger import get_logger, get_worker_log_queue, configure_worker_logging, shutdown_logging
+
+def log_in_worker(log_file, partition):
+    logger = get_logger("test_async_logger", log_file=log_file, async_mode=True, json_format=True)
+    logger.info(f"worker processed {partition}")
+    # The worker hands its records to the parent instead of starting a listener of its own
+    own_listener = log_module._state is not None and log_module._state.pid == os.getpid()
+    return os.getpid(), own_listener
+
+def test_async_logging():
+    with tempfile.TemporaryDirectory() as tmp:
+        log_file = os.path.join(tmp, "async.log")
+        logger = get_logger("test_async_logger", log_file=log_file, async_mode=True, json_format=True)
+        try:
+            logger.info("parent started")
+
+            with ProcessPoolExecutor(max_workers=2, initializer=configure_worker_logging,
+                                     initargs=(get_worker_log_queue(),)) as pool:
+                workers = list(pool.map(log_in_worker, [log_file] * 4, range(4)))
+            worker_pids = {pid for pid, _ in workers}
+            assert not any(own_listener for _, own_listener in workers)
+            logger.error("parent finished")
+
+            # Shutdown flushes the batched records and stops every listener thread
+            listeners = log_module._state.listeners
+            assert len(listeners) == 2
+            shutdown_logging()
+            assert log_module._state is None
+            assert not any(listener._thread for listener in listeners)
+
+            with open(log_file) as f:
+                records = [json.loads(line) for line in f]
+            messages = [record["message"] for record in records]
+            assert messages[0] == "parent started" and "parent finished" in messages
+            assert sorted(m for m in messages if m.startswith("worker")) == [f"worker processed {i}" for i in range(4)]
+            assert {r["process"] for r in records if r["message"].startswith("worker")} == worker_pids
+            assert os.getpid() not in worker_pids
+
+            # Logging after a shutdown starts a new listener
+            logger.info("after shutdown")
+            shutdown_logging()
+            with open(log_file) as f:
+                assert json.loads(f.readlines()[-1])["message"] == "after shutdown"
+        finally:
+            shutdown_logging()
+            for handler in list(logger.handlers):
+                logger.removeHandler(handler)
+                handler.close()
+
+    print("✅ Async logging test passed")
+
+if __name__ == "__main__":
+    test_async_logging()
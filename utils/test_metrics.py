@@ -0,0 +1,59 @@
+"""
+Test stage metrics: memory is reported as growth per stage next to the process peak so far,
+CPU time is that of the stage's own thread, and collected records are reset per run
+"""
+
+import sys
+import os
+import tempfile
+import threading
+import time
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.metrics import track_stage, set_run_id, get_collected_metrics, MAX_COLLECTED
+
+def test_metrics():
+    with tempfile.TemporaryDirectory() as tmp:
+        metrics_file = os.path.join(tmp, "metrics.jsonl")
+        run_id = set_run_id("test-metrics")
+
+        # ~80 MB held through the end of the stage
+        with track_stage("allocate", metrics_file=metrics_file) as m:
+            block = np.ones(10_000_000)
+        assert m.rss_growth_mb > 50 and m.process_peak_rss_mb >= m.rss_growth_mb
+        del block
+
+        # A busy thread running next to the stage is not charged to it
+        stop = threading.Event()
+        def spin():
+            while not stop.is_set():
+                pass
+        busy = threading.Thread(target=spin)
+        busy.start()
+        try:
+            with track_stage("idle", metrics_file=metrics_file) as m:
+                time.sleep(0.3)
+        finally:
+            stop.set()
+            busy.join()
+        assert m.cpu_seconds < 0.1
+
+        assert [r["stage"] for r in get_collected_metrics(run_id)] == ["allocate", "idle"]
+        with open(metrics_file) as f:
+            assert sum(1 for _ in f) == 2
+
+        # A new run starts with an empty collection, which never exceeds its cap
+        run_id = set_run_id("test-metrics-2")
+        assert get_collected_metrics() == []
+        for _ in range(MAX_COLLECTED + 5):
+            with track_stage("tiny", metrics_file=metrics_file):
+                pass
+        assert len(get_collected_metrics(run_id)) == MAX_COLLECTED
+
+    print("✅ Metrics test passed")
+
+if __name__ == "__main__":
+    test_metrics()
@@ -0,0 +1,64 @@
+"""
+Test stage profiling: only stages opted in through DMML_PROFILE write a profile, each profile
+has a pstats file and collapsed stacks naming the hot function, and worker processes inherit
+the selection
+"""
+
+import sys
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.profiling import profile_stage, set_profiled_stages, is_profiling_enabled
+
+def busy_work(n=300_000):
+    return sum(i * i for i in range(n))
+
+def profiled_in_worker(output_dir):
+    with profile_stage("validation", output_dir=output_dir) as profile:
+        busy_work()
+    return profile.pstats_file if profile else None
+
+def test_profiling():
+    selected = os.environ.get("DMML_PROFILE")
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            set_profiled_stages(["validation"])
+            assert is_profiling_enabled("Validation") and not is_profiling_enabled("preparation")
+
+            # Stages not opted in yield None and write nothing
+            with profile_stage("preparation", output_dir=tmp) as profile:
+                busy_work()
+            assert profile is None and os.listdir(tmp) == []
+
+            with profile_stage("validation", output_dir=tmp, interval=0.001) as profile:
+                busy_work()
+            assert os.path.exists(profile.pstats_file) and os.path.exists(profile.collapsed_file)
+            assert os.path.basename(profile.pstats_file).startswith("validation-")
+            assert any(f["function"] == "busy_work" for f in profile.top_functions)
+            assert len(profile.to_table()) == len(profile.top_functions)
+            with open(profile.collapsed_file) as f:
+                assert profile.samples > 0 and "busy_work" in f.read()
+
+            # Worker processes read the selection from the environment and profile on their own
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                worker_file = pool.submit(profiled_in_worker, tmp).result()
+            assert worker_file and os.path.exists(worker_file)
+            assert not worker_file.endswith(f"-{os.getpid()}.pstats")
+            assert len([name for name in os.listdir(tmp) if name.endswith(".pstats")]) == 2
+
+            set_profiled_stages(["all"])
+            assert is_profiling_enabled("preparation")
+    finally:
+        if selected is None:
+            os.environ.pop("DMML_PROFILE", None)
+        else:
+            os.environ["DMML_PROFILE"] = selected
+
+    print("✅ Profiling test passed")
+
+if __name__ == "__main__":
+    test_profiling()